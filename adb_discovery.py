@@ -0,0 +1,108 @@
+import json
+import os
+import socket
+from concurrent.futures import ThreadPoolExecutor
+
+adb_devices_file_path = "cfg/adb_devices.json"
+
+
+def candidate_ports(emulator_port=None):
+    """Ports emulators usually expose ADB on, the configured one first after the default."""
+    ports = [5555, emulator_port, 16384, 5635] + list(range(5565, 5756, 10))
+    return list(dict.fromkeys(int(port) for port in ports if port))
+
+
+def is_port_open(port, host="127.0.0.1", timeout=0.3):
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+class AdbDiscovery:
+    """
+    Finds the ADB device to attach to. An explicitly selected serial always wins, so
+    several bots on one host can each take their own device. Otherwise the last serial
+    that worked for the emulator profile is tried first, and only when ADB knows no device
+    at all are the candidate ports probed, all at once with a short timeout, before
+    adb connect is called on the ones that answered.
+    """
+
+    def __init__(self, adb_client, cache_file_path=adb_devices_file_path, probe_timeout=0.3, connect_timeout=2.0):
+        self.adb = adb_client
+        self.cache_file_path = cache_file_path
+        self.probe_timeout = probe_timeout
+        self.connect_timeout = connect_timeout
+
+    def load_cache(self):
+        if not os.path.exists(self.cache_file_path):
+            return {}
+        try:
+            with open(self.cache_file_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def remember(self, emulator, serial):
+        cache = self.load_cache()
+        if cache.get(emulator) == serial:
+            return
+        cache[emulator] = serial
+        with open(self.cache_file_path, 'w') as f:
+            json.dump(cache, f, indent=4)
+
+    def devices_by_serial(self):
+        return {device.serial: device for device in self.adb.device_list()}
+
+    def connect(self, serial):
+        """adb connect for network serials (host:port), returns the device once ADB lists it."""
+        if ":" in serial:
+            host, _, port = serial.rpartition(":")
+            if port.isdigit() and not is_port_open(int(port), host, self.probe_timeout):
+                return None
+            try:
+                self.adb.connect(serial, timeout=self.connect_timeout)
+            except Exception:
+                pass
+        return self.devices_by_serial().get(serial)
+
+    def probe(self, ports):
+        """Ports that accept a TCP connection, in the order they were given."""
+        if not ports:
+            return []
+        with ThreadPoolExecutor(max_workers=len(ports)) as executor:
+            is_open = list(executor.map(lambda port: is_port_open(port, timeout=self.probe_timeout), ports))
+        return [port for port, port_is_open in zip(ports, is_open) if port_is_open]
+
+    def connect_ports(self, ports):
+        serials = [f"127.0.0.1:{port}" for port in self.probe(ports)]
+        if not serials:
+            return []
+        with ThreadPoolExecutor(max_workers=len(serials)) as executor:
+            list(executor.map(self.connect, serials))
+        devices = self.devices_by_serial()
+        return [devices[serial] for serial in serials if serial in devices] + \
+            [device for serial, device in devices.items() if serial not in serials]
+
+    def find_device(self, emulator, serial=None, ports=None):
+        if serial:
+            device = self.devices_by_serial().get(serial) or self.connect(serial)
+            if device is None:
+                raise ConnectionError(f"ADB device '{serial}' not found.")
+            return device
+
+        devices = self.devices_by_serial()
+        cached_serial = self.load_cache().get(emulator)
+        device = None
+        if cached_serial:
+            device = devices.get(cached_serial) or self.connect(cached_serial)
+        if device is None and devices:
+            device = next(iter(devices.values()))
+        if device is None:
+            found = self.connect_ports(candidate_ports() if ports is None else ports)
+            device = found[0] if found else None
+        if device is None:
+            raise ConnectionError("No ADB devices found.")
+        self.remember(emulator, device.serial)
+        return device
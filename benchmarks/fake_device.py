@@ -0,0 +1,393 @@
+"""
+A fake Android device for running the whole bot without an emulator. It speaks enough of
+the ADB server protocol for adbutils and the scrcpy client: it lists one device, accepts
+the scrcpy server push and start, streams a recorded H.264 session over the video socket
+at a fixed rate and logs every control message it receives.
+
+Record or convert a session to a raw Annex-B stream first, for example with
+    ffmpeg -i match.mp4 -c:v libx264 -bsf:v h264_mp4toannexb -an match.h264
+then run from the repository root with
+    python -m benchmarks.fake_device --video match.h264 --port 5038 --log touches.jsonl
+and start the bot with ANDROID_ADB_SERVER_PORT=5038 and adb_serial = "fake-device".
+Stop the server with Ctrl+C to print the latency and input rate report.
+"""
+import argparse
+import json
+import socketserver
+import stat
+import struct
+import threading
+import time
+
+import numpy as np
+
+ACTIONS = {0: "down", 1: "up", 2: "move"}
+VCL_NAL_TYPES = (1, 5)
+PARAMETER_NAL_TYPES = (6, 7, 8, 9)
+# Control message type: (struct format of the payload, field names), text and clipboard
+# messages carry a length prefixed buffer and are read separately
+CONTROL_MESSAGES = {
+    0: (">Biii", ("action", "keycode", "repeat", "meta_state")),
+    2: (">BqiiHHHi", ("action", "pointer_id", "x", "y", "width", "height", "pressure", "buttons")),
+    3: (">iiHHii", ("x", "y", "width", "height", "h_scroll", "v_scroll")),
+    4: (">B", ("action",)),
+    5: ("", ()),
+    6: ("", ()),
+    7: ("", ()),
+    10: (">b", ("mode",)),
+    11: ("", ()),
+}
+CONTROL_NAMES = {0: "keycode", 1: "text", 2: "touch", 3: "scroll", 4: "back_or_screen_on",
+                 5: "expand_notification_panel", 6: "expand_settings_panel", 7: "collapse_panels",
+                 9: "set_clipboard", 10: "set_screen_power_mode", 11: "rotate_device"}
+
+
+def split_nal_units(data):
+    """Splits an Annex-B byte stream into NAL units, each keeping its start code."""
+    starts = []
+    position = data.find(b"\x00\x00\x01")
+    while position != -1:
+        starts.append(position - 1 if position > 0 and data[position - 1] == 0 else position)
+        position = data.find(b"\x00\x00\x01", position + 3)
+    ends = starts[1:] + [len(data)]
+    return [data[start:end] for start, end in zip(starts, ends) if end - start > 4]
+
+
+def nal_type(nal):
+    header = nal.index(b"\x00\x00\x01") + 3
+    return nal[header] & 0x1F
+
+
+def starts_frame(nal):
+    """A slice starts a new picture when first_mb_in_slice is 0, coded as a single 1 bit."""
+    header = nal.index(b"\x00\x00\x01") + 3
+    return len(nal) > header + 1 and bool(nal[header + 1] & 0x80)
+
+
+def access_units(data):
+    """
+    Groups the NAL units of a stream into one chunk per picture. Parameter sets and SEI go
+    with the picture that follows them, so every chunk can be sent on its own.
+    """
+    frames = []
+    pending = []
+    current = None
+    for nal in split_nal_units(data):
+        kind = nal_type(nal)
+        if kind in VCL_NAL_TYPES:
+            if current is None or starts_frame(nal) or pending:
+                if current is not None:
+                    frames.append(b"".join(current))
+                current = pending + [nal]
+                pending = []
+            else:
+                current.append(nal)
+        elif kind in PARAMETER_NAL_TYPES:
+            pending.append(nal)
+    if current is not None:
+        frames.append(b"".join(current))
+    return frames
+
+
+def stream_size(video_path):
+    """Resolution of the first decodable frame, None when OpenCV can't read the stream."""
+    import cv2
+    capture = cv2.VideoCapture(video_path)
+    ok, frame = capture.read()
+    capture.release()
+    return (frame.shape[1], frame.shape[0]) if ok else None
+
+
+def read_exactly(connection, size):
+    buffer = b""
+    while len(buffer) < size:
+        chunk = connection.recv(size - len(buffer))
+        if not chunk:
+            raise ConnectionError("Connection closed.")
+        buffer += chunk
+    return buffer
+
+
+def string_block(text):
+    data = text.encode("utf-8")
+    return f"{len(data):04x}".encode("utf-8") + data
+
+
+class FakeDevice:
+    """
+    One fake device behind a fake ADB server. frames are the H.264 chunks sent in a loop at
+    fps, one per tick. Every control message is kept in events with the time it arrived,
+    the number of frames sent so far and the age of the newest frame, and appended to
+    log_path as a JSON line when one is given.
+    """
+
+    def __init__(self, frames, size, fps=30, serial="fake-device", device_name="Fake Device",
+                 host="127.0.0.1", port=5038, log_path=None):
+        if not frames:
+            raise ValueError("The fake device needs at least one frame to stream.")
+        self.frames = frames
+        self.size = size
+        self.fps = fps
+        self.serial = serial
+        self.device_name = device_name
+        self.log_path = log_path
+        self.events = []
+        self.frames_sent = 0
+        self.last_frame_time = 0.0
+        self.started_at = None
+        self.server_started = False
+        self._lock = threading.Lock()
+        self._abstract_connections = 0
+        self._log_file = None
+        device = self
+
+        class Handler(socketserver.BaseRequestHandler):
+
+            def handle(self):
+                try:
+                    device.handle_connection(self.request)
+                except (ConnectionError, OSError):
+                    pass
+
+        self.server = socketserver.ThreadingTCPServer((host, port), Handler, bind_and_activate=False)
+        self.server.daemon_threads = True
+        self.server.allow_reuse_address = True
+        self.server.server_bind()
+        self.server.server_activate()
+        self.port = self.server.server_address[1]
+        self._thread = None
+
+    @classmethod
+    def from_video(cls, video_path, size=None, **kwargs):
+        with open(video_path, "rb") as f:
+            frames = access_units(f.read())
+        size = size or stream_size(video_path) or (1920, 1080)
+        return cls(frames, size, **kwargs)
+
+    def start(self):
+        if self.log_path:
+            self._log_file = open(self.log_path, "a")
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self.server.serve_forever, name="FakeDevice", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+
+    # --- ADB smart socket protocol ---
+
+    def handle_connection(self, connection):
+        while True:
+            try:
+                length = int(read_exactly(connection, 4), 16)
+            except ConnectionError:
+                return
+            command = read_exactly(connection, length).decode("utf-8")
+            if not self.handle_command(connection, command):
+                return
+
+    def handle_command(self, connection, command):
+        """Answers one request, returns True when the connection takes another one."""
+        if command == "host:version":
+            connection.sendall(b"OKAY" + string_block(f"{41:04x}"))
+        elif command in ("host:devices", "host:devices-l"):
+            connection.sendall(b"OKAY" + string_block(f"{self.serial}\tdevice\n"))
+        elif command.startswith("host:connect:"):
+            connection.sendall(b"OKAY" + string_block(f"already connected to {self.serial}"))
+        elif command.startswith("host:disconnect:"):
+            connection.sendall(b"OKAY" + string_block(""))
+        elif command.startswith(("host:tport:serial:", "host:transport:")):
+            serial = command.rsplit(":", 1)[1]
+            if serial != self.serial:
+                return self.fail(connection, f"device '{serial}' not found")
+            connection.sendall(b"OKAY" + (struct.pack("<Q", 1) if "tport" in command else b""))
+            return True
+        elif command.startswith("host-serial:"):
+            _, serial, request = command.split(":", 2)
+            if serial != self.serial:
+                return self.fail(connection, f"device '{serial}' not found")
+            answers = {"get-state": "device", "get-serialno": self.serial, "features": ""}
+            connection.sendall(b"OKAY" + string_block(answers.get(request, "")))
+        elif command.startswith("shell:"):
+            self.shell(connection, command[len("shell:"):])
+        elif command == "sync:":
+            connection.sendall(b"OKAY")
+            self.sync(connection)
+        elif command == "localabstract:scrcpy":
+            if not self.server_started:
+                return self.fail(connection, "connection refused")
+            with self._lock:
+                index = self._abstract_connections
+                self._abstract_connections += 1
+            connection.sendall(b"OKAY")
+            if index % 2 == 0:
+                self.stream_video(connection)
+            else:
+                self.read_control(connection)
+        else:
+            return self.fail(connection, f"unsupported command '{command}'")
+        return False
+
+    def fail(self, connection, message):
+        connection.sendall(b"FAIL" + string_block(message))
+        return False
+
+    def shell(self, connection, command):
+        connection.sendall(b"OKAY")
+        if "app_process" in command:
+            # The scrcpy server: the client waits for its first log line, then connects
+            with self._lock:
+                self.server_started = True
+                self._abstract_connections = 0
+            connection.sendall(b"[server] INFO: Device: fake device\n")
+            while connection.recv(4096):
+                pass
+            return
+        if command.startswith("wm size"):
+            connection.sendall(f"Physical size: {self.size[0]}x{self.size[1]}\n".encode("utf-8"))
+        elif command.startswith("dumpsys display"):
+            connection.sendall(b"  mCurrentOrientation=0\n  orientation=0\n")
+        self.log_event("shell", {"command": command})
+
+    def sync(self, connection):
+        while True:
+            try:
+                request = read_exactly(connection, 4)
+            except ConnectionError:
+                return
+            path = read_exactly(connection, struct.unpack("<I", read_exactly(connection, 4))[0]).decode("utf-8")
+            if request == b"STAT":
+                mode = stat.S_IFDIR | 0o771 if path.rstrip("/") in ("/data/local/tmp", "/sdcard") else 0
+                connection.sendall(b"STAT" + struct.pack("<III", mode, 0, 0))
+            elif request == b"SEND":
+                size = 0
+                while True:
+                    chunk_id, chunk_size = struct.unpack("<4sI", read_exactly(connection, 8))
+                    if chunk_id == b"DONE":
+                        break
+                    size += len(read_exactly(connection, chunk_size))
+                self.log_event("push", {"path": path.rsplit(",", 1)[0], "size": size})
+                connection.sendall(b"OKAY" + struct.pack("<I", 0))
+            else:
+                return
+
+    # --- scrcpy ---
+
+    def stream_video(self, connection):
+        name = self.device_name.encode("utf-8")[:63]
+        connection.sendall(b"\x00" + name.ljust(64, b"\x00") + struct.pack(">HH", *self.size))
+        next_time = time.perf_counter()
+        index = 0
+        while True:
+            connection.sendall(self.frames[index % len(self.frames)])
+            with self._lock:
+                self.frames_sent += 1
+                self.last_frame_time = time.time()
+            index += 1
+            next_time += 1 / self.fps
+            time.sleep(max(0.0, next_time - time.perf_counter()))
+
+    def read_control(self, connection):
+        while True:
+            try:
+                message_type = read_exactly(connection, 1)[0]
+            except ConnectionError:
+                return
+            name = CONTROL_NAMES.get(message_type, f"unknown_{message_type}")
+            if message_type == 1:
+                fields = {"text": self.read_buffer(connection).decode("utf-8", errors="replace")}
+            elif message_type == 9:
+                paste = read_exactly(connection, 1)[0]
+                fields = {"paste": bool(paste), "text": self.read_buffer(connection).decode("utf-8", errors="replace")}
+            elif message_type in CONTROL_MESSAGES:
+                message_format, field_names = CONTROL_MESSAGES[message_type]
+                values = struct.unpack(message_format, read_exactly(connection, struct.calcsize(message_format)))
+                fields = dict(zip(field_names, values))
+                if message_type == 2:
+                    fields["action"] = ACTIONS.get(fields["action"], fields["action"])
+            else:
+                # Without its size the rest of the stream can't be parsed any more
+                self.log_event(name, {})
+                return
+            self.log_event(name, fields)
+
+    def read_buffer(self, connection):
+        return read_exactly(connection, struct.unpack(">i", read_exactly(connection, 4))[0])
+
+    # --- report ---
+
+    def log_event(self, kind, fields):
+        now = time.time()
+        with self._lock:
+            event = {"time": now, "type": kind, "frames_sent": self.frames_sent,
+                     "frame_age": now - self.last_frame_time if self.last_frame_time else None}
+            event.update(fields)
+            self.events.append(event)
+            if self._log_file is not None:
+                self._log_file.write(json.dumps(event) + "\n")
+                self._log_file.flush()
+
+    def touches(self):
+        with self._lock:
+            return [event for event in self.events if event["type"] == "touch"]
+
+    def report(self):
+        """
+        Input rate and latency of the control messages. frame_age is how old the newest
+        streamed frame was when a touch arrived, the part of capture to input latency the
+        bot adds on top of decoding. ips counts touch downs and moves, one per decision.
+        """
+        touches = self.touches()
+        elapsed = max(time.time() - self.started_at, 1e-9) if self.started_at else 0.0
+        decisions = [event for event in touches if event["action"] in ("down", "move")]
+        ages = np.array([event["frame_age"] for event in touches if event["frame_age"] is not None])
+        report = {
+            "elapsed": elapsed,
+            "frames_sent": self.frames_sent,
+            "touches": len(touches),
+            "ips": len(decisions) / elapsed if elapsed else 0.0,
+        }
+        if len(ages):
+            report.update({f"frame_age_p{q}": float(np.percentile(ages, q)) for q in (50, 95, 99)})
+            report["frame_age_max"] = float(ages.max())
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--video", required=True, help="Raw Annex-B H.264 recording")
+    parser.add_argument("--port", type=int, default=5038)
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--serial", default="fake-device")
+    parser.add_argument("--size", help="Stream resolution as WIDTHxHEIGHT, read from the video by default")
+    parser.add_argument("--log", help="Appends every received control message to this file as JSON lines")
+    parser.add_argument("--duration", type=float, help="Stops after this many seconds")
+    args = parser.parse_args()
+
+    size = tuple(int(value) for value in args.size.lower().split("x")) if args.size else None
+    device = FakeDevice.from_video(args.video, size, fps=args.fps, serial=args.serial, port=args.port,
+                                   log_path=args.log)
+    device.start()
+    print(f"Fake device '{device.serial}' streaming {len(device.frames)} frames at "
+          f"{device.size[0]}x{device.size[1]}, {args.fps:g} fps on port {device.port}")
+    try:
+        deadline = None if args.duration is None else time.time() + args.duration
+        while deadline is None or time.time() < deadline:
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        device.stop()
+    for key, value in device.report().items():
+        print(f"{key:>16}: {value:.4f}" if isinstance(value, float) else f"{key:>16}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Compares the shapely and raster line of sight backends on synthetic ticks.
+Run from the repository root with: python -m benchmarks.line_of_sight
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from line_of_sight import RasterWallIndex, ShapelyWallIndex
+
+TILE_SIZE = 60
+MOVES = [(0, -1), (-1, 0), (0, 1), (1, 0), (-1, -1), (1, -1), (-1, 1), (1, 1)]
+
+
+def random_walls(count, width, height, rng):
+    walls = []
+    for _ in range(count):
+        x = rng.randrange(0, width // TILE_SIZE) * TILE_SIZE
+        y = rng.randrange(0, height // TILE_SIZE) * TILE_SIZE
+        walls.append([x, y, x + TILE_SIZE, y + TILE_SIZE])
+    return walls
+
+
+def random_tick(enemies, width, height, rng):
+    player = (rng.uniform(0, width), rng.uniform(0, height))
+    ends = [(player[0] + dx * TILE_SIZE, player[1] + dy * TILE_SIZE) for dx, dy in MOVES]
+    ends += [(rng.uniform(0, width), rng.uniform(0, height)) for _ in range(enemies)]
+    return [player] * len(ends), ends
+
+
+def run(index, ticks, wall_sets):
+    results = []
+    start = time.perf_counter()
+    for walls, (starts, ends) in zip(wall_sets, ticks):
+        index.update(walls)
+        results.append(index.segments_blocked(starts, ends))
+    elapsed = time.perf_counter() - start
+    return elapsed, np.concatenate(results)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ticks", type=int, default=2000)
+    parser.add_argument("--walls", type=int, default=60)
+    parser.add_argument("--enemies", type=int, default=9)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    width, height = 1920, 1080
+    # A new wall set every 5 ticks, like the default wall_detection treshold at ~25 IPS
+    layouts = [random_walls(args.walls, width, height, rng) for _ in range(args.ticks // 5 + 1)]
+    wall_sets = [layouts[i // 5] for i in range(args.ticks)]
+    ticks = [random_tick(args.enemies, width, height, rng) for _ in range(args.ticks)]
+
+    shapely_time, shapely_results = run(ShapelyWallIndex(), ticks, wall_sets)
+    raster_time, raster_results = run(RasterWallIndex(TILE_SIZE), ticks, wall_sets)
+    agreement = (shapely_results == raster_results).mean() * 100
+
+    queries = len(shapely_results)
+    print(f"{args.ticks} ticks, {args.walls} walls, {queries // args.ticks} segments per tick")
+    print(f"shapely: {shapely_time / args.ticks * 1e6:8.1f} us/tick")
+    print(f"raster:  {raster_time / args.ticks * 1e6:8.1f} us/tick")
+    print(f"agreement: {agreement:.2f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import json
+import os
+
+import numpy as np
+
+brawlers_info_file_path = "cfg/brawlers_info.json"
+
+
+class BrawlerCatalog:
+    """
+    Brawler data from cfg/brawlers_info.json, loaded once. Names are interned to integer
+    ids that index compact tables of ranges, wall ignore flags and super types.
+    """
+
+    def __init__(self, brawlers_info):
+        self.names = list(brawlers_info)
+        self.ids = {name: brawler_id for brawler_id, name in enumerate(self.names)}
+        infos = [brawlers_info[name] for name in self.names]
+        # safe_range, attack_range, super_range at 1920x1080
+        self.base_ranges = np.array([[info['safe_range'], info['attack_range'], info['super_range']] for info in infos],
+                                    dtype=float).reshape(-1, 3)
+        self.ignore_walls_for_attacks = np.array([info['ignore_walls_for_attacks'] for info in infos], dtype=bool)
+        self.ignore_walls_for_supers = np.array([info['ignore_walls_for_supers'] for info in infos], dtype=bool)
+        self.super_type_names = sorted({info['super_type'] for info in infos})
+        super_type_ids = {super_type: i for i, super_type in enumerate(self.super_type_names)}
+        self.super_types = np.array([super_type_ids[info['super_type']] for info in infos], dtype=np.int8)
+        self.scale_factor = None
+        self.ranges = self.base_ranges.astype(int)
+
+    @classmethod
+    def from_file(cls, file_path=brawlers_info_file_path):
+        if not os.path.exists(file_path):
+            return cls({})
+        with open(file_path, 'r') as f:
+            return cls(json.load(f))
+
+    def __contains__(self, brawler):
+        return brawler in self.ids
+
+    def __len__(self):
+        return len(self.names)
+
+    def id_of(self, brawler):
+        brawler_id = self.ids.get(brawler)
+        if brawler_id is None:
+            raise ValueError(f"Brawler '{brawler}' not found in brawlers info.")
+        return brawler_id
+
+    def set_scale_factor(self, scale_factor):
+        if scale_factor and scale_factor != self.scale_factor:
+            self.scale_factor = scale_factor
+            self.ranges = (self.base_ranges * scale_factor).astype(int)
+
+    def get_ranges(self, brawler, scale_factor=None):
+        """[safe_range, attack_range, super_range] in screen pixels."""
+        self.set_scale_factor(scale_factor)
+        return self.ranges[self.id_of(brawler)].tolist()
+
+    def ignores_walls(self, brawler, skill_type):
+        if skill_type == "attack":
+            return bool(self.ignore_walls_for_attacks[self.id_of(brawler)])
+        elif skill_type == "super":
+            return bool(self.ignore_walls_for_supers[self.id_of(brawler)])
+        raise ValueError("skill_type must be either 'attack' or 'super'")
+
+    def super_type(self, brawler):
+        return self.super_type_names[self.super_types[self.id_of(brawler)]]
+
+
+_catalog = None
+
+
+def get_brawler_catalog():
+    global _catalog
+    if _catalog is None:
+        _catalog = BrawlerCatalog.from_file()
+    return _catalog
+
+
+def reset_brawler_catalog():
+    """Drops the loaded catalog, the next get_brawler_catalog call reads the file again."""
+    global _catalog
+    _catalog = None
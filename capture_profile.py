@@ -0,0 +1,54 @@
+class CaptureProfile:
+    """
+    How scrcpy streams the device: max_width, max_fps and bitrate are handed to the scrcpy
+    server. max_width 0 streams at the native resolution, a width like 1280 has frames
+    encoded and decoded at about the size the models use. crop (x1, y1, x2, y2 in device
+    pixels) cuts the game area out of the stream on our side.
+    Everything downstream works in cropped frame pixels, touches are mapped back here.
+    """
+
+    def __init__(self, max_width=0, max_fps=30, bitrate=4000000, crop=None):
+        self.max_width = int(max_width)
+        self.max_fps = int(max_fps)
+        self.bitrate = int(bitrate)
+        self.crop = tuple(crop) if crop else None
+        self.device_size = None
+        self.crop_box = None
+        self._stream_size = None
+
+    @classmethod
+    def from_config(cls, general_config):
+        return cls(
+            max_width=general_config.get("capture_max_width", 0),
+            max_fps=general_config.get("capture_max_fps", 30),
+            bitrate=general_config.get("capture_bitrate", 4000000),
+            crop=general_config.get("capture_crop") or None,
+        )
+
+    def client_kwargs(self):
+        return {"max_width": self.max_width, "max_fps": self.max_fps, "bitrate": self.bitrate}
+
+    def set_stream_size(self, width, height):
+        """Scales the crop from device pixels to stream pixels, once per stream size."""
+        if self._stream_size == (width, height):
+            return
+        self._stream_size = (width, height)
+        if self.crop is None:
+            self.crop_box = None
+            return
+        scale = width / self.device_size[0] if self.device_size else 1.0
+        x1, y1, x2, y2 = (int(round(value * scale)) for value in self.crop)
+        self.crop_box = (max(x1, 0), max(y1, 0), min(x2, width), min(y2, height))
+
+    def crop_frame(self, frame):
+        self.set_stream_size(frame.shape[1], frame.shape[0])
+        if self.crop_box is None:
+            return frame
+        x1, y1, x2, y2 = self.crop_box
+        return frame[y1:y2, x1:x2]
+
+    def to_stream(self, x, y):
+        """Cropped frame coordinates to the stream coordinates scrcpy expects for touches."""
+        if self.crop_box is None:
+            return int(x), int(y)
+        return int(x) + self.crop_box[0], int(y) + self.crop_box[1]
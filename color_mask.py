@@ -0,0 +1,74 @@
+import cv2
+import numpy as np
+
+_tables = {}
+
+
+def quantize(image, bits=7, channel_order="rgb", stride=1):
+    """Packs every pixel of an RGB or BGR array into one lookup table index of 3 * bits bits."""
+    image = np.asarray(image)
+    if stride > 1:
+        image = image[::stride, ::stride]
+    shift = 8 - bits
+    red, blue = (0, 2) if channel_order == "rgb" else (2, 0)
+    indices = (image[..., red] >> shift).astype(np.uint32) << (2 * bits)
+    indices |= (image[..., 1] >> shift).astype(np.uint32) << bits
+    indices |= image[..., blue] >> shift
+    return indices
+
+
+def _build_table(low_hsv, high_hsv, bits):
+    """
+    Range membership of every quantized color. Each bin is sampled at its lowest and
+    highest value per channel, every color of a bin at 7 bits, and belongs to the range
+    when any of its samples does. A vote would drop near gray bins, where a step of one in
+    a channel swings the hue anywhere, although the pure gray of the bin is in range.
+    """
+    step = 1 << (8 - bits)
+    offsets = np.unique([0, step - 1])
+    levels = (np.arange(1 << bits)[:, None] * step + offsets).ravel().astype(np.uint8)
+    green, blue = np.meshgrid(levels, levels, indexing="ij")
+    low_hsv, high_hsv = np.array(low_hsv), np.array(high_hsv)
+    table = np.empty((1 << bits, 1 << (2 * bits)), dtype=bool)
+    # One red level at a time keeps the sampled colors small
+    for red_bin in range(1 << bits):
+        red = np.repeat(levels[red_bin * len(offsets):(red_bin + 1) * len(offsets)], green.size)
+        colors = np.stack([red, np.tile(green.ravel(), len(offsets)), np.tile(blue.ravel(), len(offsets))], axis=-1)
+        inside = cv2.inRange(cv2.cvtColor(colors.reshape(-1, 1, 3), cv2.COLOR_RGB2HSV), low_hsv, high_hsv) > 0
+        inside = inside.reshape(len(offsets), 1 << bits, len(offsets), 1 << bits, len(offsets))
+        table[red_bin] = inside.any(axis=(0, 2, 4)).ravel()
+    return table.ravel()
+
+
+class ColorRange:
+    """
+    Counts pixels inside an OpenCV HSV range without converting the image: the range is
+    precomputed into a table over quantized RGB colors, and pixels are looked up straight
+    from the RGB or BGR buffer. The table is built with the range, a few tenths of a
+    second that belong at startup rather than in the first tick that counts pixels.
+    Tables are shared between equal ranges.
+    """
+
+    def __init__(self, low_hsv, high_hsv, bits=7):
+        self.low_hsv = tuple(low_hsv)
+        self.high_hsv = tuple(high_hsv)
+        self.bits = bits
+        key = (self.low_hsv, self.high_hsv, self.bits)
+        if key not in _tables:
+            _tables[key] = _build_table(self.low_hsv, self.high_hsv, self.bits)
+        self.table = _tables[key]
+
+    def mask(self, indices):
+        return self.table[indices]
+
+    def count_indexed(self, indices):
+        return int(np.count_nonzero(self.table[indices]))
+
+    def count(self, image, channel_order="rgb", stride=1):
+        """
+        Pixels of the image inside the range. With a stride only every stride-th pixel of
+        every stride-th row is looked up and the count is scaled back to the full image,
+        so thresholds keep their full resolution meaning.
+        """
+        indices = quantize(image, self.bits, channel_order, stride)
+        return self.count_indexed(indices) * stride * stride
@@ -0,0 +1,210 @@
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+
+import cv2
+import numpy as np
+
+
+class FrameSource(ABC):
+    """
+    Where WindowController gets its frames from. Frames are BGR arrays, as scrcpy decodes
+    them, and are handed out without a copy so a source must never modify a frame after
+    publishing it. get_latest_frame returns (frame, frame_time), (None, 0.0) before the
+    first frame.
+    """
+
+    def __init__(self):
+        self.frame_lock = threading.Lock()
+        self.last_frame = None
+        self.last_frame_time = 0.0
+
+    @abstractmethod
+    def start(self):
+        pass
+
+    @abstractmethod
+    def stop(self):
+        pass
+
+    def publish(self, frame):
+        with self.frame_lock:
+            self.last_frame = frame
+            self.last_frame_time = time.time()
+
+    def get_latest_frame(self):
+        with self.frame_lock:
+            return self.last_frame, self.last_frame_time
+
+    def clear(self):
+        with self.frame_lock:
+            self.last_frame = None
+            self.last_frame_time = 0.0
+
+
+class ReplayFrameSource(FrameSource):
+    """
+    Base of the offline sources. With an fps the frames are published from a thread at
+    that rate, like a live stream. Without one every get_latest_frame call advances by
+    exactly one frame, which makes benchmarks and tests deterministic.
+    read_frame returns the next BGR frame or None at the end.
+    """
+
+    def __init__(self, fps=None, loop=True):
+        super().__init__()
+        self.fps = fps
+        self.loop = loop
+        self.frames_read = 0
+        self.finished = False
+        self._running = False
+        self._thread = None
+
+    @abstractmethod
+    def read_frame(self):
+        pass
+
+    @abstractmethod
+    def rewind(self):
+        pass
+
+    def next_frame(self):
+        frame = self.read_frame()
+        if frame is None and self.loop and self.frames_read > 0:
+            self.rewind()
+            frame = self.read_frame()
+        if frame is None:
+            self.finished = True
+            return None
+        self.frames_read += 1
+        return frame
+
+    def start(self):
+        if self.fps is None or self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def get_latest_frame(self):
+        if self.fps is None and not self.finished:
+            frame = self.next_frame()
+            if frame is not None:
+                self.publish(frame)
+        return super().get_latest_frame()
+
+    def _run(self):
+        next_time = time.perf_counter()
+        while self._running:
+            frame = self.next_frame()
+            if frame is None:
+                return
+            self.publish(frame)
+            next_time += 1 / self.fps
+            time.sleep(max(0.0, next_time - time.perf_counter()))
+
+
+class VideoFrameSource(ReplayFrameSource):
+    """Replays a recorded video (MP4 or anything else OpenCV can read)."""
+
+    def __init__(self, path, fps=None, loop=True):
+        super().__init__(fps, loop)
+        self.path = path
+        self.capture = cv2.VideoCapture(path)
+        if not self.capture.isOpened():
+            raise FileNotFoundError(f"Could not open video '{path}'.")
+
+    def read_frame(self):
+        ok, frame = self.capture.read()
+        return frame if ok else None
+
+    def rewind(self):
+        self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+
+class ImageDirectoryFrameSource(ReplayFrameSource):
+    """Replays the images of a directory in file name order."""
+
+    image_extensions = (".png", ".jpg", ".jpeg", ".bmp")
+
+    def __init__(self, directory, fps=None, loop=True):
+        super().__init__(fps, loop)
+        self.paths = sorted(os.path.join(directory, file_name) for file_name in os.listdir(directory)
+                            if file_name.lower().endswith(self.image_extensions))
+        if not self.paths:
+            raise FileNotFoundError(f"No images found in '{directory}'.")
+        self.index = 0
+
+    def read_frame(self):
+        if self.index >= len(self.paths):
+            return None
+        frame = cv2.imread(self.paths[self.index])
+        self.index += 1
+        return frame
+
+    def rewind(self):
+        self.index = 0
+
+
+class SyntheticFrameSource(ReplayFrameSource):
+    """
+    Generated frames. generator(index) returns a BGR frame, the default one scrolls a
+    gradient so consecutive frames differ like a moving camera would.
+    """
+
+    def __init__(self, width=1920, height=1080, fps=None, frame_count=None, generator=None):
+        super().__init__(fps, loop=False)
+        self.width = width
+        self.height = height
+        self.frame_count = frame_count
+        self.generator = generator or self.scrolling_gradient
+        self.index = 0
+
+    def scrolling_gradient(self, index):
+        x = (np.arange(self.width) + index * 8) % 256
+        y = np.arange(self.height) % 256
+        frame = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        frame[..., 0] = x[None, :]
+        frame[..., 1] = y[:, None]
+        frame[..., 2] = (index * 4) % 256
+        return frame
+
+    def read_frame(self):
+        if self.frame_count is not None and self.index >= self.frame_count:
+            return None
+        frame = self.generator(self.index)
+        self.index += 1
+        return frame
+
+    def rewind(self):
+        self.index = 0
+
+
+class NullInputSink:
+    """Swallows every touch, for running the bot against recorded footage."""
+
+    def send(self, action, x, y, pointer_id):
+        pass
+
+
+class RecordingInputSink:
+    """Keeps every touch as (time, action, x, y, pointer_id) so runs can be inspected or compared."""
+
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+
+    def send(self, action, x, y, pointer_id):
+        with self._lock:
+            self.events.append((time.time(), action, x, y, pointer_id))
+
+    def actions(self, pointer_id=None):
+        with self._lock:
+            return [(action, x, y) for _, action, x, y, event_pointer in self.events
+                    if pointer_id is None or event_pointer == pointer_id]
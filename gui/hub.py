@@ -4,15 +4,14 @@ import customtkinter as ctk
 import webbrowser
 import os
 import time
-import pyautogui
 from PIL import Image
 import tkinter as tk
-import bettercam
-from utils import load_toml_as_dict, save_dict_as_toml, get_discord_link, get_dpi_scale
+from platform_support import get_dpi_scale, get_screen_size
+from utils import load_toml_as_dict, save_dict_as_toml, get_discord_link
 from packaging import version
 
 orig_screen_width, orig_screen_height = 1920, 1080
-width, height = pyautogui.size()
+width, height = get_screen_size()
 width_ratio = width / orig_screen_width
 height_ratio = height / orig_screen_height
 scale_factor = min(width_ratio, height_ratio)
@@ -81,6 +80,10 @@ class Hub:
         self.general_config.setdefault("long_press_star_drop", "no")
         self.general_config.setdefault("trophies_multiplier", 1.0)
         self.general_config.setdefault("current_emulator", "LDPlayer")
+        self.general_config.setdefault("capture_max_width", 0)
+        self.general_config.setdefault("capture_max_fps", 30)
+        self.general_config.setdefault("capture_bitrate", 4000000)
+        self.general_config.setdefault("capture_crop", [])
 
         # -----------------------------------------------------------------------------------------
         # Appearance
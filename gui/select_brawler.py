@@ -3,15 +3,15 @@ import tkinter as tk
 from math import ceil
 
 import customtkinter as ctk
-import pyautogui
 from PIL import Image
 from customtkinter import CTkImage
-from utils import load_toml_as_dict, update_toml_file, save_brawler_icon, get_dpi_scale
+from platform_support import get_dpi_scale, get_screen_size
+from utils import load_toml_as_dict, update_toml_file, save_brawler_icon
 from tkinter import filedialog
 
 debug = load_toml_as_dict("cfg/general_config.toml")['super_debug'] == "yes"
 orig_screen_width, orig_screen_height = 1920, 1080
-width, height = pyautogui.size()
+width, height = get_screen_size()
 width_ratio = width / orig_screen_width
 height_ratio = height / orig_screen_height
 scale_factor = min(width_ratio, height_ratio)
@@ -0,0 +1,116 @@
+"""
+Starts the bot without the GUI, for scripted launches and benchmarks.
+    python headless.py --brawlers latest_brawler_data.json
+    python headless.py --brawler shelly --type trophies --push-until 750 --trophies 500 --auto-pick
+    python headless.py --brawlers queue.json --serial 127.0.0.1:5555 --set max_ips=20
+The queue file has the format the brawler selection window saves and loads.
+--set overrides a value of cfg/general_config.toml for this run only.
+"""
+import argparse
+import json
+
+import toml
+
+general_config_path = "cfg/general_config.toml"
+
+
+def normalize_brawler_entry(entry):
+    """Fills in a queue entry the way the brawler selection window does."""
+    push_until = entry.get("push_until", "")
+    data = {
+        "brawler": entry["brawler"].lower(),
+        "push_until": int(push_until) if str(push_until).isdigit() else "",
+        "trophies": int(entry.get("trophies") or 0),
+        "wins": int(entry["wins"]) if str(entry.get("wins", "")).isdigit() else "",
+        "type": entry.get("type", ""),
+        "automatically_pick": bool(entry.get("automatically_pick", False)),
+        "win_streak": int(entry.get("win_streak") or 0),
+    }
+    if data["type"] == "trophies" and data["wins"] == "":
+        data["wins"] = 0
+    if data["type"] == "":
+        data["type"] = "trophies" if data["trophies"] <= (data["wins"] or 0) else "wins"
+    return data
+
+
+def is_finished(entry):
+    return entry["push_until"] != "" and entry[entry["type"]] != "" and entry["push_until"] <= entry[entry["type"]]
+
+
+def load_brawler_queue(file_path):
+    """Reads a saved queue and drops the brawlers that already reached their goal."""
+    with open(file_path, 'r') as f:
+        entries = json.load(f)
+    if not isinstance(entries, list):
+        raise ValueError(f"'{file_path}' should contain a list of brawler entries.")
+    return [entry for entry in map(normalize_brawler_entry, entries) if not is_finished(entry)]
+
+
+def parse_override(text):
+    """key=value, the value is read as a TOML value and kept as a string when it isn't one."""
+    key, separator, value = text.partition("=")
+    if not separator or not key.strip():
+        raise argparse.ArgumentTypeError(f"Expected key=value, got '{text}'.")
+    try:
+        value = toml.loads(f"value = {value}")["value"]
+    except toml.TomlDecodeError:
+        pass
+    return key.strip(), value
+
+
+def build_queue(args, known_brawlers=None):
+    if args.brawlers:
+        queue = load_brawler_queue(args.brawlers)
+    elif args.brawler:
+        queue = [normalize_brawler_entry({
+            "brawler": args.brawler, "push_until": args.push_until, "trophies": args.trophies,
+            "wins": args.wins, "type": args.type, "automatically_pick": args.auto_pick,
+            "win_streak": args.win_streak,
+        })]
+    else:
+        raise ValueError("Give a queue file with --brawlers or a single brawler with --brawler.")
+    if not queue:
+        raise ValueError("Every brawler of the queue already reached its goal.")
+    if known_brawlers:
+        unknown = [entry["brawler"] for entry in queue if entry["brawler"] not in known_brawlers]
+        if unknown:
+            raise ValueError(f"Unknown brawlers: {', '.join(unknown)}.")
+    return queue
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the bot without the GUI.")
+    parser.add_argument("--brawlers", help="JSON brawler queue, as saved by the brawler selection window")
+    parser.add_argument("--brawler", help="Single brawler to push, instead of a queue file")
+    parser.add_argument("--type", choices=["trophies", "wins"], default="")
+    parser.add_argument("--push-until", default="")
+    parser.add_argument("--trophies", type=int, default=0)
+    parser.add_argument("--wins", default="")
+    parser.add_argument("--win-streak", type=int, default=0)
+    parser.add_argument("--auto-pick", action="store_true", help="Select the brawler in the lobby first")
+    parser.add_argument("--serial", help="ADB serial of the device, same as adb_serial")
+    parser.add_argument("--set", dest="overrides", action="append", type=parse_override, default=[],
+                        metavar="KEY=VALUE", help="Overrides a general_config.toml value for this run")
+    parser.add_argument("--skip-updates", action="store_true",
+                        help="Don't refresh icons, brawler info and the wall model before starting")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Overrides have to be in place before the bot modules read the config at import time
+    from utils import set_config_override, get_brawler_list, save_brawler_data
+    for key, value in args.overrides:
+        set_config_override(general_config_path, key, value)
+    if args.serial:
+        set_config_override(general_config_path, "adb_serial", args.serial)
+
+    from pyla_runner import prepare_startup, pyla_main
+    all_brawlers = get_brawler_list() if args.skip_updates else prepare_startup()
+    queue = build_queue(args, set(all_brawlers))
+    save_brawler_data(queue)
+    pyla_main(queue)
+
+
+if __name__ == "__main__":
+    main()
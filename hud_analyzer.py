@@ -0,0 +1,76 @@
+import numpy as np
+from PIL import Image
+
+from color_mask import ColorRange, quantize
+
+# name: (x1, y1, x2, y2 at 1920x1080, low HSV, high HSV)
+HUD_INDICATORS = {
+    "hypercharge": ((1350, 940, 1450, 1050), (137, 158, 159), (179, 255, 255)),
+    "gadget": ((1580, 930, 1700, 1050), (57, 219, 165), (62, 255, 255)),
+    "super": ((1460, 830, 1560, 930), (17, 170, 200), (27, 255, 255)),
+}
+
+
+class HudAnalyzer:
+    """
+    Reads the super, gadget and hypercharge buttons in one pass: the bottom right HUD
+    region holding the three of them is cut out and quantized once per tick, and skipped
+    entirely while it looks the same as on the previous tick. pixel_minimums are counts at
+    1920x1080 and are scaled with the area of the capture resolution.
+    """
+
+    def __init__(self, pixel_minimums, indicators=None, change_threshold=2.0, change_stride=8):
+        self.pixel_minimums = pixel_minimums
+        self.indicators = indicators or HUD_INDICATORS
+        self.color_ranges = {name: ColorRange(low_hsv, high_hsv)
+                             for name, (_, low_hsv, high_hsv) in self.indicators.items()}
+        self.change_threshold = change_threshold
+        self.change_stride = change_stride
+        self.resolution = None
+        self.region = None
+        self.rects = {}
+        self.area_ratio = 1.0
+        self.pixel_counts = {name: 0 for name in self.indicators}
+        self.ready = {name: False for name in self.indicators}
+        self._last_sample = None
+
+    def set_resolution(self, width, height):
+        if self.resolution == (width, height):
+            return
+        self.resolution = (width, height)
+        width_ratio, height_ratio = width / 1920, height / 1080
+        self.area_ratio = width_ratio * height_ratio
+        rects = {name: (int(x1 * width_ratio), int(y1 * height_ratio), int(x2 * width_ratio), int(y2 * height_ratio))
+                 for name, ((x1, y1, x2, y2), _, _) in self.indicators.items()}
+        self.region = (min(r[0] for r in rects.values()), min(r[1] for r in rects.values()),
+                       max(r[2] for r in rects.values()), max(r[3] for r in rects.values()))
+        # Indicator rects relative to the HUD region
+        self.rects = {name: (x1 - self.region[0], y1 - self.region[1], x2 - self.region[0], y2 - self.region[1])
+                      for name, (x1, y1, x2, y2) in rects.items()}
+        self._last_sample = None
+
+    def extract_region(self, frame):
+        """HUD region as an RGB array, without copying the whole frame."""
+        x1, y1, x2, y2 = self.region
+        if isinstance(frame, Image.Image):
+            return np.asarray(frame.crop(self.region))
+        return np.asarray(frame)[y1:y2, x1:x2]
+
+    def analyze(self, frame):
+        if isinstance(frame, Image.Image):
+            self.set_resolution(*frame.size)
+        else:
+            self.set_resolution(frame.shape[1], frame.shape[0])
+        region = self.extract_region(frame)
+        sample = region[::self.change_stride, ::self.change_stride].astype(np.int16)
+        if (self._last_sample is not None and self._last_sample.shape == sample.shape
+                and np.abs(sample - self._last_sample).mean() < self.change_threshold):
+            return self.ready
+        self._last_sample = sample
+
+        indices = quantize(region)
+        for name, color_range in self.color_ranges.items():
+            x1, y1, x2, y2 = self.rects[name]
+            self.pixel_counts[name] = color_range.count_indexed(indices[y1:y2, x1:x2])
+            self.ready[name] = self.pixel_counts[name] > self.pixel_minimums[name] * self.area_ratio
+        return self.ready
@@ -0,0 +1,112 @@
+import heapq
+import itertools
+import threading
+import time
+
+
+class InputDispatcher:
+    """
+    Delivers touch events from a background thread so the caller never sleeps between a
+    touch down and its touch up. Every event is scheduled at an absolute time on a queue;
+    events of the same pointer are always sent in the order they were scheduled and never
+    before the previous event of that pointer. A coalesced move replaces the pointer's
+    last move if that one was not sent yet, so a burst becomes a single control message.
+    send(action, x, y, pointer_id) receives action "down", "move" or "up".
+    Every event carries the tag that was set when it was scheduled (the trace of the frame
+    being processed), on_sent(tag, action, sent_time) is called once it was sent.
+    """
+
+    def __init__(self, send, tap_gap=0.02, on_sent=None):
+        self.send = send
+        self.tap_gap = tap_gap
+        self.on_sent = on_sent
+        self.tag = None
+        # (due time, sequence, action, x, y, pointer_id, tag)
+        self._queue = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition(threading.RLock())
+        self._busy_until = {}
+        # pointer_id: last queued event, while it was not sent yet
+        self._last_queued = {}
+        self._sending = False
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="InputDispatcher", daemon=True)
+        self._thread.start()
+
+    def schedule(self, action, x, y, pointer_id, at=None, coalesce=False):
+        """Queues one event, returns the time it will be sent at."""
+        with self._condition:
+            last_queued = self._last_queued.get(pointer_id)
+            if coalesce and action == "move" and last_queued is not None and last_queued[2] == "move":
+                last_queued[3], last_queued[4], last_queued[6] = int(x), int(y), self.tag
+                return last_queued[0]
+            at = max(time.time() if at is None else at, self._busy_until.get(pointer_id, 0.0))
+            event = [at, next(self._sequence), action, int(x), int(y), pointer_id, self.tag]
+            heapq.heappush(self._queue, event)
+            self._last_queued[pointer_id] = event
+            self._busy_until[pointer_id] = at
+            self._condition.notify_all()
+        return at
+
+    def backlog(self, pointer_id):
+        """Seconds until every queued event of the pointer has been sent."""
+        with self._condition:
+            return max(0.0, self._busy_until.get(pointer_id, 0.0) - time.time())
+
+    def _gesture_start(self, pointer_id):
+        if self.backlog(pointer_id) > 0:
+            return self._busy_until[pointer_id] + self.tap_gap
+        return None
+
+    def tap(self, x, y, pointer_id, hold=0.05):
+        with self._condition:
+            down_time = self.schedule("down", x, y, pointer_id, at=self._gesture_start(pointer_id))
+            self.schedule("up", x, y, pointer_id, at=down_time + hold)
+
+    def swipe(self, points, pointer_id, duration=0.2):
+        """Touch down on the first point, move through the others evenly over duration, touch up on the last."""
+        with self._condition:
+            start_time = self.schedule("down", *points[0], pointer_id, at=self._gesture_start(pointer_id))
+            step_delay = duration / max(len(points) - 1, 1)
+            for i, (x, y) in enumerate(points[1:], start=1):
+                self.schedule("move", x, y, pointer_id, at=start_time + i * step_delay)
+            self.schedule("up", *points[-1], pointer_id, at=start_time + duration)
+
+    def wait_idle(self, timeout=None):
+        """Blocks until the queue is empty, for shutdown and tests."""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while self._queue or self._sending:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        self._thread.join(timeout=1.0)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running and (not self._queue or self._queue[0][0] > time.time()):
+                    self._condition.wait(None if not self._queue else self._queue[0][0] - time.time())
+                if not self._running:
+                    return
+                event = heapq.heappop(self._queue)
+                _, _, action, x, y, pointer_id, tag = event
+                if self._last_queued.get(pointer_id) is event:
+                    del self._last_queued[pointer_id]
+                self._sending = True
+            try:
+                self.send(action, x, y, pointer_id)
+                if self.on_sent is not None:
+                    self.on_sent(tag, action, time.time())
+            except Exception as e:
+                print(f"Failed to send {action} input: {e}")
+            with self._condition:
+                self._sending = False
+                self._condition.notify_all()
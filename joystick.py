@@ -0,0 +1,54 @@
+import math
+
+
+class Joystick:
+    """
+    Analog movement joystick on top of the input dispatcher. Takes a continuous angle and
+    magnitude, and only sends a touch move when the effective direction changed by more
+    than angle_threshold or the magnitude by more than magnitude_threshold. Moves are
+    coalesced, a burst between two control flushes ends up as a single message.
+    Angles are in screen space: 0 is right, pi / 2 is down.
+    """
+
+    def __init__(self, dispatcher, pointer_id, center, radius, angle_threshold=math.radians(6),
+                 magnitude_threshold=0.1):
+        self.dispatcher = dispatcher
+        self.pointer_id = pointer_id
+        self.center = center
+        self.radius = radius
+        self.angle_threshold = angle_threshold
+        self.magnitude_threshold = magnitude_threshold
+        self.angle = None
+        self.magnitude = None
+
+    @property
+    def is_held(self):
+        return self.angle is not None
+
+    def position(self, angle, magnitude):
+        return (self.center[0] + math.cos(angle) * magnitude * self.radius,
+                self.center[1] + math.sin(angle) * magnitude * self.radius)
+
+    def move(self, angle, magnitude=1.0):
+        magnitude = min(max(magnitude, 0.0), 1.0)
+        if magnitude < self.magnitude_threshold:
+            self.release()
+            return
+        if not self.is_held:
+            self.dispatcher.schedule("down", *self.center, self.pointer_id)
+        else:
+            angle_change = abs((angle - self.angle + math.pi) % (2 * math.pi) - math.pi)
+            if angle_change <= self.angle_threshold and abs(magnitude - self.magnitude) <= self.magnitude_threshold:
+                return
+        self.dispatcher.schedule("move", *self.position(angle, magnitude), self.pointer_id, coalesce=True)
+        self.angle, self.magnitude = angle, magnitude
+
+    def release(self):
+        if not self.is_held:
+            return
+        self.dispatcher.schedule("up", *self.center, self.pointer_id)
+        self.angle, self.magnitude = None, None
+
+    def reset(self):
+        """Forgets the held state without sending anything, for when the connection was lost."""
+        self.angle, self.magnitude = None, None
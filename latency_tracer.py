@@ -0,0 +1,84 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+class FrameTrace:
+    """One captured frame on its way through the bot: stage name -> seconds since capture."""
+
+    __slots__ = ("frame_id", "capture_time", "stages")
+
+    def __init__(self, frame_id, capture_time):
+        self.frame_id = frame_id
+        self.capture_time = capture_time
+        self.stages = {}
+
+
+class LatencyTracer:
+    """
+    Follows every frame from its capture to the first touch its decision sent. begin()
+    starts the trace of a newly captured frame, mark() records how long after the capture
+    the current frame reached a stage (state check, detection, decision...), and touch_sent
+    is called from the input dispatcher thread with the trace the touch was scheduled under.
+    Each stage keeps the deltas of the last window frames for rolling percentiles.
+    The capture time is when the frame was decoded and published, the closest point to the
+    screen the client can see.
+    """
+
+    touch_stage = "touch"
+
+    def __init__(self, window=512):
+        self.window = window
+        self.current = None
+        self.frames_traced = 0
+        self._next_frame_id = 0
+        self._deltas = {}
+        self._lock = threading.Lock()
+
+    def begin(self, capture_time):
+        self.current = FrameTrace(self._next_frame_id, capture_time)
+        self._next_frame_id += 1
+        self.frames_traced += 1
+        return self.current
+
+    def record(self, trace, stage, at=None):
+        """Records the stage once per frame, later marks of the same stage are ignored."""
+        if trace is None or stage in trace.stages:
+            return
+        delta = (time.time() if at is None else at) - trace.capture_time
+        trace.stages[stage] = delta
+        with self._lock:
+            if stage not in self._deltas:
+                self._deltas[stage] = deque(maxlen=self.window)
+            self._deltas[stage].append(delta)
+
+    def mark(self, stage, at=None):
+        self.record(self.current, stage, at)
+
+    def touch_sent(self, trace, at=None):
+        self.record(trace, self.touch_stage, at)
+
+    def percentiles(self, stage, quantiles=(50, 95, 99)):
+        with self._lock:
+            deltas = np.array(self._deltas.get(stage, ()))
+        if not len(deltas):
+            return None
+        return dict(zip(quantiles, np.percentile(deltas, quantiles).tolist()))
+
+    def report(self):
+        """stage -> {"count", "p50", "p95", "p99"} in seconds, stages in the order they were first seen."""
+        with self._lock:
+            stages = list(self._deltas)
+        report = {}
+        for stage in stages:
+            percentiles = self.percentiles(stage)
+            with self._lock:
+                count = len(self._deltas[stage])
+            report[stage] = {"count": count, **{f"p{q}": value for q, value in percentiles.items()}}
+        return report
+
+    def format_report(self):
+        return " | ".join(f"{stage} p50 {values['p50'] * 1000:.0f} p95 {values['p95'] * 1000:.0f} "
+                          f"p99 {values['p99'] * 1000:.0f}ms" for stage, values in self.report().items())
@@ -0,0 +1,148 @@
+import math
+from abc import ABC, abstractmethod
+
+import numpy as np
+from shapely import STRtree, box, linestrings, prepare
+
+
+class WallIndex(ABC):
+    """
+    Answers line-of-sight queries against the current wall boxes.
+    The backend structure is only rebuilt when the wall set changes, and segment
+    results are memoized until the next change so repeated checks in a tick are free.
+    """
+
+    max_cached_segments = 4096
+
+    def __init__(self):
+        self.walls = []
+        self._walls_key = ()
+        self._segment_cache = {}
+
+    def update(self, walls):
+        if walls is self.walls:
+            return
+        walls_key = tuple(tuple(wall) for wall in walls)
+        self.walls = walls
+        if walls_key == self._walls_key:
+            return
+        self._walls_key = walls_key
+        self._segment_cache = {}
+        self.build(walls_key)
+
+    @abstractmethod
+    def build(self, walls):
+        pass
+
+    @abstractmethod
+    def query_segments(self, starts, ends):
+        """Returns a bool array telling which (start, end) segments cross a wall."""
+
+    def segment_blocked(self, start, end):
+        key = (start[0], start[1], end[0], end[1])
+        blocked = self._segment_cache.get(key)
+        if blocked is None:
+            blocked = bool(self.query_segments(np.array([start], dtype=float), np.array([end], dtype=float))[0])
+            self._store(key, blocked)
+        return blocked
+
+    def segments_blocked(self, starts, ends):
+        starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+        ends = np.asarray(ends, dtype=float).reshape(-1, 2)
+        keys = [(sx, sy, ex, ey) for (sx, sy), (ex, ey) in zip(starts.tolist(), ends.tolist())]
+        blocked = np.zeros(len(keys), dtype=bool)
+        missing = []
+        for i, key in enumerate(keys):
+            cached = self._segment_cache.get(key)
+            if cached is None:
+                missing.append(i)
+            else:
+                blocked[i] = cached
+        if missing:
+            computed = self.query_segments(starts[missing], ends[missing])
+            blocked[missing] = computed
+            for i, value in zip(missing, computed.tolist()):
+                self._store(keys[i], value)
+        return blocked
+
+    def _store(self, key, blocked):
+        if len(self._segment_cache) >= self.max_cached_segments:
+            self._segment_cache = {}
+        self._segment_cache[key] = blocked
+
+
+class ShapelyWallIndex(WallIndex):
+    """Exact intersection tests against an STRtree of prepared wall boxes."""
+
+    def __init__(self):
+        super().__init__()
+        self._tree = None
+
+    def build(self, walls):
+        if not walls:
+            self._tree = None
+            return
+        geometries = np.array([box(x1, y1, x2, y2) for x1, y1, x2, y2 in walls], dtype=object)
+        prepare(geometries)
+        self._tree = STRtree(geometries)
+
+    def query_segments(self, starts, ends):
+        blocked = np.zeros(len(starts), dtype=bool)
+        if self._tree is None or not len(starts):
+            return blocked
+        lines = linestrings(np.stack([starts, ends], axis=1))
+        hits = self._tree.query(lines, predicate="intersects")
+        blocked[hits[0]] = True
+        return blocked
+
+
+class RasterWallIndex(WallIndex):
+    """
+    Rasterizes the walls into a boolean occupancy grid and samples every segment
+    against it in one NumPy pass. Cells are cell_size pixels wide, so results are
+    conservative by up to one cell around each wall.
+    """
+
+    def __init__(self, cell_size):
+        super().__init__()
+        self.cell_size = float(cell_size)
+        self.grid = np.zeros((0, 0), dtype=bool)
+
+    def build(self, walls):
+        if not walls:
+            self.grid = np.zeros((0, 0), dtype=bool)
+            return
+        boxes = np.array(walls, dtype=float) / self.cell_size
+        first_cells = np.maximum(np.floor(boxes[:, :2]), 0).astype(int)
+        last_cells = np.maximum(np.ceil(boxes[:, 2:]), first_cells + 1).astype(int)
+        grid = np.zeros((last_cells[:, 1].max(), last_cells[:, 0].max()), dtype=bool)
+        for (x1, y1), (x2, y2) in zip(first_cells.tolist(), last_cells.tolist()):
+            grid[y1:y2, x1:x2] = True
+        self.grid = grid
+
+    def query_segments(self, starts, ends):
+        blocked = np.zeros(len(starts), dtype=bool)
+        if not self.grid.size or not len(starts):
+            return blocked
+        deltas = ends - starts
+        longest = float(np.hypot(deltas[:, 0], deltas[:, 1]).max())
+        # Sample twice per cell so a segment cannot step over a wall cell
+        samples = max(2, int(math.ceil(2 * longest / self.cell_size)) + 1)
+        t = np.linspace(0.0, 1.0, samples)
+        points = starts[:, None, :] + deltas[:, None, :] * t[None, :, None]
+        cells = np.floor(points / self.cell_size).astype(int)
+        cells_x, cells_y = cells[..., 0], cells[..., 1]
+        grid_h, grid_w = self.grid.shape
+        inside = (cells_x >= 0) & (cells_y >= 0) & (cells_x < grid_w) & (cells_y < grid_h)
+        occupied = np.zeros(inside.shape, dtype=bool)
+        occupied[inside] = self.grid[cells_y[inside], cells_x[inside]]
+        blocked[:] = occupied.any(axis=1)
+        return blocked
+
+
+def create_wall_index(backend, cell_size):
+    if backend == "raster":
+        return RasterWallIndex(cell_size)
+    if backend == "shapely":
+        return ShapelyWallIndex()
+    raise ValueError(f"Unknown line of sight backend '{backend}', expected 'shapely' or 'raster'")
@@ -2,28 +2,29 @@ import time
 
 import numpy as np
 
+from color_mask import ColorRange
 from stage_manager import load_image
 from typization import BrawlerName
-from utils import extract_text_and_positions, count_hsv_pixels, load_toml_as_dict, find_template_center
+from utils import extract_text_and_positions, load_toml_as_dict, find_template_center
 
 debug = load_toml_as_dict("cfg/general_config.toml")['super_debug'] == "yes"
 
 class LobbyAutomation:
 
     def __init__(self, window_controller):
-        self.coords_cfg = load_toml_as_dict("./cfg/lobby_config.toml")
         self.window_controller = window_controller
+        self.idle_gray = ColorRange((0, 0, 55), (10, 15, 77))
 
     def check_for_idle(self, frame):
         screenshot = frame
-        wr = self.window_controller.width_ratio
-        hr = self.window_controller.height_ratio
-        screenshot = screenshot.crop(
-            (int(400 * wr), int(380 * hr), int(1500 * wr), int(700 * hr)))
-        gray_pixels = count_hsv_pixels(screenshot, (0, 0, 55), (10, 15, 77))
-        if debug: print("gray pixels (if > 1000 then bot will try to unidle) :", gray_pixels)
-        if gray_pixels > 1000:
-            self.window_controller.click(int(535 * wr), int(615 * hr))
+        layout = self.window_controller.layout
+        screenshot = layout.crop(screenshot, "idle_check")
+        gray_pixels = self.idle_gray.count(screenshot, stride=2)
+        # 1000 pixels at 1920x1080, scaled with the area of the capture
+        idle_minimum = 1000 * layout.width_ratio * layout.height_ratio
+        if debug: print(f"gray pixels (if > {idle_minimum:.0f} then bot will try to unidle) :", gray_pixels)
+        if gray_pixels > idle_minimum:
+            self.window_controller.click(*layout.point("unidle"))
 
     def select_brawler(self, brawler):
         self.window_controller.screenshot()
@@ -69,21 +70,22 @@ class LobbyAutomation:
                 x, y = reworked_results[brawler]['center']
                 self.window_controller.click(int(x * 1.5385), int(y * 1.5385))
                 time.sleep(1)
-                select_x, select_y = self.coords_cfg['lobby']['select_btn'][0], self.coords_cfg['lobby']['select_btn'][1]
-                self.window_controller.click(select_x, select_y, already_include_ratio=False)
+                self.window_controller.click(*self.window_controller.layout.point("select_btn"))
                 time.sleep(0.5)
                 if debug: print("Selected brawler ", brawler)
                 found_brawler = True
                 break
+            layout = self.window_controller.layout
+            # Swipes return at once, the list has to stop scrolling before the next capture
             if c == 0:
-                wr = self.window_controller.width_ratio
-                hr = self.window_controller.height_ratio
-                self.window_controller.swipe(int(1700 * wr), int(900 * hr), int(1700 * wr), int(850 * hr), duration=0.8)
+                self.window_controller.swipe(*layout.point("brawler_list_swipe_start"),
+                                             *layout.point("brawler_list_swipe_short"), duration=0.8)
+                self.window_controller.wait_for_input(timeout=2)
                 c += 1
                 continue
-            wr = self.window_controller.width_ratio
-            hr = self.window_controller.height_ratio
-            self.window_controller.swipe(int(1700 * wr), int(900 * hr), int(1700 * wr), int(650 * hr), duration=0.8)
+            self.window_controller.swipe(*layout.point("brawler_list_swipe_start"),
+                                         *layout.point("brawler_list_swipe_long"), duration=0.8)
+            self.window_controller.wait_for_input(timeout=2)
             time.sleep(1)
         if not found_brawler:
             print(f"WARNING: Brawler '{brawler}' was not found after 50 scroll attempts. "
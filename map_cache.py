@@ -0,0 +1,86 @@
+import os
+
+import cv2
+import numpy as np
+
+
+class MapCache:
+    """
+    On-disk cache of learned wall layouts. An arena is recognised by a fingerprint of
+    its first match frames (an average hash of the downsampled view), and its walls are
+    stored in world coordinates relative to the camera position at the start of the match.
+    That position changes between matches, a looked up layout has to be registered against
+    the walls of the new match (wall_map.register_layout) before it is used.
+    """
+
+    def __init__(self, directory="cfg/map_cache", fingerprint_frames=5, hash_size=(16, 9), max_distance=12,
+                 view_margin=0.15):
+        self.directory = directory
+        self.fingerprint_frames = fingerprint_frames
+        self.hash_size = hash_size
+        self.max_distance = max_distance
+        self.view_margin = view_margin
+        self._frames = []
+        self._layouts = None
+
+    def start_match(self):
+        self._frames = []
+
+    def add_frame(self, frame):
+        """Feeds an early match frame, returns the fingerprint once enough frames were seen."""
+        frame = np.asarray(frame)
+        height, width = frame.shape[:2]
+        margin_y, margin_x = int(height * self.view_margin), int(width * self.view_margin)
+        view = frame[margin_y:height - margin_y, margin_x:width - margin_x]
+        gray = cv2.cvtColor(view, cv2.COLOR_RGB2GRAY) if view.ndim == 3 else view
+        self._frames.append(cv2.resize(gray, self.hash_size, interpolation=cv2.INTER_AREA).astype(np.float32))
+        if len(self._frames) < self.fingerprint_frames:
+            return None
+        average = np.mean(self._frames, axis=0)
+        self._frames = []
+        return (average > np.median(average)).flatten()
+
+    @staticmethod
+    def fingerprint_name(fingerprint):
+        return np.packbits(fingerprint).tobytes().hex()
+
+    def _load_layouts(self):
+        self._layouts = {}
+        if not os.path.isdir(self.directory):
+            return
+        for file_name in os.listdir(self.directory):
+            if not file_name.endswith(".npz"):
+                continue
+            with np.load(os.path.join(self.directory, file_name)) as layout:
+                self._layouts[file_name] = (layout["fingerprint"].astype(bool), layout["boxes"], layout["classes"])
+
+    def lookup(self, fingerprint):
+        if self._layouts is None:
+            self._load_layouts()
+        best_name, best_distance = None, self.max_distance + 1
+        for file_name, (cached_fingerprint, _, _) in self._layouts.items():
+            if cached_fingerprint.shape != fingerprint.shape:
+                continue
+            distance = int(np.count_nonzero(cached_fingerprint != fingerprint))
+            if distance < best_distance:
+                best_name, best_distance = file_name, distance
+        if best_name is None:
+            return None
+        _, boxes, classes = self._layouts[best_name]
+        walls = {}
+        for class_name, world_box in zip(classes.tolist(), boxes.tolist()):
+            walls.setdefault(class_name, []).append(world_box)
+        return walls
+
+    def save(self, fingerprint, walls_by_class):
+        boxes = [box for boxes in walls_by_class.values() for box in boxes]
+        classes = [class_name for class_name, boxes in walls_by_class.items() for _ in boxes]
+        if not boxes:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        file_name = self.fingerprint_name(fingerprint) + ".npz"
+        boxes = np.rint(np.array(boxes)).astype(np.int32)
+        classes = np.array(classes)
+        np.savez_compressed(os.path.join(self.directory, file_name), fingerprint=fingerprint, boxes=boxes, classes=classes)
+        if self._layouts is not None:
+            self._layouts[file_name] = (fingerprint.astype(bool), boxes, classes)
@@ -0,0 +1,65 @@
+import math
+from collections import deque
+
+
+class MotionEstimator:
+    """
+    Measures how far the player really moved in world space, from the tracked player
+    position plus the camera offset estimated on the background. The bot is stuck when
+    it kept commanding movement for a whole window without getting anywhere.
+    """
+
+    def __init__(self, window=0.6, min_displacement=18.0):
+        self.window = window
+        self.min_displacement = min_displacement
+        # (time, world_x, world_y, moving, reliable)
+        self.samples = deque()
+        self.moving_time = 0.0
+        self.wasted_move_time = 0.0
+        self._last_time = None
+
+    def reset(self):
+        self.samples.clear()
+        self._last_time = None
+
+    def reset_metrics(self):
+        self.moving_time = 0.0
+        self.wasted_move_time = 0.0
+
+    def update(self, current_time, player_pos, camera_offset, moving, reliable=True, min_displacement=None):
+        if min_displacement is not None:
+            self.min_displacement = min_displacement
+        dt = 0.0 if self._last_time is None else min(current_time - self._last_time, 0.5)
+        self._last_time = current_time
+        if player_pos is None:
+            self.samples.clear()
+            return
+        self.samples.append((current_time, player_pos[0] + camera_offset[0], player_pos[1] + camera_offset[1],
+                             moving, reliable))
+        while self.samples and current_time - self.samples[0][0] > self.window * 2:
+            self.samples.popleft()
+        if moving:
+            self.moving_time += dt
+            if self.is_stuck(current_time):
+                self.wasted_move_time += dt
+
+    def displacement(self, current_time):
+        recent = [sample for sample in self.samples if current_time - sample[0] <= self.window]
+        if len(recent) < 2:
+            return 0.0
+        return math.hypot(recent[-1][1] - recent[0][1], recent[-1][2] - recent[0][2])
+
+    def is_stuck(self, current_time):
+        """True or False when the last window is fully covered by reliable samples, None otherwise."""
+        recent = [sample for sample in self.samples if current_time - sample[0] <= self.window]
+        if len(recent) < 3 or current_time - recent[0][0] < self.window * 0.8:
+            return None
+        if not all(reliable for _, _, _, _, reliable in recent):
+            return None
+        if not all(moving for _, _, _, moving, _ in recent):
+            return False
+        return self.displacement(current_time) < self.min_displacement
+
+    def get_report(self):
+        share = self.wasted_move_time / self.moving_time * 100 if self.moving_time else 0.0
+        return f"Wasted movement: {self.wasted_move_time:.1f}s of {self.moving_time:.1f}s moving ({share:.0f}%)"
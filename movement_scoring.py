@@ -0,0 +1,83 @@
+import math
+
+import numpy as np
+
+from navigation import MOVEMENT_BY_SECTOR
+
+# Unit vectors of the 8 joystick directions, in the same order as MOVEMENT_BY_SECTOR
+DIRECTION_VECTORS = np.array([[math.cos(k * math.pi / 4), math.sin(k * math.pi / 4)] for k in range(8)])
+DIRECTION_VECTORS[np.abs(DIRECTION_VECTORS) < 1e-9] = 0.0
+GAMEMODE_AXES = {
+    3: np.array([0.0, 1.0]),  # vertical maps
+    5: np.array([1.0, 0.0]),  # horizontal maps
+}
+
+
+class MovementScorer:
+    """
+    Scores the 8 joystick directions in one pass over all entities:
+    wall clearance, progress towards safe_range of the target, staying in attack_range,
+    threat from every enemy, the gamemode_type axis and the planned path direction.
+    """
+
+    def __init__(self, blocked_weight=10.0, clearance_weight=0.5, target_weight=1.0, attack_range_weight=0.5,
+                 threat_weight=1.5, gamemode_weight=0.15, path_weight=1.2):
+        self.blocked_weight = blocked_weight
+        self.clearance_weight = clearance_weight
+        self.target_weight = target_weight
+        self.attack_range_weight = attack_range_weight
+        self.threat_weight = threat_weight
+        self.gamemode_weight = gamemode_weight
+        self.path_weight = path_weight
+
+    @staticmethod
+    def get_probe_segments(player_pos, step):
+        """Segment ends one and two steps away in every direction, for a single wall index query."""
+        player_pos = np.asarray(player_pos, dtype=float)
+        ends = np.concatenate([player_pos + DIRECTION_VECTORS * step, player_pos + DIRECTION_VECTORS * step * 2])
+        return np.broadcast_to(player_pos, ends.shape), ends
+
+    def score(self, player_pos, step, probes_blocked, target_pos, safe_range, attack_range,
+              enemy_positions=None, game_mode=None, planned_movement=None):
+        player_pos = np.asarray(player_pos, dtype=float)
+        new_positions = player_pos + DIRECTION_VECTORS * step
+        blocked_near, blocked_far = probes_blocked[:8], probes_blocked[8:]
+        scores = -self.blocked_weight * blocked_near - self.clearance_weight * blocked_far
+
+        target_pos = np.asarray(target_pos, dtype=float)
+        distance = float(np.hypot(*(target_pos - player_pos)))
+        new_distances = np.hypot(*(target_pos - new_positions).T)
+        scores += self.target_weight * (abs(distance - safe_range) - np.abs(new_distances - safe_range)) / step
+        if distance <= attack_range:
+            scores -= self.attack_range_weight * (new_distances > attack_range)
+
+        if enemy_positions is not None and len(enemy_positions) and safe_range > 0:
+            enemy_positions = np.asarray(enemy_positions, dtype=float).reshape(-1, 2)
+            offsets = enemy_positions[None, :, :] - new_positions[:, None, :]
+            enemy_distances = np.hypot(offsets[..., 0], offsets[..., 1])
+            scores -= self.threat_weight * np.clip(1 - enemy_distances / safe_range, 0, None).sum(axis=1)
+
+        axis = GAMEMODE_AXES.get(game_mode)
+        if axis is not None:
+            scores += self.gamemode_weight * np.abs(DIRECTION_VECTORS @ axis)
+
+        if planned_movement:
+            planned = DIRECTION_VECTORS[MOVEMENT_BY_SECTOR.index(planned_movement)]
+            scores += self.path_weight * (DIRECTION_VECTORS @ planned)
+        return scores
+
+    @staticmethod
+    def best_movement(scores):
+        return MOVEMENT_BY_SECTOR[int(np.argmax(scores))]
+
+    @staticmethod
+    def best_angle(scores):
+        """
+        Continuous joystick angle: the best direction refined by fitting a parabola through
+        its score and the scores of its two neighbours. Stays within the best sector.
+        """
+        best = int(np.argmax(scores))
+        previous, current, following = scores[best - 1], scores[best], scores[(best + 1) % 8]
+        curvature = previous - 2 * current + following
+        offset = 0.0 if curvature >= 0 else float(np.clip(0.5 * (previous - following) / curvature, -0.5, 0.5))
+        return (best + offset) * math.pi / 4
@@ -0,0 +1,231 @@
+import heapq
+import math
+
+import numpy as np
+
+SQRT2 = math.sqrt(2)
+NEIGHBOURS = [(1, 0, 1.0), (-1, 0, 1.0), (0, 1, 1.0), (0, -1, 1.0),
+              (1, 1, SQRT2), (-1, 1, SQRT2), (1, -1, SQRT2), (-1, -1, SQRT2)]
+MOVEMENT_BY_SECTOR = ['D', 'DS', 'S', 'AS', 'A', 'AW', 'W', 'DW']
+
+
+def direction_to_movement(dx, dy):
+    """Maps a screen space direction to the closest of the 8 WASD movements."""
+    if dx == 0 and dy == 0:
+        return ''
+    sector = int(round(math.atan2(dy, dx) / (math.pi / 4))) % 8
+    return MOVEMENT_BY_SECTOR[sector]
+
+
+def movement_to_angle(movement):
+    """Screen space angle of a WASD movement, None when the keys cancel out or there are none."""
+    movement = movement.lower()
+    dx = ('d' in movement) - ('a' in movement)
+    dy = ('s' in movement) - ('w' in movement)
+    if dx == 0 and dy == 0:
+        return None
+    return math.atan2(dy, dx)
+
+
+def octile_distance(a, b):
+    dx, dy = abs(a[0] - b[0]), abs(a[1] - b[1])
+    return max(dx, dy) + (SQRT2 - 1) * min(dx, dy)
+
+
+class DStarLite:
+    """
+    D* Lite on an 8-connected occupancy grid. Cells are (x, y) tuples and blocked[y, x]
+    marks walls. When the start moves or cells change, only the affected part of the
+    search is repaired instead of planning from scratch.
+    """
+
+    def __init__(self, blocked, start, goal, max_expansions=20000):
+        self.blocked = blocked
+        self.height, self.width = blocked.shape
+        self.start = start
+        self.last_start = start
+        self.goal = goal
+        self.max_expansions = max_expansions
+        self.km = 0.0
+        self.g = np.full(blocked.shape, np.inf)
+        self.rhs = np.full(blocked.shape, np.inf)
+        self.queue = []
+        self.open = {}
+        self.rhs[goal[1], goal[0]] = 0.0
+        self._push(goal)
+
+    def _key(self, cell):
+        x, y = cell
+        best = min(self.g[y, x], self.rhs[y, x])
+        return best + octile_distance(self.start, cell) + self.km, best
+
+    def _push(self, cell):
+        key = self._key(cell)
+        self.open[cell] = key
+        heapq.heappush(self.queue, (key, cell))
+
+    def _neighbours(self, cell):
+        x, y = cell
+        for dx, dy, step in NEIGHBOURS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.width and 0 <= ny < self.height:
+                yield (nx, ny), dx, dy, step
+
+    def _cost(self, cell, dx, dy, step):
+        x, y = cell
+        nx, ny = x + dx, y + dy
+        if self.blocked[ny, nx]:
+            return math.inf
+        # No cutting wall corners diagonally
+        if dx and dy and (self.blocked[y, nx] or self.blocked[ny, x]):
+            return math.inf
+        return step
+
+    def _update_vertex(self, cell):
+        x, y = cell
+        if cell != self.goal:
+            best = math.inf
+            for (nx, ny), dx, dy, step in self._neighbours(cell):
+                best = min(best, self._cost(cell, dx, dy, step) + self.g[ny, nx])
+            self.rhs[y, x] = best
+        self.open.pop(cell, None)
+        if self.g[y, x] != self.rhs[y, x]:
+            self._push(cell)
+
+    def compute_shortest_path(self):
+        sx, sy = self.start
+        expansions = 0
+        while self.queue and expansions < self.max_expansions:
+            old_key, cell = self.queue[0]
+            if self.open.get(cell) != old_key:
+                heapq.heappop(self.queue)
+                continue
+            if not (old_key < self._key(self.start) or self.rhs[sy, sx] != self.g[sy, sx]):
+                break
+            heapq.heappop(self.queue)
+            expansions += 1
+            new_key = self._key(cell)
+            if old_key < new_key:
+                self._push(cell)
+                continue
+            del self.open[cell]
+            x, y = cell
+            if self.g[y, x] > self.rhs[y, x]:
+                self.g[y, x] = self.rhs[y, x]
+            else:
+                self.g[y, x] = math.inf
+                self._update_vertex(cell)
+            for neighbour, _, _, _ in self._neighbours(cell):
+                self._update_vertex(neighbour)
+
+    def move_start(self, start):
+        if start != self.start:
+            self.km += octile_distance(self.last_start, start)
+            self.last_start = start
+            self.start = start
+
+    def set_blocked(self, cells, value):
+        for cell in cells:
+            if cell == self.goal:
+                continue
+            x, y = cell
+            self.blocked[y, x] = value
+            self._update_vertex(cell)
+            for neighbour, _, _, _ in self._neighbours(cell):
+                self._update_vertex(neighbour)
+
+    def next_cell(self):
+        if self.start == self.goal:
+            return self.goal
+        self.compute_shortest_path()
+        sx, sy = self.start
+        if math.isinf(self.g[sy, sx]) and math.isinf(self.rhs[sy, sx]):
+            return None
+        best_cell, best_cost = None, math.inf
+        for (nx, ny), dx, dy, step in self._neighbours(self.start):
+            cost = self._cost(self.start, dx, dy, step) + self.g[ny, nx]
+            if cost < best_cost:
+                best_cell, best_cost = (nx, ny), cost
+        return best_cell
+
+
+class Navigator:
+    """
+    Keeps a world anchored cost grid from the detected walls and plans towards a target
+    with D* Lite. Positions are given in screen pixels together with the camera offset
+    so the grid stays put while the camera follows the player.
+    """
+
+    def __init__(self, cell_size, margin_cells=6, goal_tolerance_cells=1):
+        self.cell_size = float(cell_size)
+        self.margin_cells = margin_cells
+        self.goal_tolerance_cells = goal_tolerance_cells
+        self.planner = None
+        self.origin = (0, 0)
+        self.goal_cell = None
+        self.blocked_cells = set()
+
+    def reset(self):
+        self.planner = None
+        self.goal_cell = None
+        self.blocked_cells = set()
+
+    def _cell(self, point, offset):
+        return (int(math.floor((point[0] + offset[0]) / self.cell_size)),
+                int(math.floor((point[1] + offset[1]) / self.cell_size)))
+
+    def _wall_cells(self, walls, offset):
+        cells = set()
+        for x1, y1, x2, y2 in walls:
+            first_x, first_y = self._cell((x1, y1), offset)
+            last_x = int(math.ceil((x2 + offset[0]) / self.cell_size))
+            last_y = int(math.ceil((y2 + offset[1]) / self.cell_size))
+            for cell_x in range(first_x, max(last_x, first_x + 1)):
+                for cell_y in range(first_y, max(last_y, first_y + 1)):
+                    cells.add((cell_x, cell_y))
+        return cells
+
+    def _local(self, cell):
+        return cell[0] - self.origin[0], cell[1] - self.origin[1]
+
+    def _in_bounds(self, cell):
+        x, y = self._local(cell)
+        return 0 <= x < self.planner.width and 0 <= y < self.planner.height
+
+    def _reset_planner(self, start_cell, goal_cell, wall_cells):
+        min_x = min(start_cell[0], goal_cell[0]) - self.margin_cells
+        min_y = min(start_cell[1], goal_cell[1]) - self.margin_cells
+        max_x = max(start_cell[0], goal_cell[0]) + self.margin_cells
+        max_y = max(start_cell[1], goal_cell[1]) + self.margin_cells
+        self.origin = (min_x, min_y)
+        blocked = np.zeros((max_y - min_y + 1, max_x - min_x + 1), dtype=bool)
+        for cell in wall_cells:
+            x, y = self._local(cell)
+            if 0 <= x < blocked.shape[1] and 0 <= y < blocked.shape[0]:
+                blocked[y, x] = True
+        goal_x, goal_y = self._local(goal_cell)
+        blocked[goal_y, goal_x] = False
+        self.planner = DStarLite(blocked, self._local(start_cell), (goal_x, goal_y))
+        self.goal_cell = goal_cell
+        self.blocked_cells = wall_cells
+
+    def next_waypoint(self, start, goal, walls, offset=(0, 0)):
+        """Returns the screen position of the next cell to walk to, or None when the goal is unreachable."""
+        start_cell = self._cell(start, offset)
+        goal_cell = self._cell(goal, offset)
+        wall_cells = self._wall_cells(walls, offset)
+        goal_moved = (self.goal_cell is None or max(abs(goal_cell[0] - self.goal_cell[0]),
+                                                    abs(goal_cell[1] - self.goal_cell[1])) > self.goal_tolerance_cells)
+        if self.planner is None or goal_moved or not self._in_bounds(start_cell):
+            self._reset_planner(start_cell, goal_cell, wall_cells)
+        else:
+            self.planner.move_start(self._local(start_cell))
+            changed = wall_cells ^ self.blocked_cells
+            self.planner.set_blocked([self._local(cell) for cell in changed & wall_cells if self._in_bounds(cell)], True)
+            self.planner.set_blocked([self._local(cell) for cell in changed - wall_cells if self._in_bounds(cell)], False)
+            self.blocked_cells = wall_cells
+        next_cell = self.planner.next_cell()
+        if next_cell is None:
+            return None
+        return ((next_cell[0] + self.origin[0] + 0.5) * self.cell_size - offset[0],
+                (next_cell[1] + self.origin[1] + 0.5) * self.cell_size - offset[1])
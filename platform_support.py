@@ -0,0 +1,49 @@
+import os
+import sys
+
+IS_WINDOWS = sys.platform == "win32"
+default_dpi = 96
+default_screen_size = (1920, 1080)
+
+
+def has_display():
+    """False on headless Linux servers, where no GUI can be opened."""
+    return IS_WINDOWS or sys.platform == "darwin" or bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+
+def _query_tk(query):
+    import tkinter as tk
+    root = tk.Tk()
+    root.withdraw()
+    try:
+        return query(root)
+    finally:
+        root.destroy()
+
+
+def get_dpi_scale():
+    """System DPI, 96 is 100% scaling. Without a display there is nothing to scale for."""
+    if IS_WINDOWS:
+        import ctypes
+        user32 = ctypes.windll.user32
+        user32.SetProcessDPIAware()
+        return int(user32.GetDpiForSystem())
+    if not has_display():
+        return default_dpi
+    try:
+        return int(round(_query_tk(lambda root: root.winfo_fpixels("1i"))))
+    except Exception:
+        return default_dpi
+
+
+def get_screen_size():
+    """Size of the primary screen in pixels, as pyautogui.size() returns it on Windows."""
+    if IS_WINDOWS:
+        import pyautogui
+        return tuple(pyautogui.size())
+    if not has_display():
+        return default_screen_size
+    try:
+        return _query_tk(lambda root: (root.winfo_screenwidth(), root.winfo_screenheight()))
+    except Exception:
+        return default_screen_size
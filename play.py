@@ -3,11 +3,19 @@ import random
 import time
 
 import cv2
-from shapely import LineString
-from shapely.geometry import Polygon
+import numpy as np
 from state_finder.main import get_state
+from brawler_catalog import get_brawler_catalog
 from detect import Detect
-from utils import load_toml_as_dict, count_hsv_pixels, load_brawlers_info
+from hud_analyzer import HudAnalyzer
+from line_of_sight import create_wall_index
+from map_cache import MapCache
+from motion_estimator import MotionEstimator
+from movement_scoring import MovementScorer
+from navigation import Navigator, direction_to_movement, movement_to_angle
+from targeting import rank_targets
+from wall_map import CameraTracker, WorldWallMap, consolidate_walls, register_layout, shift_layout
+from utils import load_toml_as_dict
 
 brawl_stars_width, brawl_stars_height = 1920, 1080
 
@@ -30,7 +38,6 @@ class Movement:
         self.gadget_treshold = time_config["gadget"]
         self.hypercharge_treshold = time_config["hypercharge"]
         self.walls_treshold = time_config["wall_detection"]
-        self.keep_walls_in_memory = self.walls_treshold <= 1
         self.last_walls_data = []
         self.keys_hold = []
         self.time_since_different_movement = time.time()
@@ -39,6 +46,7 @@ class Movement:
         self.time_since_hypercharge_checked = time.time()
         self.is_hypercharge_ready = False
         self.window_controller = window_controller
+        self.motion_estimator = MotionEstimator()
         self.TILE_SIZE = 60
         
     @staticmethod
@@ -49,28 +57,12 @@ class Movement:
     def get_player_pos(player_data):
         return (player_data[0] + player_data[2]) / 2, (player_data[1] + player_data[3]) / 2
 
-    @staticmethod
-    def get_distance(enemy_coords, player_coords):
-        return math.hypot(enemy_coords[0] - player_coords[0], enemy_coords[1] - player_coords[1])
-
     @staticmethod
     def is_there_enemy(enemy_data):
         if not enemy_data:
             return False
         return True
 
-    @staticmethod
-    def get_horizontal_move_key(direction_x, opposite=False):
-        if opposite:
-            return "A" if direction_x > 0 else "D"
-        return "D" if direction_x > 0 else "A"
-
-    @staticmethod
-    def get_vertical_move_key(direction_y, opposite=False):
-        if opposite:
-            return "W" if direction_y > 0 else "S"
-        return "S" if direction_y > 0 else "W"
-
     def attack(self):
         self.window_controller.press_key("M")
 
@@ -86,12 +78,6 @@ class Movement:
         print("Using super")
         self.window_controller.press_key("E")
 
-    @staticmethod
-    def get_random_attack_key():
-        random_movement = random.choice(["A", "W", "S", "D"])
-        random_movement += random.choice(["A", "W", "S", "D"])
-        return random_movement
-
     @staticmethod
     def reverse_movement(movement):
         # Create a translation table
@@ -113,7 +99,11 @@ class Movement:
             self.time_since_different_movement = current_time
 
         # print(f"Last change: {self.time_since_different_movement}", f" self.hold: {self.keys_hold}",f" c movement: {movement}")
-        if current_time - self.time_since_different_movement > self.fix_movement_keys["delay_to_trigger"]:
+        is_stuck = self.motion_estimator.is_stuck(current_time)
+        if is_stuck is None:
+            # No reliable motion estimate, fall back to how long the same keys were held
+            is_stuck = current_time - self.time_since_different_movement > self.fix_movement_keys["delay_to_trigger"]
+        if is_stuck:
             reversed_movement = self.reverse_movement(movement)
 
             if reversed_movement == "s":
@@ -162,8 +152,6 @@ class Play(Movement):
         self.is_hypercharge_ready = False
         self.is_gadget_ready = False
         self.is_super_ready = False
-        self.brawlers_info = load_brawlers_info()
-        self.brawler_ranges = None
         self.time_since_detections = {
             "player": time.time(),
             "enemy": time.time(),
@@ -172,8 +160,28 @@ class Play(Movement):
 
         self.last_movement = ''
         self.last_movement_time = time.time()
-        self.wall_history = []
-        self.wall_history_length = 3  # Number of frames to keep walls
+        # Best scored movement and its refined continuous joystick angle
+        self.scored_movement = None
+        self.movement_angle = None
+        self.camera_tracker = CameraTracker()
+        self.wall_map = None
+        self.walls_by_class = {}
+        self.use_pathfinding = str(bot_config.get("use_pathfinding", "yes")).lower() in ("yes", "true", "1")
+        self.navigator = None
+        self.objective_world = None
+        self.movement_scorer = MovementScorer()
+        use_map_cache = str(bot_config.get("use_map_cache", "yes")).lower() in ("yes", "true", "1")
+        self.map_cache = MapCache() if use_map_cache else None
+        self.map_fingerprint = None
+        self.map_layout_preloaded = False
+        # Cached layout waiting for a wall detection to be registered against
+        self.pending_map_layout = None
+        self.map_cache_min_match = 0.5
+        self.map_cache_min_passes = 20
+        self.wall_detection_passes = 0
+        self.wall_verification_treshold = time_config.get("wall_verification", 2.0)
+        self.line_of_sight_backend = bot_config.get("line_of_sight_backend", "shapely")
+        self.wall_index = None
         self.scene_data = []
         self.should_detect_walls = bot_config["gamemode"] in ["brawlball", "brawl_ball", "brawll ball"]
         self.minimum_movement_delay = bot_config["minimum_movement_delay"]
@@ -181,48 +189,67 @@ class Play(Movement):
         self.gadget_pixels_minimum = bot_config["gadget_pixels_minimum"]
         self.hypercharge_pixels_minimum = bot_config["hypercharge_pixels_minimum"]
         self.super_pixels_minimum = bot_config["super_pixels_minimum"]
+        self.hud_analyzer = HudAnalyzer({
+            "hypercharge": self.hypercharge_pixels_minimum,
+            "gadget": self.gadget_pixels_minimum,
+            "super": self.super_pixels_minimum,
+        })
         self.wall_detection_confidence = bot_config["wall_detection_confidence"]
         self.entity_detection_confidence = bot_config["entity_detection_confidence"]
 
-    def load_brawler_ranges(self, brawlers_info=None):
-        if not brawlers_info:
-            brawlers_info = load_brawlers_info()
-        screen_size_ratio = self.window_controller.scale_factor
-        ranges = {}
-        for brawler, info in brawlers_info.items():
-            attack_range = info['attack_range']
-            safe_range = info['safe_range']
-            super_range = info['super_range']
-            v = [safe_range, attack_range, super_range]
-            ranges[brawler] = [int(v[0] * screen_size_ratio), int(v[1] * screen_size_ratio), int(v[2] * screen_size_ratio)]
-        return ranges
+    @property
+    def brawler_catalog(self):
+        # Looked up on every use, refreshing the brawlers info replaces the shared catalog
+        return get_brawler_catalog()
 
-    @staticmethod
-    def can_attack_through_walls(brawler, skill_type, brawlers_info=None):
-        if not brawlers_info: brawlers_info = load_brawlers_info()
-        if skill_type == "attack":
-            return brawlers_info[brawler]['ignore_walls_for_attacks']
-        elif skill_type == "super":
-            return brawlers_info[brawler]['ignore_walls_for_supers']
-        raise ValueError("skill_type must be either 'attack' or 'super'")
+    def get_wall_index(self, walls):
+        if self.wall_index is None:
+            cell_size = self.TILE_SIZE * (self.window_controller.scale_factor or 1)
+            self.wall_index = create_wall_index(self.line_of_sight_backend, cell_size)
+        self.wall_index.update(walls)
+        return self.wall_index
 
+    def is_segment_blocked(self, start, end, walls):
+        return self.get_wall_index(walls).segment_blocked(start, end)
 
-    @staticmethod
-    def walls_are_in_line_of_sight(line_of_sight, walls):
-        for wall in walls:
-            x1, y1, x2, y2 = wall
-            wall_polygon = Polygon([
-                (x1, y1), (x2, y1),
-                (x2, y2), (x1, y2)
-            ])
-            if line_of_sight.intersects(wall_polygon):
-                return True
-        return False
+    def get_move_target(self, player_pos, move_direction, distance=None):
+        if distance is None:
+            distance = self.TILE_SIZE*self.window_controller.scale_factor
+        dx, dy = 0, 0
+        if 'w' in move_direction.lower():
+            dy -= distance
+        if 's' in move_direction.lower():
+            dy += distance
+        if 'a' in move_direction.lower():
+            dx -= distance
+        if 'd' in move_direction.lower():
+            dx += distance
+        return player_pos[0] + dx, player_pos[1] + dy
+
+    def prefetch_line_of_sight(self, player_pos, enemy_data, walls):
+        """
+        Resolves every enemy line of sight and the movement scorer probes of this tick in a
+        single backend call, so the following targeting, score_movement and is_path_blocked
+        checks are answered from the wall index cache (the one step W, A, S and D probes are
+        the segments is_path_blocked asks for).
+        """
+        if not walls:
+            return
+        _, ends = self.movement_scorer.get_probe_segments(player_pos, self.TILE_SIZE * self.window_controller.scale_factor)
+        ends = list(ends)
+        if enemy_data:
+            ends += [self.get_enemy_pos(enemy) for enemy in enemy_data]
+        self.get_wall_index(walls).segments_blocked([player_pos] * len(ends), ends)
 
     def no_enemy_movement(self, player_data, walls):
         player_position = self.get_player_pos(player_data)
         preferred_movement = 'W' if self.game_mode == 3 else 'D'  # Adjust based on game mode
 
+        objective = self.get_objective_position(player_position, preferred_movement)
+        planned_movement = self.get_path_movement(player_position, objective, walls)
+        if planned_movement and not self.is_path_blocked(player_position, planned_movement, walls):
+            return planned_movement
+
         if not self.is_path_blocked(player_position, preferred_movement, walls):
             return preferred_movement
         else:
@@ -237,56 +264,54 @@ class Play(Movement):
             # If no movement is possible, return empty string
             return preferred_movement
 
-    def is_enemy_hittable(self, player_pos, enemy_pos, walls, skill_type):
-        if self.can_attack_through_walls(self.current_brawler, skill_type, self.brawlers_info):
-            return True
-        if self.walls_are_in_line_of_sight(LineString([player_pos, enemy_pos]), walls):
-            return False
-        return True
-
-    def find_closest_enemy(self, enemy_data, player_coords, walls, skill_type):
-        player_pos_x, player_pos_y = player_coords
-        closest_hittable_distance = float('inf')
-        closest_unhittable_distance = float('inf')
-        closest_hittable = None
-        closest_unhittable = None
-        for enemy in enemy_data:
-            enemy_pos = self.get_enemy_pos(enemy)
-            distance = self.get_distance(enemy_pos, player_coords)
-            if self.is_enemy_hittable((player_pos_x, player_pos_y), enemy_pos, walls, skill_type):
-                if distance < closest_hittable_distance:
-                    closest_hittable_distance = distance
-                    closest_hittable = [enemy_pos, distance]
-            else:
-                if distance < closest_unhittable_distance:
-                    closest_unhittable_distance = distance
-                    closest_unhittable = [enemy_pos, distance]
-        if closest_hittable:
-            return closest_hittable
-        elif closest_unhittable:
-            return closest_unhittable
-
-        return None, None
+    def get_target_table(self, enemy_data, player_pos, walls, brawler):
+        _, attack_range, super_range = self.get_brawler_range(brawler)
+        return rank_targets(
+            enemy_data, player_pos, self.get_wall_index(walls), attack_range, super_range,
+            ignore_walls_for_attacks=self.brawler_catalog.ignores_walls(brawler, "attack"),
+            ignore_walls_for_supers=self.brawler_catalog.ignores_walls(brawler, "super"),
+        )
 
     def get_main_data(self, frame):
         data = self.Detect_main_info.detect_objects(frame, conf_tresh=self.entity_detection_confidence)
         return data
 
     def is_path_blocked(self, player_pos, move_direction, walls, distance=None):  # Increased distance
-        if distance is None:
-            distance = self.TILE_SIZE*self.window_controller.scale_factor
-        dx, dy = 0, 0
-        if 'w' in move_direction.lower():
-            dy -= distance
-        if 's' in move_direction.lower():
-            dy += distance
-        if 'a' in move_direction.lower():
-            dx -= distance
-        if 'd' in move_direction.lower():
-            dx += distance
-        new_pos = (player_pos[0] + dx, player_pos[1] + dy)
-        path_line = LineString([player_pos, new_pos])
-        return self.walls_are_in_line_of_sight(path_line, walls)
+        new_pos = self.get_move_target(player_pos, move_direction, distance)
+        return self.is_segment_blocked(player_pos, new_pos, walls)
+
+    def score_movement(self, player_pos, target_pos, safe_range, attack_range, targets, walls, planned_movement=None):
+        step = self.TILE_SIZE * self.window_controller.scale_factor
+        starts, ends = self.movement_scorer.get_probe_segments(player_pos, step)
+        if walls:
+            probes_blocked = self.get_wall_index(walls).segments_blocked(starts, ends)
+        else:
+            probes_blocked = np.zeros(len(ends), dtype=bool)
+        scores = self.movement_scorer.score(player_pos, step, probes_blocked, target_pos, safe_range, attack_range,
+                                            targets.positions, self.game_mode, planned_movement)
+        self.scored_movement = self.movement_scorer.best_movement(scores)
+        self.movement_angle = self.movement_scorer.best_angle(scores)
+        return self.scored_movement
+
+    def get_path_movement(self, player_pos, goal, walls):
+        if not self.use_pathfinding or not walls:
+            return None
+        if self.navigator is None:
+            self.navigator = Navigator(self.TILE_SIZE * (self.window_controller.scale_factor or 1))
+        waypoint = self.navigator.next_waypoint(player_pos, goal, walls, self.camera_tracker.offset)
+        if waypoint is None:
+            return None
+        return direction_to_movement(waypoint[0] - player_pos[0], waypoint[1] - player_pos[1]) or None
+
+    def get_objective_position(self, player_pos, preferred_movement):
+        """A point far ahead in the game mode direction, fixed in world space so the path can be repaired incrementally."""
+        offset = self.camera_tracker.offset
+        tile = self.TILE_SIZE * (self.window_controller.scale_factor or 1)
+        player_world = (player_pos[0] + offset[0], player_pos[1] + offset[1])
+        if (self.objective_world is None
+                or math.hypot(self.objective_world[0] - player_world[0], self.objective_world[1] - player_world[1]) < 3 * tile):
+            self.objective_world = self.get_move_target(player_world, preferred_movement, distance=10 * tile)
+        return self.objective_world[0] - offset[0], self.objective_world[1] - offset[1]
 
     @staticmethod
     def validate_game_data(data):
@@ -314,138 +339,145 @@ class Play(Movement):
 
     def do_movement(self, movement):
         movement = movement.lower()
-        keys_to_keyDown = []
-        keys_to_keyUp = []
-        for key in ['w', 'a', 's', 'd']:
-            if key in movement:
-                keys_to_keyDown.append(key)
-            else:
-                keys_to_keyUp.append(key)
-
-        if keys_to_keyDown:
-            self.window_controller.keys_down(keys_to_keyDown)
-
-        self.window_controller.keys_up(keys_to_keyUp)
-
-        self.keys_hold = keys_to_keyDown
+        self.keys_hold = [key for key in ['w', 'a', 's', 'd'] if key in movement]
+        angle = movement_to_angle(movement)
+        if angle is None:
+            self.keys_hold = []
+            self.window_controller.release_joystick()
+            return
+        # Use the continuous angle of the scored direction while that is still the movement
+        # (it can be replaced by the previous movement or an unstuck movement)
+        if self.scored_movement is not None and set(movement) == set(self.scored_movement.lower()):
+            angle = self.movement_angle
+        self.window_controller.move_joystick(angle)
 
     def get_brawler_range(self, brawler):
-        if self.brawler_ranges is None:
-            self.brawler_ranges = self.load_brawler_ranges(self.brawlers_info)
-        return self.brawler_ranges[brawler]
+        return self.brawler_catalog.get_ranges(brawler, self.window_controller.scale_factor)
 
     def loop(self, brawler, data, current_time):
         movement = self.get_movement(player_data=data['player'][0], enemy_data=data['enemy'], walls=data['wall'], brawler=brawler)
         current_time = time.time()
+        self.motion_estimator.update(
+            current_time, self.get_player_pos(data['player'][0]), self.camera_tracker.offset, bool(self.keys_hold),
+            reliable=self.camera_tracker.last_response >= self.camera_tracker.min_response,
+            min_displacement=0.3 * self.TILE_SIZE * self.window_controller.scale_factor,
+        )
         if current_time - self.time_since_movement > self.minimum_movement_delay:
             movement = self.unstuck_movement_if_needed(movement, current_time)
             self.do_movement(movement)
             self.time_since_movement = time.time()
         return movement
 
-    def check_if_hypercharge_ready(self, frame):
-        screenshot = frame.crop((1350 * self.window_controller.width_ratio, 940 * self.window_controller.height_ratio, 1450 * self.window_controller.width_ratio, 1050 * self.window_controller.height_ratio))
-        purple_pixels = count_hsv_pixels(screenshot, (137, 158, 159), (179, 255, 255))
-        if purple_pixels > self.hypercharge_pixels_minimum:
-            return True
-        return False
-
-    def check_if_gadget_ready(self, frame):
-        screenshot = frame.crop((1580 * self.window_controller.width_ratio, 930 * self.window_controller.height_ratio, 1700 * self.window_controller.width_ratio, 1050 * self.window_controller.height_ratio))
-        green_pixels = count_hsv_pixels(screenshot, (57, 219, 165), (62, 255, 255))
-        if green_pixels > self.gadget_pixels_minimum:
-            return True
-        return False
-
-    def check_if_super_ready(self, frame):
-        screenshot = frame.crop((1460 * self.window_controller.width_ratio, 830 * self.window_controller.height_ratio, 1560 * self.window_controller.width_ratio, 930 * self.window_controller.height_ratio))
-        yellow_pixels = count_hsv_pixels(screenshot, (17, 170, 200), (27, 255, 255))
-        if yellow_pixels > self.super_pixels_minimum:
-            return True
-        return False
-
     def get_tile_data(self, frame):
         tile_data = self.Detect_tile_detector.detect_objects(frame, conf_tresh=self.wall_detection_confidence)
         return tile_data
 
-    def process_tile_data(self, tile_data):
-        walls = []
-        for class_name, boxes in tile_data.items():
-            if class_name != 'bush':
-                walls.extend(boxes)
-
-        # Add walls to history
-        self.wall_history.append(walls)
-        if len(self.wall_history) > self.wall_history_length:
-            self.wall_history.pop(0)
-        # Combine walls from history
-        combined_walls = self.combine_walls_from_history()
-
-        return combined_walls
-
-    def combine_walls_from_history(self):
-        wall_counts = {}
-        for walls in self.wall_history:
-            for wall in walls:
-                wall_key = tuple(wall)
-                wall_counts[wall_key] = wall_counts.get(wall_key, 0) + 1
-
-        threshold = 1
+    def get_wall_map(self):
+        if self.wall_map is None:
+            self.wall_map = WorldWallMap(self.TILE_SIZE * (self.window_controller.scale_factor or 1))
+        return self.wall_map
+
+    def get_view_size(self):
+        return self.window_controller.width, self.window_controller.height
+
+    def register_map_layout(self, tile_data):
+        """Anchors the pending cached layout to this match's world frame with the walls detected now."""
+        offset = np.tile(self.camera_tracker.offset, 2)
+        observed = {class_name: [np.asarray(box, dtype=float) + offset for box in boxes]
+                    for class_name, boxes in tile_data.items()}
+        shift, match_ratio = register_layout(self.pending_map_layout, observed, self.get_wall_map().cell_size)
+        if shift is None:
+            return
+        layout, self.pending_map_layout = self.pending_map_layout, None
+        if match_ratio < self.map_cache_min_match:
+            print("Cached map layout doesn't match this arena, detecting walls normally")
+            return
+        print("Cached wall layout registered to the arena")
+        self.wall_map.load(shift_layout(layout, shift))
+        self.map_layout_preloaded = True
 
-        combined_walls = [list(wall) for wall, count in wall_counts.items() if count >= threshold]
-        # print(f"Combined walls: {combined_walls}")
+    def process_tile_data(self, tile_data):
+        if self.pending_map_layout is not None:
+            self.register_map_layout(tile_data)
+        match_ratio = self.get_wall_map().observe(tile_data, self.camera_tracker.offset, self.get_view_size())
+        self.wall_detection_passes += 1
+        if self.map_layout_preloaded and match_ratio < self.map_cache_min_match:
+            print("Cached map layout doesn't match this arena, detecting walls normally")
+            self.map_layout_preloaded = False
+            self.wall_map.reset()
+            self.wall_map.observe(tile_data, self.camera_tracker.offset, self.get_view_size())
+        return self.get_projected_walls()
+
+    def update_map_fingerprint(self, frame):
+        fingerprint = self.map_cache.add_frame(frame)
+        if fingerprint is None:
+            return
+        self.map_fingerprint = fingerprint
+        layout = self.map_cache.lookup(fingerprint)
+        if layout:
+            # Its world frame is the one of the match it was learned in, it is loaded once
+            # registered against the next wall detection
+            print("Known map, cached wall layout found")
+            self.pending_map_layout = layout
+
+    def save_map_layout(self):
+        if (self.map_cache is None or self.map_fingerprint is None or self.wall_map is None
+                or self.wall_detection_passes < self.map_cache_min_passes):
+            return
+        self.map_cache.save(self.map_fingerprint, self.wall_map.export())
 
-        return combined_walls
+    def get_projected_walls(self):
+        wall_map = self.get_wall_map()
+        projected = wall_map.project(self.camera_tracker.offset, self.get_view_size())
+        self.walls_by_class = consolidate_walls(projected, wall_map.cell_size)
+        walls = []
+        for boxes in self.walls_by_class.values():
+            walls.extend(boxes)
+        return walls
+
+    def reset_wall_memory(self):
+        if self.motion_estimator.moving_time:
+            print(self.motion_estimator.get_report())
+            self.motion_estimator.reset_metrics()
+        self.motion_estimator.reset()
+        self.save_map_layout()
+        self.map_fingerprint = None
+        self.map_layout_preloaded = False
+        self.pending_map_layout = None
+        self.wall_detection_passes = 0
+        if self.map_cache is not None:
+            self.map_cache.start_match()
+        self.camera_tracker.reset()
+        if self.wall_map is not None:
+            self.wall_map.reset()
+        self.walls_by_class = {}
+        self.last_walls_data = []
+        if self.navigator is not None:
+            self.navigator.reset()
+        self.objective_world = None
 
     def get_movement(self, player_data, enemy_data, walls, brawler):
-        brawler_info = self.brawlers_info.get(brawler)
-        if not brawler_info:
+        if brawler not in self.brawler_catalog:
             raise ValueError(f"Brawler '{brawler}' not found in brawlers info.")
         safe_range, attack_range, super_range = self.get_brawler_range(brawler)
+        self.scored_movement = None
 
         player_pos = self.get_player_pos(player_data)
+        self.prefetch_line_of_sight(player_pos, enemy_data, walls)
         if not self.is_there_enemy(enemy_data):
             return self.no_enemy_movement(player_data, walls)
-        enemy_coords, enemy_distance = self.find_closest_enemy(enemy_data, player_pos, walls, "attack")
+        targets = self.get_target_table(enemy_data, player_pos, walls, brawler)
+        enemy_coords, enemy_distance = targets.best()
         if enemy_coords is None:
             return self.no_enemy_movement(player_data, walls)
-        direction_x = enemy_coords[0] - player_pos[0]
-        direction_y = enemy_coords[1] - player_pos[1]
-
-        # Determine initial movement direction
-        if enemy_distance > safe_range:  # Move towards the enemy
-            move_horizontal = self.get_horizontal_move_key(direction_x)
-            move_vertical = self.get_vertical_move_key(direction_y)
-        else:  # Move away from the enemy
-            move_horizontal = self.get_horizontal_move_key(direction_x, opposite=True)
-            move_vertical = self.get_vertical_move_key(direction_y, opposite=True)
-
-        movement_options = [move_horizontal + move_vertical]
-        if self.game_mode == 3:
-            movement_options += [move_vertical, move_horizontal]
-        elif self.game_mode == 5:
-            movement_options += [move_horizontal, move_vertical]
-        else:
+        if self.game_mode not in (3, 5):
             raise ValueError("Gamemode type is invalid")
 
-        # Check for walls and adjust movement
-        for move in movement_options:
-            if not self.is_path_blocked(player_pos, move, walls):
-                movement = move
-                break
-        else:
-            print("default paths are blocked")
-            # If all preferred directions are blocked, try other directions
-            alternative_moves = ['W', 'A', 'S', 'D']
-            random.shuffle(alternative_moves)
-            for move in alternative_moves:
-                if not self.is_path_blocked(player_pos, move, walls):
-                    movement = move
-                    break
-            else:
-                # if no movement is available, we still try to go in the best direction
-                # because it's better than doing nothing
-                movement = move_horizontal + move_vertical
+        planned_movement = None
+        if enemy_distance > safe_range:  # Follow the planned path while approaching
+            planned_movement = self.get_path_movement(player_pos, enemy_coords, walls)
+        movement = self.score_movement(player_pos, enemy_coords, safe_range, attack_range, targets, walls,
+                                       planned_movement)
 
         current_time = time.time()
         if movement != self.last_movement:
@@ -458,7 +490,7 @@ class Play(Movement):
             self.last_movement_time = current_time  # Reset timer if movement didn't change
 
         # Attack if enemy is within attack range and hittable
-        if enemy_distance <= attack_range:
+        if targets.in_attack_range[0]:
             if self.should_use_gadget == True and self.is_gadget_ready:
                 self.use_gadget()
                 self.time_since_gadget_checked = time.time()
@@ -467,16 +499,13 @@ class Play(Movement):
                 self.use_hypercharge()
                 self.time_since_hypercharge_checked = time.time()
                 self.is_hypercharge_ready = False
-            enemy_hittable = self.is_enemy_hittable(player_pos, enemy_coords, walls, "attack")
-            # print("enemy hittable", enemy_hittable, "enemy_distance", enemy_distance)
-            if enemy_hittable:
+            # print("enemy hittable", targets.attack_hittable[0], "enemy_distance", enemy_distance)
+            if targets.attack_hittable[0]:
                 self.attack()
         if self.is_super_ready:
-            super_type = brawler_info['super_type']
-            enemy_hittable = self.is_enemy_hittable(player_pos, enemy_coords, walls, "super")
-
-            if (enemy_hittable and
-                    (enemy_distance <= super_range
+            super_type = self.brawler_catalog.super_type(brawler)
+            if (targets.super_hittable[0] and
+                    (targets.in_super_range[0]
                      or super_type in ["spawnable", "other"]
                      or (brawler in ["stu", "surge"] and super_type == "charge" and enemy_distance <= super_range + attack_range)
                     )):
@@ -488,18 +517,22 @@ class Play(Movement):
     def main(self, frame, brawler):
         current_time = time.time()
         data = self.get_main_data(frame)
-        if self.should_detect_walls and current_time - self.time_since_walls_checked > self.walls_treshold:
-
-            tile_data = self.get_tile_data(frame)
-
-            walls = self.process_tile_data(tile_data)
-
-            self.time_since_walls_checked = current_time
+        self.window_controller.latency_tracer.mark("detection")
+        # The camera is tracked every tick so remembered walls follow the scene between detections
+        # and the motion estimator can tell real movement from running into a wall
+        self.camera_tracker.update(frame)
+        if self.should_detect_walls:
+            if self.map_cache is not None and self.map_fingerprint is None and data.get('player'):
+                self.update_map_fingerprint(frame)
+            walls_treshold = self.wall_verification_treshold if self.map_layout_preloaded else self.walls_treshold
+            if current_time - self.time_since_walls_checked > walls_treshold:
+                tile_data = self.get_tile_data(frame)
+                walls = self.process_tile_data(tile_data)
+                self.time_since_walls_checked = current_time
+            else:
+                walls = self.get_projected_walls()
             self.last_walls_data = walls
             data['wall'] = walls
-        elif self.keep_walls_in_memory:
-            data['wall'] = self.last_walls_data
-
 
         data = self.validate_game_data(data)
         self.track_no_detections(data)
@@ -519,20 +552,14 @@ class Play(Movement):
                     self.time_since_last_proceeding = time.time()
             return
         self.time_since_last_proceeding = time.time()
-        self.is_hypercharge_ready = False
-        if current_time - self.time_since_hypercharge_checked > self.hypercharge_treshold:
-            self.is_hypercharge_ready = self.check_if_hypercharge_ready(frame)
-            self.time_since_hypercharge_checked = current_time
-        self.is_gadget_ready = False
-        if current_time - self.time_since_gadget_checked > self.gadget_treshold:
-            self.is_gadget_ready = self.check_if_gadget_ready(frame)
-            self.time_since_gadget_checked = current_time
-        self.is_super_ready = False
-        if current_time - self.time_since_super_checked > self.super_treshold:
-            self.is_super_ready = self.check_if_super_ready(frame)
-            self.time_since_super_checked = current_time
+        # The HUD is read every tick, the tresholds only act as a cooldown after a button was used
+        hud = self.hud_analyzer.analyze(frame)
+        self.is_hypercharge_ready = hud["hypercharge"] and current_time - self.time_since_hypercharge_checked > self.hypercharge_treshold
+        self.is_gadget_ready = hud["gadget"] and current_time - self.time_since_gadget_checked > self.gadget_treshold
+        self.is_super_ready = hud["super"] and current_time - self.time_since_super_checked > self.super_treshold
 
         movement = self.loop(brawler, data, current_time)
+        self.window_controller.latency_tracer.mark("decision")
 
         # if data:
         #     # Record scene data
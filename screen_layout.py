@@ -0,0 +1,102 @@
+import numpy as np
+from PIL import Image
+
+brawl_stars_width, brawl_stars_height = 1920, 1080
+
+# name: (x1, y1, x2, y2) at 1920x1080
+SCREEN_RECTS = {
+    "trophy_observer": (20, 10, 650, 200),
+    "idle_check": (400, 380, 1500, 700),
+    "play_store_icon_bar": (50, 4, 900, 31),
+    # Around the proceed button of the end screen, pressed with key_Q
+    "end_continue_button": (1450, 880, 1920, 1080),
+}
+
+# name: (x, y) at 1920x1080
+SCREEN_POINTS = {
+    "joystick": (220, 870),
+    "key_H": (1400, 990),
+    "key_G": (1640, 990),
+    "key_M": (1725, 800),
+    "key_Q": (1740, 1000),
+    "key_E": (1510, 880),
+    "select_btn": (150, 950),
+    "brawl_stars_icon": (960, 540),
+    "unidle": (535, 615),
+    "quit_shop": (100, 60),
+    "brawler_list_swipe_start": (1700, 900),
+    "brawler_list_swipe_short": (1700, 850),
+    "brawler_list_swipe_long": (1700, 650),
+}
+
+
+class ScreenLayout:
+    """
+    Every screen region and tap point the bot uses, defined once at 1920x1080. The pixel
+    rects and points are computed a single time when the capture resolution becomes known,
+    and regions are handed out as slice views of the frame.
+    """
+
+    def __init__(self, rects=None, points=None):
+        self.reference_rects = dict(SCREEN_RECTS if rects is None else rects)
+        self.reference_points = dict(SCREEN_POINTS if points is None else points)
+        self.resolution = None
+        self.width_ratio = None
+        self.height_ratio = None
+        self.rects = {}
+        self.points = {}
+
+    @classmethod
+    def from_config(cls, lobby_config):
+        """Default layout plus the [lobby] and [template_matching] regions of the lobby config."""
+        layout = cls()
+        for name, (x, y, width, height) in lobby_config.get('template_matching', {}).items():
+            layout.reference_rects[name] = (x, y, x + width, y + height)
+        for name, values in lobby_config.get('lobby', {}).items():
+            if len(values) == 4:
+                layout.reference_rects[name] = tuple(values)
+            elif len(values) == 2:
+                layout.reference_points[name] = tuple(values)
+        return layout
+
+    def set_resolution(self, width, height):
+        if self.resolution == (width, height):
+            return
+        self.resolution = (width, height)
+        self.width_ratio, self.height_ratio = width / brawl_stars_width, height / brawl_stars_height
+        self.rects = {name: (int(x1 * self.width_ratio), int(y1 * self.height_ratio),
+                             int(x2 * self.width_ratio), int(y2 * self.height_ratio))
+                      for name, (x1, y1, x2, y2) in self.reference_rects.items()}
+        self.points = {name: (int(x * self.width_ratio), int(y * self.height_ratio))
+                       for name, (x, y) in self.reference_points.items()}
+
+    def set_resolution_from(self, frame):
+        if isinstance(frame, Image.Image):
+            self.set_resolution(*frame.size)
+        else:
+            self.set_resolution(frame.shape[1], frame.shape[0])
+
+    def rect(self, name):
+        return self.rects[name]
+
+    def point(self, name):
+        return self.points[name]
+
+    def crop(self, frame, name):
+        """The named region of the frame, a view for arrays and a cropped copy for PIL images."""
+        self.set_resolution_from(frame)
+        x1, y1, x2, y2 = self.rects[name]
+        if isinstance(frame, Image.Image):
+            return np.asarray(frame.crop((x1, y1, x2, y2)))
+        return frame[y1:y2, x1:x2]
+
+
+_layout = None
+
+
+def get_screen_layout():
+    global _layout
+    if _layout is None:
+        from utils import load_toml_as_dict
+        _layout = ScreenLayout.from_config(load_toml_as_dict("./cfg/lobby_config.toml"))
+    return _layout
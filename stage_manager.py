@@ -4,12 +4,11 @@ import sys
 import asyncio
 import time
 
-import cv2
 import numpy as np
-import pyautogui
 import requests
 
 from state_finder.main import get_state
+from template_cache import get_template_cache
 from trophy_observer import TrophyObserver
 from utils import find_template_center, extract_text_and_positions, load_toml_as_dict, async_notify_user, \
     save_brawler_data
@@ -34,17 +33,8 @@ def notify_user(message_type):
 
 
 def load_image(image_path, scale_factor):
-    # Load the image
-    image = cv2.imread(image_path)
-    orig_height, orig_width = image.shape[:2]
-
-    # Calculate the new dimensions based on the scale factor
-    new_width = int(orig_width * scale_factor)
-    new_height = int(orig_height * scale_factor)
-
-    # Resize the image
-    resized_image = cv2.resize(image, (new_width, new_height))
-    return resized_image
+    """The template scaled by scale_factor in grayscale, as find_template_center matches it. Cached and read only."""
+    return get_template_cache().get(image_path, scale_factor, gray=True)
 
 class StageManager:
 
@@ -61,8 +51,6 @@ class StageManager:
         }
         self.Lobby_automation = lobby_automator
         self.lobby_config = load_toml_as_dict("./cfg/lobby_config.toml")
-        self.brawl_stars_icon = None
-        self.close_popup_icon = None
         self.brawlers_pick_data = brawlers_data
         brawler_list = [brawler["brawler"] for brawler in brawlers_data]
         self.Trophy_observer = TrophyObserver(brawler_list)
@@ -78,8 +66,7 @@ class StageManager:
                 self.window_controller.click(x, y)
                 return
 
-        brawl_stars_icon_coords = self.lobby_config['lobby'].get('brawl_stars_icon', [960, 540])
-        x, y = brawl_stars_icon_coords[0]*self.window_controller.width_ratio, brawl_stars_icon_coords[1]*self.window_controller.height_ratio
+        x, y = self.window_controller.layout.point("brawl_stars_icon")
         self.window_controller.click(x, y)
 
     @staticmethod
@@ -170,17 +157,19 @@ class StageManager:
         print("Pressed Q to start a match")
 
     def click_brawl_stars(self, frame):
-        screenshot = frame.crop((50, 4, 900, 31))
-        if self.brawl_stars_icon is None:
-            self.brawl_stars_icon = load_image("state_finder/images_to_detect/brawl_stars_icon.png",
-                                               self.window_controller.scale_factor)
-        detection = find_template_center(screenshot, self.brawl_stars_icon)
+        # Cached per scale, and read again after update_icons rewrote the icon
+        brawl_stars_icon = load_image("state_finder/images_to_detect/brawl_stars_icon.png",
+                                      self.window_controller.scale_factor)
+        detection = find_template_center(frame, brawl_stars_icon,
+                                         region=self.window_controller.layout.rect("play_store_icon_bar"))
         if detection:
             x, y = detection
-            self.window_controller.click(x=x + 50, y=y)
+            self.window_controller.click(x=x, y=y)
     def click_star_drop(self):
         if self.long_press_star_drop == "yes":
             self.window_controller.press_key("Q",10)
+            # The hold is sent in the background, the bot stays on the star drop until it ends
+            self.window_controller.wait_for_input(timeout=11)
         else:
             self.window_controller.press_key("Q")
 
@@ -244,13 +233,13 @@ class StageManager:
         if debug: print("Game has ended", current_state)
 
     def quit_shop(self):
-        self.window_controller.click(100*self.window_controller.width_ratio, 60*self.window_controller.height_ratio)
+        self.window_controller.click(*self.window_controller.layout.point("quit_shop"))
 
     def close_pop_up(self):
         screenshot = self.window_controller.screenshot()
-        if self.close_popup_icon is None:
-            self.close_popup_icon = load_image("state_finder/images_to_detect/close_popup.png", self.window_controller.scale_factor)
-        popup_location = find_template_center(screenshot, self.close_popup_icon)
+        close_popup_icon = load_image("state_finder/images_to_detect/close_popup.png", self.window_controller.scale_factor)
+        popup_location = find_template_center(screenshot, close_popup_icon,
+                                              region=self.window_controller.layout.rect("close_popup"))
         if popup_location:
             self.window_controller.click(*popup_location)
 
@@ -0,0 +1,92 @@
+import time
+
+
+class StateCheck:
+    """One test of the state cascade, check(image) -> bool. Keeps its call count, hits and time spent."""
+
+    def __init__(self, name, state, check):
+        self.name = name
+        self.state = state
+        self.check = check
+        self.calls = 0
+        self.hits = 0
+        self.total_time = 0.0
+
+    def __call__(self, image):
+        start = time.perf_counter()
+        hit = bool(self.check(image))
+        self.total_time += time.perf_counter() - start
+        self.calls += 1
+        self.hits += hit
+        return hit
+
+    @property
+    def mean_cost(self):
+        return self.total_time / self.calls if self.calls else 0.0
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.calls if self.calls else 0.0
+
+    def stats(self):
+        return {"name": self.name, "state": self.state, "calls": self.calls, "hits": self.hits,
+                "hit_rate": self.hit_rate, "mean_cost": self.mean_cost}
+
+
+class StateClassifier:
+    """
+    Tells the screen state through a cascade of checks, the first hit wins and "match" is
+    the default. The end screen is read with OCR, the most expensive check by far, so it
+    only runs when the cheap end_precheck finds an end screen likely, while the last state
+    was the end screen (leaving it is confirmed the same way it was found) and every
+    ocr_fallback_interval seconds as a fallback. precheck_misses counts the end screens
+    only the fallback found, the data to validate the precheck with.
+    Checks are tried in the given order, overlapping screens have to come in their order
+    of precedence (a popup over the lobby is a popup).
+    """
+
+    def __init__(self, checks, end_precheck, end_confirm, ocr_fallback_interval=30.0):
+        self.checks = list(checks)
+        self.end_precheck = end_precheck
+        self.end_confirm = end_confirm
+        self.ocr_fallback_interval = ocr_fallback_interval
+        self.last_confirm_time = 0.0
+        self.precheck_misses = 0
+        self.last_state = None
+
+    def classify(self, image):
+        self.last_state = self._classify(image)
+        return self.last_state
+
+    def _classify(self, image):
+        end_likely = self.end_precheck(image)
+        now = time.time()
+        if (end_likely or self.last_state == self.end_confirm.state
+                or now - self.last_confirm_time >= self.ocr_fallback_interval):
+            self.last_confirm_time = now
+            if self.end_confirm(image):
+                if not end_likely:
+                    self.precheck_misses += 1
+                return self.end_confirm.state
+        for check in self.checks:
+            if check(image):
+                return check.state
+        return "match"
+
+    def all_checks(self):
+        return [self.end_precheck, self.end_confirm] + self.checks
+
+    def stats(self):
+        return [check.stats() for check in self.all_checks()]
+
+    def suggested_order(self):
+        """
+        Names of the cascade checks by expected time spent per hit, cheapest first. Only
+        checks of screens that never overlap can be moved freely.
+        """
+        return [check.name for check in sorted(self.checks, key=lambda check: check.mean_cost / max(check.hit_rate, 1e-3))]
+
+    def format_report(self):
+        report = " | ".join(f"{check.name} {check.mean_cost * 1000:.1f}ms {check.hit_rate * 100:.0f}%"
+                            for check in self.all_checks() if check.calls)
+        return f"{report} | precheck misses {self.precheck_misses}"
@@ -4,9 +4,12 @@ from utils import reader
 import cv2
 import numpy as np
 from difflib import SequenceMatcher
-from PIL import Image
 sys.path.append(os.path.abspath('../'))
-from utils import count_hsv_pixels, load_toml_as_dict
+from utils import load_toml_as_dict
+from color_mask import ColorRange
+from screen_layout import get_screen_layout
+from state_classifier import StateCheck, StateClassifier
+from template_cache import get_template_cache
 
 orig_screen_width, orig_screen_height = 1920, 1080
 
@@ -17,34 +20,22 @@ for file in os.listdir("./state_finder/images_to_detect"):
     if "star_drop" in file:
         images_with_star_drop.append(file)
 # path = r"./images_to_detect/"
-region_data = load_toml_as_dict("./cfg/lobby_config.toml")['template_matching']
+play_store_background = ColorRange((0, 0, 240), (180, 20, 255))
 
-def is_template_in_region(image, template_path, region):
-    current_height, current_width = image.shape[:2]
-    orig_x, orig_y, orig_width, orig_height = region
-    width_ratio, height_ratio = current_width / orig_screen_width, current_height / orig_screen_height
-
-
-    new_x, new_y = int(orig_x * width_ratio), int(orig_y * height_ratio)
-    new_width, new_height = int(orig_width * width_ratio), int(orig_height * height_ratio)
-    cropped_image = image[new_y:new_y + new_height, new_x:new_x + new_width]
+def is_template_in_region(image, template_path, region_name, threshold=0.7):
+    cropped_image = get_screen_layout().crop(image, region_name)
     current_height, current_width = image.shape[:2]
     loaded_template = load_template(template_path, current_width, current_height)
     # save to debug frames both template and image
     result = cv2.matchTemplate(cropped_image, loaded_template,
                                cv2.TM_CCOEFF_NORMED)
     min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-    return max_val > 0.7
+    return max_val > threshold
 
 
 def load_template(image_path, width, height):
-    current_width_ratio, current_height_ratio = width / orig_screen_width, height / orig_screen_height
-    image = cv2.imread(image_path)
-    orig_height, orig_width = image.shape[:2]
-    resized_image = cv2.resize(image, (int(orig_width * current_width_ratio), int(orig_height * current_height_ratio)))
-    return resized_image
-
-crop_region = load_toml_as_dict("./cfg/lobby_config.toml")['lobby']['trophy_observer']
+    # Decoded and scaled once per resolution, the cached array is shared and read only
+    return get_template_cache().get_for_resolution(image_path, width, height)
 
 
 def rework_game_result(res_string):
@@ -69,8 +60,7 @@ def find_game_result(screenshot):
         raise TypeError("Expected a numpy.ndarray, but got {}".format(type(screenshot)))
 
     # Effectuez le recadrage directement sur l'array numpy
-    x1, y1, x2, y2 = crop_region
-    screenshot = screenshot[y1:y2, x1:x2]
+    screenshot = get_screen_layout().crop(screenshot, "trophy_observer")
 
     # Appliquez l'OCR
     result = reader.readtext(screenshot)
@@ -86,58 +76,85 @@ def find_game_result(screenshot):
     return True
 
 
-def get_in_game_state(image):
-    if is_in_end_of_a_match(image): return "end"
-    if is_in_shop(image): return "shop"
-    if is_in_offer_popup(image): return "popup"
-    if is_in_lobby(image): return "lobby"
-    if is_in_brawler_selection(image):
-        return "brawler_selection"
-
-    if count_hsv_pixels(Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB)), (0, 0, 240), (180, 20, 255)) > 200000:
-        return "play_store"
-
-    if is_in_brawl_pass(image) or is_in_star_road(image):
-        return "shop"
+def is_in_play_store(image):
+    # A 1 in 16 pixel sample is plenty to tell the mostly white play store screen. The
+    # minimum is a count at 1920x1080, scaled with the area of the capture
+    area_ratio = image.shape[0] * image.shape[1] / (orig_screen_width * orig_screen_height)
+    return play_store_background.count(image, channel_order="bgr", stride=4) > 200000 * area_ratio
 
-    if is_in_star_drop(image):
-        return "star_drop"
 
-    return "match"
+def get_in_game_state(image):
+    return get_state_classifier().classify(image)
+
+
+_state_classifier = None
+
+
+def get_state_classifier():
+    """
+    The state cascade, in the order of precedence of the screens since overlays (a popup
+    with a white panel over the lobby for example) match together with the screen below.
+    OCR only confirms the end screens the precheck finds likely, the fallback every 30 s
+    catches the ones it misses and counts them in precheck_misses.
+    """
+    global _state_classifier
+    if _state_classifier is None:
+        _state_classifier = StateClassifier(
+            [
+                StateCheck("shop", "shop", is_in_shop),
+                StateCheck("popup", "popup", is_in_offer_popup),
+                StateCheck("lobby", "lobby", is_in_lobby),
+                StateCheck("brawler_selection", "brawler_selection", is_in_brawler_selection),
+                StateCheck("play_store", "play_store", is_in_play_store),
+                StateCheck("brawl_pass", "shop", is_in_brawl_pass),
+                StateCheck("star_road", "shop", is_in_star_road),
+                StateCheck("star_drop", "star_drop", is_in_star_drop),
+            ],
+            end_precheck=StateCheck("end_precheck", "end", is_end_of_a_match_likely),
+            end_confirm=StateCheck("end_ocr", "end", is_in_end_of_a_match),
+            ocr_fallback_interval=30.0,
+        )
+    return _state_classifier
 
 
 def is_in_shop(image) -> bool:
-    return is_template_in_region(image, path + 'powerpoint.png', region_data["powerpoint"])
+    return is_template_in_region(image, path + 'powerpoint.png', "powerpoint")
 
 
 def is_in_brawler_selection(image) -> bool:
-    return is_template_in_region(image, path + 'brawler_menu_task.png', region_data["brawler_menu_task"])
+    return is_template_in_region(image, path + 'brawler_menu_task.png', "brawler_menu_task")
 
 
 def is_in_offer_popup(image) -> bool:
-    return is_template_in_region(image, path + 'close_popup.png', region_data["close_popup"])
+    return is_template_in_region(image, path + 'close_popup.png', "close_popup")
 
 
 def is_in_lobby(image) -> bool:
-    return is_template_in_region(image, path + 'lobby_menu.png', region_data["lobby_menu"])
+    return is_template_in_region(image, path + 'lobby_menu.png', "lobby_menu")
 
 
 def is_in_end_of_a_match(image):
     return find_game_result(image)
 
 
+def is_end_of_a_match_likely(image):
+    # The proceed button of the end screen, a loose match only decides whether OCR runs
+    return is_template_in_region(image, path + "end_battle_top_left_continue_corner.png",
+                                 "end_continue_button", threshold=0.6)
+
+
 def is_in_brawl_pass(image):
     return is_template_in_region(image, path + 'brawl_pass_house.PNG',
-                                 region_data['brawl_pass_house'])
+                                 "brawl_pass_house")
 
 
 def is_in_star_road(image):
-    return is_template_in_region(image, path + "go_back_arrow.png", region_data['go_back_arrow'])
+    return is_template_in_region(image, path + "go_back_arrow.png", "go_back_arrow")
 
 
 def is_in_star_drop(image):
     for image_filename in images_with_star_drop: #kept getting errors so tried changing from image to image_filename
-        if is_template_in_region(image, path + image_filename, region_data['star_drop']):
+        if is_template_in_region(image, path + image_filename, "star_drop"):
             return True
     return False
 
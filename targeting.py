@@ -0,0 +1,42 @@
+import numpy as np
+
+
+class TargetTable:
+    """
+    All detected enemies of a tick, ranked like find_closest_enemy used to pick them:
+    hittable enemies first, then by distance. Row 0 is the target to engage.
+    """
+
+    def __init__(self, positions, distances, attack_hittable, super_hittable, attack_range, super_range):
+        order = np.lexsort((distances, ~attack_hittable))
+        self.positions = positions[order]
+        self.distances = distances[order]
+        self.attack_hittable = attack_hittable[order]
+        self.super_hittable = super_hittable[order]
+        self.in_attack_range = self.distances <= attack_range
+        self.in_super_range = self.distances <= super_range
+
+    def __len__(self):
+        return len(self.distances)
+
+    def best(self):
+        if not len(self):
+            return None, None
+        x, y = self.positions[0].tolist()
+        return (x, y), float(self.distances[0])
+
+
+def rank_targets(enemy_data, player_pos, wall_index, attack_range, super_range,
+                 ignore_walls_for_attacks=False, ignore_walls_for_supers=False):
+    boxes = np.asarray(enemy_data if enemy_data else np.empty((0, 4)), dtype=float).reshape(-1, 4)
+    positions = (boxes[:, :2] + boxes[:, 2:]) / 2
+    offsets = positions - np.asarray(player_pos, dtype=float)
+    distances = np.hypot(offsets[:, 0], offsets[:, 1])
+
+    if ignore_walls_for_attacks and ignore_walls_for_supers:
+        line_of_sight = np.ones(len(positions), dtype=bool)
+    else:
+        line_of_sight = ~wall_index.segments_blocked(np.broadcast_to(player_pos, positions.shape), positions)
+    attack_hittable = line_of_sight | ignore_walls_for_attacks
+    super_hittable = line_of_sight | ignore_walls_for_supers
+    return TargetTable(positions, distances, attack_hittable, super_hittable, attack_range, super_range)
@@ -0,0 +1,80 @@
+import os
+import threading
+
+import cv2
+
+orig_screen_width, orig_screen_height = 1920, 1080
+
+
+class TemplateCache:
+    """
+    Template images decoded once and kept scaled for the resolutions they were asked for,
+    in color (BGR) and grayscale. Returned arrays are shared and read only. A template file
+    that is rewritten (update_icons for example) has to be invalidated to be read again.
+    """
+
+    def __init__(self):
+        # path: BGR image as read from disk
+        self._images = {}
+        # (path, width, height, gray): scaled image
+        self._scaled = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(path):
+        return os.path.normpath(path)
+
+    def image(self, path):
+        path = self.key(path)
+        image = self._images.get(path)
+        if image is None:
+            image = cv2.imread(path)
+            if image is None:
+                raise FileNotFoundError(f"Could not read template '{path}'.")
+            image.flags.writeable = False
+            with self._lock:
+                self._images[path] = image
+        return image
+
+    def get(self, path, width_ratio=1.0, height_ratio=None, gray=False):
+        """The template scaled by width_ratio and height_ratio (width_ratio when not given)."""
+        path = self.key(path)
+        height_ratio = width_ratio if height_ratio is None else height_ratio
+        image = self.image(path)
+        orig_height, orig_width = image.shape[:2]
+        size = (int(orig_width * width_ratio), int(orig_height * height_ratio))
+        scaled = self._scaled.get((path, *size, gray))
+        if scaled is None:
+            scaled = image if size == (orig_width, orig_height) else cv2.resize(image, size)
+            if gray:
+                scaled = cv2.cvtColor(scaled, cv2.COLOR_BGR2GRAY)
+            scaled.flags.writeable = False
+            with self._lock:
+                self._scaled[(path, *size, gray)] = scaled
+        return scaled
+
+    def get_for_resolution(self, path, width, height, gray=False):
+        """The template scaled from 1920x1080 to a width x height screen."""
+        return self.get(path, width / orig_screen_width, height / orig_screen_height, gray)
+
+    def invalidate(self, path=None):
+        """Forgets one template, or every template without a path."""
+        with self._lock:
+            if path is None:
+                self._images.clear()
+                self._scaled.clear()
+                return
+            path = self.key(path)
+            self._images.pop(path, None)
+            for key in [key for key in self._scaled if key[0] == path]:
+                del self._scaled[key]
+
+
+_template_cache = None
+
+
+def get_template_cache():
+    global _template_cache
+    if _template_cache is None:
+        _template_cache = TemplateCache()
+    return _template_cache
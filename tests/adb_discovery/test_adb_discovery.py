@@ -0,0 +1,83 @@
+import os
+import socket
+import tempfile
+import time
+import unittest
+
+from adb_discovery import AdbDiscovery, candidate_ports
+
+
+class FakeDevice:
+
+    def __init__(self, serial):
+        self.serial = serial
+
+
+class FakeAdb:
+
+    def __init__(self, serials=()):
+        self.serials = list(serials)
+        self.connected = []
+
+    def device_list(self):
+        return [FakeDevice(serial) for serial in self.serials]
+
+    def connect(self, addr, timeout=None):
+        self.connected.append(addr)
+        self.serials.append(addr)
+
+
+class TestAdbDiscovery(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_file_path = os.path.join(self.directory.name, "adb_devices.json")
+        self.listener = socket.socket()
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen()
+        self.open_port = self.listener.getsockname()[1]
+
+    def tearDown(self):
+        self.listener.close()
+        self.directory.cleanup()
+
+    def discovery(self, adb_client):
+        return AdbDiscovery(adb_client, cache_file_path=self.cache_file_path, probe_timeout=0.2)
+
+    def test_probes_ports_in_parallel_and_connects_the_open_one(self):
+        adb_client = FakeAdb()
+        closed_ports = [1, 2, 3, 4, 5, 6, 7, 8]
+        start = time.time()
+        device = self.discovery(adb_client).find_device("LDPlayer", ports=closed_ports + [self.open_port])
+        self.assertLess(time.time() - start, 1.0)
+        self.assertEqual(device.serial, f"127.0.0.1:{self.open_port}")
+        self.assertEqual(adb_client.connected, [f"127.0.0.1:{self.open_port}"])
+
+    def test_remembers_the_serial_per_emulator(self):
+        self.discovery(FakeAdb(["emulator-5554", "emulator-5556"])).remember("MEmu", "emulator-5556")
+        device = self.discovery(FakeAdb(["emulator-5554", "emulator-5556"])).find_device("MEmu")
+        self.assertEqual(device.serial, "emulator-5556")
+        device = self.discovery(FakeAdb(["emulator-5554", "emulator-5556"])).find_device("BlueStacks")
+        self.assertEqual(device.serial, "emulator-5554")
+        self.assertEqual(self.discovery(FakeAdb()).load_cache(),
+                         {"MEmu": "emulator-5556", "BlueStacks": "emulator-5554"})
+
+    def test_selected_serial_wins(self):
+        adb_client = FakeAdb(["emulator-5554"])
+        device = self.discovery(adb_client).find_device("LDPlayer", serial=f"127.0.0.1:{self.open_port}")
+        self.assertEqual(device.serial, f"127.0.0.1:{self.open_port}")
+        with self.assertRaises(ConnectionError):
+            self.discovery(adb_client).find_device("LDPlayer", serial="emulator-9999")
+
+    def test_no_device_raises(self):
+        with self.assertRaises(ConnectionError):
+            self.discovery(FakeAdb()).find_device("LDPlayer", ports=[1])
+
+    def test_candidate_ports_put_the_configured_port_early(self):
+        ports = candidate_ports(5575)
+        self.assertEqual(ports[:2], [5555, 5575])
+        self.assertEqual(len(ports), len(set(ports)))
+
+
+if __name__ == "__main__":
+    unittest.main()
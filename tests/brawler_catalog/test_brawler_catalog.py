@@ -0,0 +1,45 @@
+import unittest
+
+from brawler_catalog import BrawlerCatalog, get_brawler_catalog
+from typization import BrawlerName
+
+BRAWLERS_INFO = {
+    "shelly": {"safe_range": 301.0, "attack_range": 490.0, "super_type": "damage", "super_range": 490,
+               "ignore_walls_for_attacks": False, "ignore_walls_for_supers": True},
+    "stu": {"safe_range": 300.0, "attack_range": 560.0, "super_type": "charge", "super_range": 300,
+            "ignore_walls_for_attacks": False, "ignore_walls_for_supers": False},
+}
+
+
+class TestBrawlerCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.catalog = BrawlerCatalog(BRAWLERS_INFO)
+
+    def test_names_are_interned_in_file_order(self):
+        self.assertEqual(self.catalog.id_of("shelly"), 0)
+        self.assertEqual(self.catalog.id_of("stu"), 1)
+        self.assertIn("stu", self.catalog)
+        self.assertNotIn("colt", self.catalog)
+
+    def test_unknown_brawler_raises(self):
+        with self.assertRaises(ValueError):
+            self.catalog.id_of("colt")
+
+    def test_ranges_are_scaled_to_the_resolution(self):
+        self.assertEqual(self.catalog.get_ranges("shelly"), [301, 490, 490])
+        self.assertEqual(self.catalog.get_ranges("shelly", 0.5), [150, 245, 245])
+
+    def test_flags_and_super_types(self):
+        self.assertTrue(self.catalog.ignores_walls("shelly", "super"))
+        self.assertFalse(self.catalog.ignores_walls("shelly", "attack"))
+        self.assertEqual(self.catalog.super_type("stu"), "charge")
+        with self.assertRaises(ValueError):
+            self.catalog.ignores_walls("shelly", "gadget")
+
+    def test_brawler_name_ids_come_from_the_catalog(self):
+        self.assertEqual(BrawlerName.Shelly.id, get_brawler_catalog().id_of("shelly"))
+
+
+if __name__ == "__main__":
+    unittest.main()
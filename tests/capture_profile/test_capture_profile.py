@@ -0,0 +1,31 @@
+import unittest
+
+import numpy as np
+
+from capture_profile import CaptureProfile
+
+
+class TestCaptureProfile(unittest.TestCase):
+
+    def test_reads_general_config(self):
+        profile = CaptureProfile.from_config({"capture_max_width": 960, "capture_max_fps": 20, "capture_crop": []})
+        self.assertEqual(profile.client_kwargs(), {"max_width": 960, "max_fps": 20, "bitrate": 4000000})
+        self.assertIsNone(profile.crop)
+
+    def test_no_crop_keeps_the_frame_and_touches(self):
+        profile = CaptureProfile()
+        frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+        self.assertIs(profile.crop_frame(frame), frame)
+        self.assertEqual(profile.to_stream(100.7, 50.2), (100, 50))
+
+    def test_crop_is_scaled_from_device_to_stream_pixels(self):
+        profile = CaptureProfile(max_width=1280, crop=(0, 60, 2400, 1140))
+        profile.device_size = (2400, 1200)
+        frame = np.zeros((640, 1280, 3), dtype=np.uint8)
+        cropped = profile.crop_frame(frame)
+        self.assertEqual(cropped.shape, (576, 1280, 3))
+        self.assertEqual(profile.to_stream(10, 10), (10, 42))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+
+import cv2
+import numpy as np
+
+from color_mask import ColorRange, quantize
+from hud_analyzer import HUD_INDICATORS
+
+
+# Every range the bot counts: idle gray, play store background and the HUD buttons
+BOT_RANGES = [((0, 0, 55), (10, 15, 77)), ((0, 0, 240), (180, 20, 255))] + \
+    [(low_hsv, high_hsv) for _, low_hsv, high_hsv in HUD_INDICATORS.values()]
+
+
+def exact_mask(rgb_image, low_hsv, high_hsv):
+    hsv = cv2.cvtColor(rgb_image, cv2.COLOR_RGB2HSV)
+    return cv2.inRange(hsv, np.array(low_hsv), np.array(high_hsv)) > 0
+
+
+def exact_count(rgb_image, low_hsv, high_hsv):
+    return int(np.count_nonzero(exact_mask(rgb_image, low_hsv, high_hsv)))
+
+
+class TestColorRange(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.image = rng.integers(0, 256, size=(240, 320, 3), dtype=np.uint8)
+        self.image[:100, :100] = (250, 252, 251)
+        self.image[150:200, 200:300] = (66, 64, 64)
+
+    def test_matches_the_hsv_conversion(self):
+        for low_hsv, high_hsv in [((0, 0, 240), (180, 20, 255)), ((0, 0, 55), (10, 15, 77)),
+                                  ((17, 170, 200), (27, 255, 255))]:
+            expected = exact_count(self.image, low_hsv, high_hsv)
+            counted = ColorRange(low_hsv, high_hsv).count(self.image)
+            self.assertAlmostEqual(counted, expected, delta=max(50, expected * 0.05))
+
+    def test_reads_bgr_buffers_directly(self):
+        color_range = ColorRange((0, 0, 55), (10, 15, 77))
+        bgr = cv2.cvtColor(self.image, cv2.COLOR_RGB2BGR)
+        self.assertEqual(color_range.count(bgr, channel_order="bgr"), color_range.count(self.image))
+
+    def test_strided_count_is_scaled_to_the_full_image(self):
+        color_range = ColorRange((0, 0, 240), (180, 20, 255))
+        self.assertAlmostEqual(color_range.count(self.image, stride=2), color_range.count(self.image), delta=100)
+
+    def test_equal_ranges_share_a_table(self):
+        self.assertIs(ColorRange((0, 0, 240), (180, 20, 255)).table, ColorRange((0, 0, 240), (180, 20, 255)).table)
+
+    def test_indexed_counts_on_slices(self):
+        color_range = ColorRange((0, 0, 240), (180, 20, 255))
+        indices = quantize(self.image)
+        self.assertEqual(color_range.count_indexed(indices[:100, :100]), 100 * 100)
+
+    def test_grays_and_near_whites_in_range_are_never_missed(self):
+        levels = np.arange(256, dtype=np.uint8)
+        grays = np.stack([levels] * 3, axis=-1)[None]
+        near_whites = np.array([[(255, 255, 255), (250, 252, 251), (245, 245, 250), (240, 241, 240),
+                                 (252, 250, 255), (235, 238, 236)]], dtype=np.uint8)
+        for low_hsv, high_hsv in BOT_RANGES:
+            color_range = ColorRange(low_hsv, high_hsv)
+            for image in (grays, near_whites):
+                expected = exact_mask(image, low_hsv, high_hsv)
+                counted = color_range.mask(quantize(image))
+                self.assertTrue(np.all(counted[expected]), (low_hsv, high_hsv, image[expected & ~counted]))
+            # Only the bins straddling the value bounds may be added
+            self.assertLessEqual(color_range.count(grays) - exact_count(grays, low_hsv, high_hsv), 2)
+
+    def test_idle_gray_on_a_real_screenshot(self):
+        screenshot = cv2.cvtColor(cv2.imread("tests/assets/brawlers_menu.PNG"), cv2.COLOR_BGR2RGB)
+        for low_hsv, high_hsv in BOT_RANGES:
+            expected = exact_count(screenshot, low_hsv, high_hsv)
+            counted = ColorRange(low_hsv, high_hsv).count(screenshot)
+            self.assertAlmostEqual(counted, expected, delta=max(50, expected * 0.15))
+
+
+if __name__ == "__main__":
+    unittest.main()
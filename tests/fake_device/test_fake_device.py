@@ -0,0 +1,149 @@
+import socket
+import struct
+import time
+import unittest
+
+from benchmarks.fake_device import FakeDevice, access_units, split_nal_units
+
+SPS = b"\x00\x00\x00\x01\x67\x42\x00\x1f"
+PPS = b"\x00\x00\x00\x01\x68\xce\x3c\x80"
+IDR = b"\x00\x00\x01\x65\x88\x84\x00\x10"
+# Second slice of the same picture, first_mb_in_slice is not 0
+IDR_SLICE = b"\x00\x00\x01\x65\x40\x84\x00\x10"
+P_FRAME = b"\x00\x00\x01\x41\x9a\x02\x04\x08"
+
+
+def send_command(connection, command):
+    connection.sendall(f"{len(command):04x}".encode("utf-8") + command.encode("utf-8"))
+
+
+def read_exactly(connection, size):
+    buffer = b""
+    while len(buffer) < size:
+        chunk = connection.recv(size - len(buffer))
+        if not chunk:
+            break
+        buffer += chunk
+    return buffer
+
+
+def read_until_close(connection):
+    buffer = b""
+    while True:
+        chunk = connection.recv(4096)
+        if not chunk:
+            return buffer
+        buffer += chunk
+
+
+class TestAccessUnits(unittest.TestCase):
+
+    def test_splits_nal_units_with_both_start_codes(self):
+        self.assertEqual(split_nal_units(SPS + PPS + IDR), [SPS, PPS, IDR])
+
+    def test_groups_parameter_sets_and_slices_per_picture(self):
+        frames = access_units(SPS + PPS + IDR + IDR_SLICE + P_FRAME + P_FRAME)
+        self.assertEqual(frames, [SPS + PPS + IDR + IDR_SLICE, P_FRAME, P_FRAME])
+
+
+class TestFakeDevice(unittest.TestCase):
+
+    def setUp(self):
+        self.device = FakeDevice([SPS + PPS + IDR, P_FRAME], (1280, 720), fps=100, port=0)
+        self.device.start()
+
+    def tearDown(self):
+        self.device.stop()
+
+    def connect(self):
+        connection = socket.create_connection(("127.0.0.1", self.device.port), timeout=2)
+        self.addCleanup(connection.close)
+        return connection
+
+    def open_transport(self, serial="fake-device"):
+        connection = self.connect()
+        send_command(connection, f"host:tport:serial:{serial}")
+        return connection
+
+    def shell(self, command):
+        connection = self.open_transport()
+        self.assertEqual(read_exactly(connection, 12)[:4], b"OKAY")
+        send_command(connection, "shell:" + command)
+        self.assertEqual(read_exactly(connection, 4), b"OKAY")
+        return connection
+
+    def test_lists_the_device(self):
+        connection = self.connect()
+        send_command(connection, "host:devices-l")
+        self.assertEqual(read_exactly(connection, 4), b"OKAY")
+        length = int(read_exactly(connection, 4), 16)
+        self.assertEqual(read_exactly(connection, length), b"fake-device\tdevice\n")
+
+    def test_unknown_serial_fails(self):
+        connection = self.open_transport("emulator-5554")
+        self.assertEqual(read_exactly(connection, 4), b"FAIL")
+
+    def test_window_size_shell(self):
+        self.assertIn(b"Physical size: 1280x720", read_until_close(self.shell("wm size")))
+        self.assertIn(b"orientation=0", read_until_close(self.shell("dumpsys display")))
+
+    def test_scrcpy_stream_and_touch_log(self):
+        connection = self.connect()
+        send_command(connection, "localabstract:scrcpy")
+        self.assertEqual(read_exactly(connection, 4), b"FAIL")
+
+        server = self.shell("CLASSPATH=/data/local/tmp/scrcpy-server.jar app_process / com.genymobile.scrcpy.Server")
+        self.assertGreaterEqual(len(read_exactly(server, 10)), 10)
+
+        video = self.open_transport()
+        read_exactly(video, 12)
+        send_command(video, "localabstract:scrcpy")
+        self.assertEqual(read_exactly(video, 4), b"OKAY")
+        control = self.open_transport()
+        read_exactly(control, 12)
+        send_command(control, "localabstract:scrcpy")
+        self.assertEqual(read_exactly(control, 4), b"OKAY")
+
+        header = read_exactly(video, 69)
+        self.assertEqual(header[:1], b"\x00")
+        self.assertEqual(header[1:65].rstrip(b"\x00"), b"Fake Device")
+        self.assertEqual(struct.unpack(">HH", header[65:]), (1280, 720))
+        self.assertEqual(read_exactly(video, len(SPS + PPS + IDR)), SPS + PPS + IDR)
+
+        control.sendall(struct.pack(">BBqiiHHHi", 2, 0, 5, 100, 200, 1280, 720, 0xFFFF, 1))
+        control.sendall(struct.pack(">BBqiiHHHi", 2, 1, 5, 100, 200, 1280, 720, 0xFFFF, 1))
+        deadline = time.time() + 2
+        while len(self.device.touches()) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+
+        touches = self.device.touches()
+        self.assertEqual([(touch["action"], touch["pointer_id"], touch["x"], touch["y"]) for touch in touches],
+                         [("down", 5, 100, 200), ("up", 5, 100, 200)])
+        self.assertGreater(touches[0]["frames_sent"], 0)
+        report = self.device.report()
+        self.assertEqual(report["touches"], 2)
+        self.assertIn("frame_age_p95", report)
+
+    def test_accepts_a_push(self):
+        connection = self.open_transport()
+        read_exactly(connection, 12)
+        send_command(connection, "sync:")
+        self.assertEqual(read_exactly(connection, 4), b"OKAY")
+        path = b"/data/local/tmp/"
+        connection.sendall(b"STAT" + struct.pack("<I", len(path)) + path)
+        self.assertEqual(read_exactly(connection, 4), b"STAT")
+        self.assertTrue(struct.unpack("<III", read_exactly(connection, 12))[0] & 0o040000)
+
+        connection = self.open_transport()
+        read_exactly(connection, 12)
+        send_command(connection, "sync:")
+        read_exactly(connection, 4)
+        path = b"/data/local/tmp/scrcpy-server.jar,33261"
+        connection.sendall(b"SEND" + struct.pack("<I", len(path)) + path)
+        connection.sendall(b"DATA" + struct.pack("<I", 3) + b"jar" + b"DONE" + struct.pack("<I", 0))
+        self.assertEqual(read_exactly(connection, 4), b"OKAY")
+        self.assertEqual(self.device.events[-1]["size"], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
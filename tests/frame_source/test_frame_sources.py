@@ -0,0 +1,87 @@
+import os
+import tempfile
+import time
+import unittest
+
+import cv2
+import numpy as np
+
+from frame_source import ImageDirectoryFrameSource, ReplayFrameSource, RecordingInputSink, SyntheticFrameSource, VideoFrameSource
+from input_dispatcher import InputDispatcher
+
+
+def solid_frame(value, width=64, height=36):
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+class TestFrameSources(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_unpaced_source_advances_one_frame_per_read(self):
+        source = SyntheticFrameSource(width=32, height=16, frame_count=3)
+        frames = [source.get_latest_frame()[0] for _ in range(5)]
+        self.assertEqual(source.frames_read, 3)
+        self.assertFalse(np.array_equal(frames[0], frames[1]))
+        # At the end the last frame keeps being returned
+        self.assertIs(frames[3], frames[2])
+        self.assertTrue(source.finished)
+
+    def test_paced_source_publishes_at_its_rate(self):
+        source = SyntheticFrameSource(width=32, height=16, fps=100)
+        source.start()
+        time.sleep(0.2)
+        source.stop()
+        self.assertGreater(source.frames_read, 10)
+        self.assertLess(source.frames_read, 30)
+        self.assertIsNotNone(source.get_latest_frame()[0])
+
+    def test_image_directory_is_read_in_order_and_loops(self):
+        for i, value in enumerate([10, 20, 30]):
+            cv2.imwrite(os.path.join(self.directory.name, f"frame_{i:03d}.png"), solid_frame(value))
+        source = ImageDirectoryFrameSource(self.directory.name)
+        values = [int(source.get_latest_frame()[0][0, 0, 0]) for _ in range(4)]
+        self.assertEqual(values, [10, 20, 30, 10])
+
+    def test_video_is_replayed(self):
+        path = os.path.join(self.directory.name, "match.avi")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 36))
+        for value in [0, 100, 200]:
+            writer.write(solid_frame(value))
+        writer.release()
+        source = VideoFrameSource(path, loop=False)
+        values = [int(source.get_latest_frame()[0].mean()) for _ in range(3)]
+        self.assertEqual(len(values), 3)
+        self.assertLess(values[0], values[1])
+        self.assertLess(values[1], values[2])
+        with self.assertRaises(FileNotFoundError):
+            VideoFrameSource(os.path.join(self.directory.name, "missing.mp4"))
+
+    def test_incomplete_source_cannot_be_created(self):
+        class NoRewind(ReplayFrameSource):
+            def read_frame(self):
+                return None
+
+        with self.assertRaises(TypeError):
+            NoRewind()
+
+
+class TestRecordingInputSink(unittest.TestCase):
+
+    def test_records_dispatched_touches(self):
+        sink = RecordingInputSink()
+        dispatcher = InputDispatcher(sink.send)
+        dispatcher.tap(100, 200, pointer_id=2, hold=0.01)
+        dispatcher.schedule("down", 5, 5, pointer_id=1)
+        self.assertTrue(dispatcher.wait_idle(timeout=1.0))
+        dispatcher.stop()
+        self.assertEqual(sink.actions(pointer_id=2), [("down", 100, 200), ("up", 100, 200)])
+        self.assertEqual(len(sink.events), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
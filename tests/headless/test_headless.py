@@ -0,0 +1,50 @@
+import json
+import os
+import tempfile
+import unittest
+
+from headless import build_queue, load_brawler_queue, normalize_brawler_entry, parse_args
+
+
+class TestHeadless(unittest.TestCase):
+
+    def test_normalizes_like_the_selection_window(self):
+        entry = normalize_brawler_entry({"brawler": "Shelly", "push_until": "750", "trophies": 500, "type": "trophies"})
+        self.assertEqual(entry, {"brawler": "shelly", "push_until": 750, "trophies": 500, "wins": 0,
+                                 "type": "trophies", "automatically_pick": False, "win_streak": 0})
+        self.assertEqual(normalize_brawler_entry({"brawler": "colt", "trophies": 100, "wins": "20"})["type"], "wins")
+
+    def test_queue_file_drops_finished_brawlers(self):
+        entries = [
+            {"brawler": "shelly", "push_until": 500, "trophies": 500, "wins": "", "type": "trophies",
+             "automatically_pick": True, "win_streak": 0},
+            {"brawler": "colt", "push_until": 300, "trophies": 200, "wins": 10, "type": "wins",
+             "automatically_pick": True, "win_streak": 2},
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "queue.json")
+            with open(file_path, 'w') as f:
+                json.dump(entries, f)
+            queue = load_brawler_queue(file_path)
+        self.assertEqual([entry["brawler"] for entry in queue], ["colt"])
+        self.assertEqual(queue[0]["win_streak"], 2)
+
+    def test_single_brawler_from_arguments(self):
+        args = parse_args(["--brawler", "bull", "--type", "trophies", "--push-until", "800", "--trophies", "650",
+                           "--auto-pick", "--serial", "127.0.0.1:5555", "--set", "max_ips=20",
+                           "--set", "current_emulator=Others"])
+        queue = build_queue(args, {"bull", "shelly"})
+        self.assertEqual(queue[0]["brawler"], "bull")
+        self.assertEqual(queue[0]["push_until"], 800)
+        self.assertTrue(queue[0]["automatically_pick"])
+        self.assertEqual(args.overrides, [("max_ips", 20), ("current_emulator", "Others")])
+
+    def test_rejects_unknown_brawlers_and_missing_queue(self):
+        with self.assertRaises(ValueError):
+            build_queue(parse_args(["--brawler", "nobody"]), {"shelly"})
+        with self.assertRaises(ValueError):
+            build_queue(parse_args([]))
+
+
+if __name__ == '__main__':
+    unittest.main()
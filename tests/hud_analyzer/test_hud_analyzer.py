@@ -0,0 +1,47 @@
+import unittest
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from hud_analyzer import HudAnalyzer
+
+
+def hsv_color_as_rgb(hsv):
+    return cv2.cvtColor(np.array([[hsv]], dtype=np.uint8), cv2.COLOR_HSV2RGB)[0, 0]
+
+
+class TestHudAnalyzer(unittest.TestCase):
+
+    def setUp(self):
+        self.analyzer = HudAnalyzer({"hypercharge": 2000, "gadget": 2000, "super": 2400})
+        self.frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+
+    def test_nothing_ready_on_a_dark_hud(self):
+        self.assertEqual(self.analyzer.analyze(self.frame), {"hypercharge": False, "gadget": False, "super": False})
+
+    def test_yellow_super_button_is_ready(self):
+        self.frame[830:930, 1460:1560] = hsv_color_as_rgb((22, 220, 230))
+        ready = self.analyzer.analyze(Image.fromarray(self.frame))
+        self.assertTrue(ready["super"])
+        self.assertFalse(ready["gadget"])
+        self.assertEqual(self.analyzer.pixel_counts["super"], 100 * 100)
+
+    def test_scales_to_the_capture_resolution(self):
+        # The 1920x1080 minimum of 2000 pixels becomes 500 at a quarter of the area
+        frame = np.zeros((540, 960, 3), dtype=np.uint8)
+        frame[465:525, 790:850] = hsv_color_as_rgb((60, 240, 200))
+        self.assertTrue(self.analyzer.analyze(frame)["gadget"])
+        frame[465:525, 790:850] = 0
+        frame[465:473, 790:850] = hsv_color_as_rgb((60, 240, 200))
+        self.assertFalse(self.analyzer.analyze(frame)["gadget"])
+
+    def test_unchanged_hud_is_not_analyzed_again(self):
+        self.analyzer.analyze(self.frame)
+        self.analyzer.pixel_counts["super"] = -1
+        self.analyzer.analyze(self.frame.copy())
+        self.assertEqual(self.analyzer.pixel_counts["super"], -1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import time
+import unittest
+
+from input_dispatcher import InputDispatcher
+
+
+class TestInputDispatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.sent = []
+        self.dispatcher = InputDispatcher(lambda action, x, y, pointer_id: self.sent.append(
+            (action, x, y, pointer_id, time.time())))
+
+    def tearDown(self):
+        self.dispatcher.stop()
+
+    def test_tap_returns_before_the_touch_up(self):
+        start = time.time()
+        self.dispatcher.tap(10, 20, pointer_id=2, hold=0.2)
+        self.assertLess(time.time() - start, 0.05)
+        self.assertTrue(self.dispatcher.wait_idle(timeout=1.0))
+        self.assertEqual([event[:4] for event in self.sent], [("down", 10, 20, 2), ("up", 10, 20, 2)])
+        self.assertGreaterEqual(self.sent[1][4] - self.sent[0][4], 0.19)
+
+    def test_events_of_a_pointer_keep_their_order(self):
+        self.dispatcher.tap(1, 1, pointer_id=2, hold=0.1)
+        self.dispatcher.tap(2, 2, pointer_id=2, hold=0.0)
+        self.dispatcher.schedule("down", 5, 5, pointer_id=1)
+        self.assertTrue(self.dispatcher.wait_idle(timeout=1.0))
+        pointer_2 = [event[:3] for event in self.sent if event[3] == 2]
+        self.assertEqual(pointer_2, [("down", 1, 1), ("up", 1, 1), ("down", 2, 2), ("up", 2, 2)])
+        # The other pointer is not held back by the first tap
+        self.assertEqual(self.sent[1][:4], ("down", 5, 5, 1))
+
+    def test_swipe_moves_through_every_point(self):
+        self.dispatcher.swipe([(0, 0), (0, 10), (0, 20)], pointer_id=2, duration=0.05)
+        self.assertGreater(self.dispatcher.backlog(2), 0)
+        self.assertTrue(self.dispatcher.wait_idle(timeout=1.0))
+        self.assertEqual([event[:3] for event in self.sent],
+                         [("down", 0, 0), ("move", 0, 10), ("move", 0, 20), ("up", 0, 20)])
+        self.assertEqual(self.dispatcher.backlog(2), 0)
+
+    def test_unsent_moves_are_coalesced(self):
+        self.dispatcher.schedule("down", 0, 0, pointer_id=1, at=time.time() + 0.05)
+        for x in range(5):
+            self.dispatcher.schedule("move", x, 0, pointer_id=1, coalesce=True)
+        self.assertTrue(self.dispatcher.wait_idle(timeout=1.0))
+        self.assertEqual([event[:3] for event in self.sent], [("down", 0, 0), ("move", 4, 0)])
+
+    def test_sent_events_report_the_tag_they_were_scheduled_under(self):
+        reported = []
+        self.dispatcher.on_sent = lambda tag, action, sent_time: reported.append((tag, action))
+        self.dispatcher.tag = "frame 1"
+        self.dispatcher.schedule("down", 0, 0, pointer_id=1, at=time.time() + 0.05)
+        self.dispatcher.schedule("move", 1, 0, pointer_id=1, coalesce=True)
+        self.dispatcher.tag = "frame 2"
+        self.dispatcher.schedule("move", 2, 0, pointer_id=1, coalesce=True)
+        self.assertTrue(self.dispatcher.wait_idle(timeout=1.0))
+        self.assertEqual(reported, [("frame 1", "down"), ("frame 2", "move")])
+
+
+if __name__ == "__main__":
+    unittest.main()
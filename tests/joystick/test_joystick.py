@@ -0,0 +1,55 @@
+import math
+import unittest
+
+from joystick import Joystick
+
+
+class RecordingDispatcher:
+
+    def __init__(self):
+        self.events = []
+
+    def schedule(self, action, x, y, pointer_id, at=None, coalesce=False):
+        self.events.append((action, round(x), round(y)))
+
+
+class TestJoystick(unittest.TestCase):
+
+    def setUp(self):
+        self.dispatcher = RecordingDispatcher()
+        self.joystick = Joystick(self.dispatcher, pointer_id=1, center=(220, 870), radius=100)
+
+    def test_first_move_presses_and_moves(self):
+        self.joystick.move(math.pi / 2)
+        self.assertEqual(self.dispatcher.events, [("down", 220, 870), ("move", 220, 970)])
+        self.assertTrue(self.joystick.is_held)
+
+    def test_small_direction_changes_send_nothing(self):
+        self.joystick.move(0.0)
+        self.joystick.move(math.radians(4))
+        self.joystick.move(0.0, magnitude=0.95)
+        self.assertEqual(len(self.dispatcher.events), 2)
+        self.joystick.move(math.radians(20))
+        self.assertEqual(len(self.dispatcher.events), 3)
+
+    def test_angle_threshold_wraps_around(self):
+        self.joystick.move(math.radians(359))
+        self.joystick.move(math.radians(2))
+        self.assertEqual(len(self.dispatcher.events), 2)
+
+    def test_release_lifts_the_pointer_once(self):
+        self.joystick.move(math.pi)
+        self.joystick.release()
+        self.joystick.release()
+        self.assertEqual(self.dispatcher.events[-1], ("up", 220, 870))
+        self.assertEqual(len(self.dispatcher.events), 3)
+        self.assertFalse(self.joystick.is_held)
+
+    def test_zero_magnitude_releases(self):
+        self.joystick.move(0.0)
+        self.joystick.move(0.0, magnitude=0.0)
+        self.assertEqual(self.dispatcher.events[-1][0], "up")
+
+
+if __name__ == "__main__":
+    unittest.main()
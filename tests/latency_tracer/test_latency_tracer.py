@@ -0,0 +1,47 @@
+import unittest
+
+from latency_tracer import LatencyTracer
+
+
+class TestLatencyTracer(unittest.TestCase):
+
+    def test_stages_are_measured_from_the_capture(self):
+        tracer = LatencyTracer()
+        trace = tracer.begin(capture_time=100.0)
+        tracer.mark("detection", at=100.02)
+        tracer.mark("detection", at=100.5)
+        tracer.touch_sent(trace, at=100.05)
+        self.assertEqual(trace.frame_id, 0)
+        self.assertAlmostEqual(trace.stages["detection"], 0.02)
+        self.assertAlmostEqual(trace.stages["touch"], 0.05)
+        self.assertEqual(list(tracer.report()), ["detection", "touch"])
+
+    def test_touches_of_an_older_frame_keep_its_capture_time(self):
+        tracer = LatencyTracer()
+        first = tracer.begin(capture_time=10.0)
+        second = tracer.begin(capture_time=10.1)
+        tracer.touch_sent(first, at=10.15)
+        self.assertEqual(second.frame_id, 1)
+        self.assertAlmostEqual(first.stages["touch"], 0.15)
+        self.assertNotIn("touch", second.stages)
+
+    def test_rolling_percentiles(self):
+        tracer = LatencyTracer(window=100)
+        for i in range(200):
+            trace = tracer.begin(capture_time=float(i))
+            tracer.touch_sent(trace, at=i + (i % 100) / 1000)
+        report = tracer.report()["touch"]
+        self.assertEqual(report["count"], 100)
+        self.assertAlmostEqual(report["p50"], 0.0495)
+        self.assertAlmostEqual(report["p99"], 0.09801)
+        self.assertIn("touch p50 50 p95 94 p99 98ms", tracer.format_report())
+        self.assertIsNone(tracer.percentiles("detection"))
+
+    def test_untraced_touches_are_ignored(self):
+        tracer = LatencyTracer()
+        tracer.touch_sent(None)
+        self.assertEqual(tracer.report(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+
+from line_of_sight import RasterWallIndex, ShapelyWallIndex, WallIndex, create_wall_index
+
+
+class TestShapelyWallIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = ShapelyWallIndex()
+        self.walls = [[100, 100, 160, 160], [300, 0, 360, 60]]
+        self.index.update(self.walls)
+
+    def test_segment_through_wall_is_blocked(self):
+        self.assertTrue(self.index.segment_blocked((50, 130), (200, 130)))
+
+    def test_segment_around_wall_is_free(self):
+        self.assertFalse(self.index.segment_blocked((50, 200), (400, 200)))
+
+    def test_no_walls_never_blocks(self):
+        self.index.update([])
+        self.assertFalse(self.index.segment_blocked((50, 130), (200, 130)))
+
+    def test_cache_is_dropped_when_walls_change(self):
+        self.assertFalse(self.index.segment_blocked((50, 300), (200, 300)))
+        self.index.update(self.walls + [[120, 280, 180, 340]])
+        self.assertTrue(self.index.segment_blocked((50, 300), (200, 300)))
+
+    def test_equal_wall_lists_keep_the_tree(self):
+        tree = self.index._tree
+        self.index.update([list(wall) for wall in self.walls])
+        self.assertIs(tree, self.index._tree)
+
+
+class TestRasterWallIndex(TestShapelyWallIndex):
+
+    def setUp(self):
+        self.index = RasterWallIndex(cell_size=60)
+        self.walls = [[120, 120, 180, 180], [300, 0, 360, 60]]
+        self.index.update(self.walls)
+
+    def test_segment_through_wall_is_blocked(self):
+        self.assertTrue(self.index.segment_blocked((50, 150), (250, 150)))
+
+    def test_segment_around_wall_is_free(self):
+        self.assertFalse(self.index.segment_blocked((50, 210), (400, 210)))
+
+    def test_no_walls_never_blocks(self):
+        self.index.update([])
+        self.assertFalse(self.index.segment_blocked((50, 150), (250, 150)))
+
+    def test_cache_is_dropped_when_walls_change(self):
+        self.assertFalse(self.index.segment_blocked((50, 330), (250, 330)))
+        self.index.update(self.walls + [[120, 300, 180, 360]])
+        self.assertTrue(self.index.segment_blocked((50, 330), (250, 330)))
+
+    def test_equal_wall_lists_keep_the_tree(self):
+        grid = self.index.grid
+        self.index.update([list(wall) for wall in self.walls])
+        self.assertIs(grid, self.index.grid)
+
+    def test_batched_queries_match_shapely(self):
+        shapely_index = ShapelyWallIndex()
+        shapely_index.update(self.walls)
+        starts = [(30, 30)] * 4
+        ends = [(400, 30), (30, 400), (400, 400), (90, 90)]
+        self.assertEqual(self.index.segments_blocked(starts, ends).tolist(),
+                         shapely_index.segments_blocked(starts, ends).tolist())
+
+
+class TestCreateWallIndex(unittest.TestCase):
+
+    def test_unknown_backend_raises(self):
+        with self.assertRaises(ValueError):
+            create_wall_index("quadtree", 60)
+
+    def test_incomplete_backend_cannot_be_created(self):
+        class BuildOnly(WallIndex):
+            def build(self, walls):
+                pass
+
+        with self.assertRaises(TypeError):
+            BuildOnly()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import tempfile
+import unittest
+
+import numpy as np
+
+from map_cache import MapCache
+
+
+def arena_frame(seed, noise=0):
+    rng = np.random.default_rng(seed)
+    frame = np.repeat(np.repeat(rng.integers(0, 255, (18, 32, 3), dtype=np.uint8), 60, axis=0), 60, axis=1)
+    if noise:
+        frame = np.clip(frame.astype(int) + np.random.default_rng(noise).integers(-20, 20, frame.shape), 0, 255)
+    return frame.astype(np.uint8)
+
+
+class TestMapCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = MapCache(self.directory.name, fingerprint_frames=2)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def fingerprint(self, seed, noise=0):
+        self.cache.start_match()
+        self.assertIsNone(self.cache.add_frame(arena_frame(seed, noise)))
+        return self.cache.add_frame(arena_frame(seed, noise))
+
+    def test_layout_round_trips_for_the_same_arena(self):
+        walls = {"cubic_wall": [[0, 0, 120, 60]], "wooden_fence": [[300, 60, 600, 120]]}
+        self.cache.save(self.fingerprint(1), walls)
+        reloaded = MapCache(self.directory.name, fingerprint_frames=2)
+        self.assertEqual(reloaded.lookup(self.fingerprint(1, noise=3)), walls)
+
+    def test_other_arenas_are_not_matched(self):
+        self.cache.save(self.fingerprint(1), {"cubic_wall": [[0, 0, 60, 60]]})
+        self.assertIsNone(self.cache.lookup(self.fingerprint(2)))
+
+    def test_empty_layouts_are_not_saved(self):
+        self.cache.save(self.fingerprint(1), {})
+        self.assertIsNone(self.cache.lookup(self.fingerprint(1)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from motion_estimator import MotionEstimator
+
+
+class TestMotionEstimator(unittest.TestCase):
+
+    def setUp(self):
+        self.estimator = MotionEstimator(window=0.6, min_displacement=18)
+
+    def feed(self, positions, offsets=None, moving=True, reliable=True, start=0.0, dt=0.05):
+        for i, position in enumerate(positions):
+            offset = offsets[i] if offsets else (0, 0)
+            self.estimator.update(start + i * dt, position, offset, moving, reliable)
+        return start + (len(positions) - 1) * dt
+
+    def test_player_pinned_against_a_wall_is_stuck(self):
+        now = self.feed([(960 + i % 2, 540) for i in range(20)])
+        self.assertTrue(self.estimator.is_stuck(now))
+        self.assertGreater(self.estimator.wasted_move_time, 0)
+
+    def test_camera_motion_counts_as_movement(self):
+        # The camera follows the player so the player box stays centered on screen
+        now = self.feed([(960, 540)] * 20, offsets=[(i * 10, 0) for i in range(20)])
+        self.assertFalse(self.estimator.is_stuck(now))
+        self.assertEqual(self.estimator.wasted_move_time, 0)
+
+    def test_standing_still_on_purpose_is_not_stuck(self):
+        now = self.feed([(960, 540)] * 20, moving=False)
+        self.assertFalse(self.estimator.is_stuck(now))
+
+    def test_unreliable_flow_gives_no_verdict(self):
+        now = self.feed([(960, 540)] * 20, reliable=False)
+        self.assertIsNone(self.estimator.is_stuck(now))
+
+    def test_too_short_history_gives_no_verdict(self):
+        now = self.feed([(960, 540)] * 3)
+        self.assertIsNone(self.estimator.is_stuck(now))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import math
+import unittest
+
+import numpy as np
+
+from movement_scoring import MovementScorer
+
+
+class TestMovementScorer(unittest.TestCase):
+
+    def setUp(self):
+        self.scorer = MovementScorer()
+        self.player_pos = (500, 500)
+        self.step = 60
+        self.free = np.zeros(16, dtype=bool)
+
+    def best(self, target_pos, probes_blocked=None, **kwargs):
+        if probes_blocked is None:
+            probes_blocked = self.free
+        scores = self.scorer.score(self.player_pos, self.step, probes_blocked, target_pos,
+                                   safe_range=300, attack_range=500, **kwargs)
+        return self.scorer.best_movement(scores)
+
+    def test_approaches_a_far_target(self):
+        self.assertEqual(self.best((1500, 500)), 'D')
+
+    def test_backs_away_from_a_close_target(self):
+        self.assertEqual(self.best((400, 500)), 'D')
+
+    def test_avoids_blocked_directions(self):
+        probes_blocked = self.free.copy()
+        probes_blocked[0] = True  # 'D' runs into a wall
+        self.assertIn(self.best((1500, 500), probes_blocked), ('DS', 'DW'))
+
+    def test_still_moves_when_everything_is_blocked(self):
+        self.assertEqual(self.best((500, 1500), np.ones(16, dtype=bool)), 'S')
+
+    def test_planned_path_outweighs_the_straight_line(self):
+        self.assertEqual(self.best((1500, 500), planned_movement='DW'), 'DW')
+
+    def test_probe_segments_cover_two_steps(self):
+        starts, ends = self.scorer.get_probe_segments(self.player_pos, self.step)
+        self.assertEqual(ends.shape, (16, 2))
+        np.testing.assert_allclose(ends[0], (560, 500))
+        np.testing.assert_allclose(ends[8], (620, 500))
+
+    def test_best_angle_leans_towards_the_better_neighbour(self):
+        scores = np.array([1.0, 0.8, 0.0, -1.0, -2.0, -1.0, 0.0, 0.2])
+        angle = self.scorer.best_angle(scores)
+        self.assertGreater(angle, 0)
+        self.assertLess(angle, math.pi / 8)
+        symmetric = np.array([1.0, 0.5, 0.0, -1.0, -2.0, -1.0, 0.0, 0.5])
+        self.assertAlmostEqual(self.scorer.best_angle(symmetric), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
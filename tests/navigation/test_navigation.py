@@ -0,0 +1,77 @@
+import math
+import unittest
+
+import numpy as np
+
+from navigation import DStarLite, Navigator, direction_to_movement, movement_to_angle
+
+
+def walk(planner, max_steps=100):
+    path = [planner.start]
+    while planner.start != planner.goal and len(path) < max_steps:
+        cell = planner.next_cell()
+        if cell is None:
+            return None
+        planner.move_start(cell)
+        path.append(cell)
+    return path
+
+
+class TestDStarLite(unittest.TestCase):
+
+    def test_goes_around_a_wall(self):
+        blocked = np.zeros((7, 7), dtype=bool)
+        blocked[0:6, 3] = True
+        path = walk(DStarLite(blocked, (0, 0), (6, 0)))
+        self.assertEqual(path[-1], (6, 0))
+        self.assertIn((3, 6), path)
+
+    def test_repairs_the_plan_when_a_wall_appears(self):
+        blocked = np.zeros((5, 9), dtype=bool)
+        planner = DStarLite(blocked, (0, 2), (8, 2))
+        self.assertEqual(planner.next_cell(), (1, 2))
+        planner.move_start((1, 2))
+        planner.set_blocked([(4, y) for y in range(0, 4)], True)
+        path = walk(planner)
+        self.assertEqual(path[-1], (8, 2))
+        self.assertIn((4, 4), path)
+        fresh = DStarLite(planner.blocked.copy(), (1, 2), (8, 2))
+        self.assertEqual(len(walk(fresh)), len(path))
+
+    def test_unreachable_goal_returns_none(self):
+        blocked = np.zeros((5, 5), dtype=bool)
+        blocked[:, 2] = True
+        self.assertIsNone(DStarLite(blocked, (0, 0), (4, 4)).next_cell())
+
+
+class TestNavigator(unittest.TestCase):
+
+    def test_waypoint_is_in_screen_space(self):
+        navigator = Navigator(cell_size=60)
+        waypoint = navigator.next_waypoint((90, 90), (450, 90), walls=[], offset=(600, 0))
+        self.assertEqual(waypoint, (150.0, 90.0))
+
+    def test_detours_around_walls(self):
+        navigator = Navigator(cell_size=60)
+        walls = [[180, 0, 240, 150]]
+        waypoint = navigator.next_waypoint((90, 90), (450, 90), walls)
+        self.assertGreater(waypoint[1], 90)
+
+
+class TestDirectionToMovement(unittest.TestCase):
+
+    def test_directions(self):
+        self.assertEqual(direction_to_movement(1, 0), 'D')
+        self.assertEqual(direction_to_movement(0, -1), 'W')
+        self.assertEqual(direction_to_movement(-1, 1), 'AS')
+        self.assertEqual(direction_to_movement(0, 0), '')
+
+    def test_movement_angles(self):
+        self.assertAlmostEqual(movement_to_angle('d'), 0.0)
+        self.assertAlmostEqual(movement_to_angle('WA'), -3 * math.pi / 4)
+        self.assertIsNone(movement_to_angle('ws'))
+        self.assertIsNone(movement_to_angle(''))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import os
+import unittest
+from unittest import mock
+
+import platform_support
+
+
+class TestPlatformSupport(unittest.TestCase):
+
+    def test_headless_linux_falls_back_to_defaults(self):
+        with mock.patch.multiple(platform_support, IS_WINDOWS=False), \
+                mock.patch.object(platform_support.sys, "platform", "linux"), \
+                mock.patch.dict(os.environ, {"DISPLAY": "", "WAYLAND_DISPLAY": ""}):
+            self.assertFalse(platform_support.has_display())
+            self.assertEqual(platform_support.get_dpi_scale(), 96)
+            self.assertEqual(platform_support.get_screen_size(), (1920, 1080))
+
+    def test_linux_display_is_queried_through_tk(self):
+        with mock.patch.multiple(platform_support, IS_WINDOWS=False), \
+                mock.patch.dict(os.environ, {"DISPLAY": ":0"}), \
+                mock.patch.object(platform_support, "_query_tk", side_effect=[144.2, (2560, 1440)]):
+            self.assertEqual(platform_support.get_dpi_scale(), 144)
+            self.assertEqual(platform_support.get_screen_size(), (2560, 1440))
+
+    def test_failing_display_query_falls_back_to_defaults(self):
+        with mock.patch.multiple(platform_support, IS_WINDOWS=False), \
+                mock.patch.dict(os.environ, {"DISPLAY": ":0"}), \
+                mock.patch.object(platform_support, "_query_tk", side_effect=RuntimeError("no display")):
+            self.assertEqual(platform_support.get_dpi_scale(), 96)
+            self.assertEqual(platform_support.get_screen_size(), (1920, 1080))
+
+
+if __name__ == '__main__':
+    unittest.main()
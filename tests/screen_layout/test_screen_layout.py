@@ -0,0 +1,46 @@
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from screen_layout import ScreenLayout
+
+
+class TestScreenLayout(unittest.TestCase):
+
+    def setUp(self):
+        self.layout = ScreenLayout.from_config({
+            'lobby': {'select_btn': [150, 950], 'trophy_observer': [20, 10, 650, 200]},
+            'template_matching': {'powerpoint': [1000, 5, 80, 80]},
+        })
+
+    def test_config_regions_are_converted_to_rects(self):
+        self.layout.set_resolution(1920, 1080)
+        self.assertEqual(self.layout.rect("powerpoint"), (1000, 5, 1080, 85))
+        self.assertEqual(self.layout.rect("trophy_observer"), (20, 10, 650, 200))
+        self.assertEqual(self.layout.point("select_btn"), (150, 950))
+
+    def test_scales_once_per_resolution(self):
+        self.layout.set_resolution(960, 540)
+        self.assertEqual(self.layout.point("joystick"), (110, 435))
+        self.assertEqual(self.layout.rect("idle_check"), (200, 190, 750, 350))
+        rects = self.layout.rects
+        self.layout.set_resolution(960, 540)
+        self.assertIs(self.layout.rects, rects)
+
+    def test_crop_is_a_view_of_the_frame(self):
+        frame = np.zeros((540, 960, 3), dtype=np.uint8)
+        region = self.layout.crop(frame, "powerpoint")
+        self.assertEqual(region.shape, (40, 40, 3))
+        self.assertTrue(np.shares_memory(region, frame))
+
+    def test_crop_of_pil_images(self):
+        frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+        frame[10:200, 20:650] = 255
+        region = self.layout.crop(Image.fromarray(frame), "trophy_observer")
+        self.assertEqual(region.shape, (190, 630, 3))
+        self.assertTrue((region == 255).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
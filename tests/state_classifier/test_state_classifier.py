@@ -0,0 +1,73 @@
+import unittest
+
+from state_classifier import StateCheck, StateClassifier
+
+
+class TestStateClassifier(unittest.TestCase):
+
+    def classifier(self, end_likely, **kwargs):
+        self.ocr_calls = 0
+
+        def read_result(image):
+            self.ocr_calls += 1
+            return image == "end"
+
+        return StateClassifier(
+            [
+                StateCheck("play_store", "play_store", lambda image: image == "play_store"),
+                StateCheck("popup", "popup", lambda image: image in ("popup", "popup_over_lobby")),
+                StateCheck("lobby", "lobby", lambda image: image in ("lobby", "popup_over_lobby")),
+            ],
+            end_precheck=StateCheck("end_precheck", "end", lambda image: end_likely),
+            end_confirm=StateCheck("end_ocr", "end", read_result),
+            **kwargs,
+        )
+
+    def test_first_hit_wins_and_match_is_the_default(self):
+        classifier = self.classifier(end_likely=False, ocr_fallback_interval=1e9)
+        classifier.last_confirm_time = float("inf")
+        self.assertEqual(classifier.classify("popup_over_lobby"), "popup")
+        self.assertEqual(classifier.classify("play_store"), "play_store")
+        self.assertEqual(classifier.classify("in game"), "match")
+        self.assertEqual(self.ocr_calls, 0)
+
+    def test_ocr_only_confirms_a_likely_end_screen(self):
+        classifier = self.classifier(end_likely=True)
+        self.assertEqual(classifier.classify("end"), "end")
+        self.assertEqual(classifier.classify("lobby"), "lobby")
+        self.assertEqual(self.ocr_calls, 2)
+        self.assertEqual(classifier.precheck_misses, 0)
+
+    def test_fallback_ocr_counts_precheck_misses(self):
+        classifier = self.classifier(end_likely=False, ocr_fallback_interval=30.0)
+        self.assertEqual(classifier.classify("end"), "end")
+        self.assertEqual(classifier.precheck_misses, 1)
+        # The end screen is confirmed with OCR until it is left
+        self.assertEqual(classifier.classify("end"), "end")
+        self.assertEqual(classifier.classify("lobby"), "lobby")
+        self.assertEqual(classifier.classify("end"), "match")
+        self.assertEqual(self.ocr_calls, 3)
+
+    def test_fallback_runs_at_its_interval(self):
+        classifier = self.classifier(end_likely=False, ocr_fallback_interval=0.0)
+        for _ in range(3):
+            self.assertEqual(classifier.classify("lobby"), "lobby")
+        self.assertEqual(self.ocr_calls, 3)
+
+    def test_records_costs_and_hit_rates(self):
+        classifier = self.classifier(end_likely=False)
+        for image in ["lobby", "lobby", "in game", "play_store"]:
+            classifier.classify(image)
+        stats = {check["name"]: check for check in classifier.stats()}
+        self.assertEqual(stats["play_store"]["calls"], 4)
+        self.assertEqual(stats["play_store"]["hits"], 1)
+        self.assertEqual(stats["lobby"]["calls"], 3)
+        self.assertAlmostEqual(stats["lobby"]["hit_rate"], 2 / 3)
+        self.assertEqual(stats["end_ocr"]["calls"], 1)
+        self.assertGreater(stats["lobby"]["mean_cost"], 0)
+        self.assertEqual(sorted(classifier.suggested_order()), ["lobby", "play_store", "popup"])
+        self.assertIn("precheck misses 0", classifier.format_report())
+
+
+if __name__ == '__main__':
+    unittest.main()
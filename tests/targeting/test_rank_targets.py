@@ -0,0 +1,37 @@
+import unittest
+
+from line_of_sight import ShapelyWallIndex
+from targeting import rank_targets
+
+
+class TestRankTargets(unittest.TestCase):
+
+    def setUp(self):
+        self.wall_index = ShapelyWallIndex()
+        self.wall_index.update([[140, 80, 160, 120]])
+        self.player_pos = (100, 100)
+        # Closest enemy hides behind the wall, the second one is in the open
+        self.enemies = [[180, 90, 200, 110], [90, 290, 110, 310], [590, 90, 610, 110]]
+
+    def test_hittable_enemies_rank_before_closer_hidden_ones(self):
+        targets = rank_targets(self.enemies, self.player_pos, self.wall_index, attack_range=250, super_range=100)
+        self.assertEqual(targets.best(), ((100.0, 300.0), 200.0))
+        self.assertEqual(targets.distances.tolist(), [200.0, 90.0, 500.0])
+        self.assertEqual(targets.attack_hittable.tolist(), [True, False, False])
+        self.assertEqual(targets.in_attack_range.tolist(), [True, True, False])
+        self.assertEqual(targets.in_super_range.tolist(), [False, True, False])
+
+    def test_ignoring_walls_ranks_by_distance_only(self):
+        targets = rank_targets(self.enemies, self.player_pos, self.wall_index, 250, 100,
+                               ignore_walls_for_attacks=True)
+        self.assertEqual(targets.best(), ((190.0, 100.0), 90.0))
+        self.assertFalse(targets.super_hittable[0])
+
+    def test_no_enemies_gives_an_empty_table(self):
+        targets = rank_targets([], self.player_pos, self.wall_index, 250, 100)
+        self.assertEqual(len(targets), 0)
+        self.assertEqual(targets.best(), (None, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import cv2
+import numpy as np
+
+from template_cache import TemplateCache
+
+
+class TestTemplateCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "icon.png")
+        self.image = np.zeros((40, 60, 3), dtype=np.uint8)
+        self.image[10:30, 20:40] = (0, 128, 255)
+        cv2.imwrite(self.path, self.image)
+        self.cache = TemplateCache()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_decodes_each_template_once(self):
+        with mock.patch("template_cache.cv2.imread", wraps=cv2.imread) as imread:
+            first = self.cache.get(self.path, 0.5)
+            second = self.cache.get(os.path.join(self.directory.name, ".", "icon.png"), 0.5)
+            self.cache.get(self.path, 1.0, gray=True)
+        self.assertEqual(imread.call_count, 1)
+        self.assertIs(first, second)
+        self.assertEqual(first.shape, (20, 30, 3))
+        self.assertFalse(first.flags.writeable)
+
+    def test_scaled_for_the_resolution(self):
+        template = self.cache.get_for_resolution(self.path, 1280, 720)
+        self.assertEqual(template.shape[:2], (26, 40))
+        gray = self.cache.get_for_resolution(self.path, 1280, 720, gray=True)
+        self.assertEqual(gray.shape, (26, 40))
+        np.testing.assert_array_equal(gray, cv2.cvtColor(template, cv2.COLOR_BGR2GRAY))
+        self.assertIs(self.cache.get(self.path), self.cache.image(self.path))
+
+    def test_invalidate_reads_a_rewritten_file(self):
+        self.assertEqual(self.cache.get(self.path, 0.5)[10, 15].tolist(), [0, 128, 255])
+        cv2.imwrite(self.path, np.full_like(self.image, 255))
+        self.assertEqual(self.cache.get(self.path, 0.5)[10, 15].tolist(), [0, 128, 255])
+        self.cache.invalidate(self.path)
+        self.assertEqual(self.cache.get(self.path, 0.5)[10, 15].tolist(), [255, 255, 255])
+
+    def test_cached_templates_can_be_matched(self):
+        template = self.cache.get(self.path, 1.0, gray=True)[5:35, 15:45]
+        result = cv2.matchTemplate(cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY), template, cv2.TM_CCOEFF_NORMED)
+        self.assertEqual(cv2.minMaxLoc(result)[3], (15, 5))
+
+    def test_missing_template(self):
+        with self.assertRaises(FileNotFoundError):
+            self.cache.get(os.path.join(self.directory.name, "missing.png"))
+
+
+if __name__ == '__main__':
+    unittest.main()
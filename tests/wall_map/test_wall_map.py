@@ -0,0 +1,102 @@
+import unittest
+
+import cv2
+import numpy as np
+
+from wall_map import CameraTracker, WorldWallMap, consolidate_walls, register_layout, shift_layout
+
+
+class TestCameraTracker(unittest.TestCase):
+
+    def test_offset_follows_the_camera(self):
+        rng = np.random.default_rng(0)
+        world = cv2.GaussianBlur(rng.random((800, 1200)).astype(np.float32), (0, 0), 6)
+        world = (world / world.max() * 255).astype(np.uint8)
+        tracker = CameraTracker()
+        tracker.update(world[100:500, 100:900])
+        # Camera moves 40 px right and 20 px down
+        offset = tracker.update(world[120:520, 140:940])
+        np.testing.assert_allclose(offset, [40, 20], atol=4)
+
+
+class TestWorldWallMap(unittest.TestCase):
+
+    def setUp(self):
+        self.wall_map = WorldWallMap(cell_size=60)
+        self.view_size = (1920, 1080)
+
+    def test_shifted_detections_merge_into_one_wall(self):
+        self.wall_map.observe({"cubic_wall": [[100, 100, 160, 160]]}, (0, 0), self.view_size)
+        # Same wall seen after the camera moved 50 px right, with a few px of detector jitter
+        self.wall_map.observe({"cubic_wall": [[53, 98, 113, 158]]}, (50, 0), self.view_size)
+        self.assertEqual(len(self.wall_map.walls), 1)
+        projected = self.wall_map.project((50, 0), self.view_size)
+        self.assertEqual(len(projected["cubic_wall"]), 1)
+
+    def test_walls_out_of_view_are_kept(self):
+        self.wall_map.observe({"cubic_wall": [[100, 100, 160, 160]]}, (0, 0), self.view_size)
+        for _ in range(10):
+            self.wall_map.observe({}, (1000, 0), self.view_size)
+        self.assertEqual(self.wall_map.project((0, 0))["cubic_wall"], [[100, 100, 160, 160]])
+
+    def test_walls_in_view_that_disappear_decay(self):
+        self.wall_map.observe({"cubic_wall": [[100, 100, 160, 160]]}, (0, 0), self.view_size)
+        for _ in range(10):
+            self.wall_map.observe({}, (0, 0), self.view_size)
+        self.assertEqual(self.wall_map.walls, {})
+
+    def test_bushes_are_not_projected(self):
+        self.wall_map.observe({"bush": [[100, 100, 160, 160]]}, (0, 0), self.view_size)
+        self.assertEqual(self.wall_map.project((0, 0), self.view_size), {})
+
+
+class TestConsolidateWalls(unittest.TestCase):
+
+    def test_fence_becomes_one_rectangle(self):
+        fence = [[10 + 60 * i, 20, 70 + 60 * i, 80] for i in range(12)]
+        # Detector jitter of a few pixels on some tiles
+        fence[3] = [192, 22, 249, 81]
+        self.assertEqual(consolidate_walls({"wooden_fence": fence}, 60), {"wooden_fence": [[10, 20, 730, 80]]})
+
+    def test_l_shape_needs_two_rectangles(self):
+        walls = [[0, 0, 60, 60], [60, 0, 120, 60], [0, 60, 60, 120]]
+        self.assertEqual(consolidate_walls({"cubic_wall": walls}, 60),
+                         {"cubic_wall": [[0, 0, 120, 60], [0, 60, 60, 120]]})
+
+    def test_classes_are_not_merged_together(self):
+        walls = {"cubic_wall": [[0, 0, 60, 60]], "wooden_box": [[60, 0, 120, 60]]}
+        self.assertEqual(consolidate_walls(walls, 60), walls)
+
+
+def arena_layout(seed, walls=40):
+    rng = np.random.default_rng(seed)
+    cells = rng.choice(30 * 20, walls, replace=False)
+    boxes = [[60 * (cell % 30), 60 * (cell // 30), 60 * (cell % 30) + 60, 60 * (cell // 30) + 60] for cell in cells]
+    return {"cubic_wall": boxes[:30], "wooden_box": boxes[30:]}
+
+
+class TestRegisterLayout(unittest.TestCase):
+
+    def test_layout_from_another_spawn_is_found(self):
+        layout = arena_layout(0)
+        # Same arena seen from a camera reset 7 tiles and 23 px away, part of it in view, with jitter
+        observed = {class_name: [[v + s + j for v, s, j in zip(box, (427, -23, 427, -23), (2, -1, 3, 0))]
+                                 for box in boxes[:8]] for class_name, boxes in layout.items()}
+        shift, match_ratio = register_layout(layout, observed, 60)
+        np.testing.assert_allclose(shift, [427, -23], atol=3)
+        self.assertEqual(match_ratio, 1.0)
+        shifted = shift_layout(layout, shift)
+        np.testing.assert_allclose(shifted["wooden_box"][0], observed["wooden_box"][0], atol=3)
+
+    def test_other_arena_does_not_match(self):
+        observed = {class_name: boxes[:8] for class_name, boxes in arena_layout(1).items()}
+        _, match_ratio = register_layout(arena_layout(0), observed, 60)
+        self.assertLess(match_ratio, 0.5)
+
+    def test_too_few_walls_are_not_registered(self):
+        shift, _ = register_layout(arena_layout(0), {"cubic_wall": [[0, 0, 60, 60]]}, 60)
+        self.assertIsNone(shift)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,7 +2,7 @@ import os
 
 import requests
 from difflib import SequenceMatcher
-import numpy as np
+from screen_layout import get_screen_layout
 from utils import update_toml_file, load_toml_as_dict, save_dict_as_toml, api_base_url, reader
 
 class TrophyObserver:
@@ -22,7 +22,6 @@ class TrophyObserver:
         self.trophy_lose_ranges = [(49, 0), (199, 1), (399, 2), (599, 3), (699, 4), (799, 5), (899, 6), (999, 7),
                                    (1099, 8), (1199, 11), (1299, 13), (1399, 16), (1499, 19), (1599, 22), (1699, 25), (1799, 28), (1899, 31), (1999, 34), (float("inf"), 50)]
         self.trophy_win_ranges = [(1099, 8), (1199, 7), (1299, 6), (1399, 5), (1499, 4), (1599, 3), (1699, 2), (float("inf"), 1)]
-        self.crop_region = load_toml_as_dict("./cfg/lobby_config.toml")['lobby']['trophy_observer']
         self.trophies_multiplier = int(load_toml_as_dict("./cfg/general_config.toml")["trophies_multiplier"])
 
     @staticmethod
@@ -111,8 +110,7 @@ class TrophyObserver:
 
     def find_game_result(self, screenshot, current_brawler, game_result=None):
         if not game_result:
-            screenshot = screenshot.crop(self.crop_region)
-            array_screenshot = np.array(screenshot)
+            array_screenshot = get_screen_layout().crop(screenshot, "trophy_observer")
             result = reader.readtext(array_screenshot)
 
             if len(result) == 0:
@@ -1,7 +1,13 @@
-
 from enum import StrEnum
 
+from brawler_catalog import get_brawler_catalog
+
 
 class BrawlerName(StrEnum):
     Shelly = 'shelly'
-    Larry = 'larrylawrie'
\ No newline at end of file
+    Larry = 'larrylawrie'
+
+    @property
+    def id(self) -> int:
+        """Integer id of the brawler in the BrawlerCatalog tables"""
+        return get_brawler_catalog().id_of(self.value)
@@ -2,7 +2,6 @@ import hashlib
 import io
 import os
 from io import BytesIO
-import ctypes
 import json
 import aiohttp
 import google_play_scraper
@@ -14,10 +13,13 @@ import discord
 import cv2
 import numpy as np
 from packaging import version
-import bettercam
 import time
 import easyocr
 
+from color_mask import ColorRange
+from brawler_catalog import brawlers_info_file_path, get_brawler_catalog, reset_brawler_catalog
+from template_cache import get_template_cache
+
 def extract_text_and_positions(image_path):
     results = reader.readtext(image_path)
     text_details = {}
@@ -45,24 +47,30 @@ class DefaultEasyOCR:
     def readtext(self, image_input):
         return self.reader.readtext(image_input)
 
+# normalized config path: {key: value}, applied on top of the file by load_toml_as_dict
+config_overrides = {}
+
+
+def set_config_override(file_path, key, value):
+    """Overrides one config value for this process only, the file on disk is left as is."""
+    config_overrides.setdefault(os.path.normpath(file_path), {})[key] = value
+
+
 def load_toml_as_dict(file_path):
     if os.path.exists(file_path):
         with open(file_path, 'r') as f:
-            return toml.load(f)
+            data = toml.load(f)
     else:
-        return {}
+        data = {}
+    data.update(config_overrides.get(os.path.normpath(file_path), {}))
+    return data
 
 
 reader = DefaultEasyOCR()
 api_base_url = "localhost"
-brawlers_info_file_path = "cfg/brawlers_info.json"
 
 def count_hsv_pixels(pil_image, low_hsv, high_hsv):
-    opencv_image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
-    hsv_image = cv2.cvtColor(opencv_image, cv2.COLOR_BGR2HSV)
-    mask = cv2.inRange(hsv_image, np.array(low_hsv), np.array(high_hsv))
-    pixel_count = np.count_nonzero(mask)
-    return pixel_count
+    return ColorRange(low_hsv, high_hsv).count(pil_image)
 
 def save_brawler_data(data):
     """
@@ -73,14 +81,25 @@ def save_brawler_data(data):
 
 
 
-def find_template_center(main_img, template, threshold=0.8):
-    main_image_cv = cv2.cvtColor(np.array(main_img), cv2.COLOR_RGB2GRAY)
+def find_template_center(main_img, template, threshold=0.8, region=None):
+    """
+    Center of the best template match in main_img, or False. With a region (x1, y1, x2, y2)
+    only that part of the image is searched, the center is still in full image coordinates.
+    """
+    main_image = np.asarray(main_img)
+    offset_x, offset_y = 0, 0
+    if region is not None:
+        offset_x, offset_y, x2, y2 = region
+        main_image = main_image[offset_y:y2, offset_x:x2]
+    main_image_cv = cv2.cvtColor(main_image, cv2.COLOR_RGB2GRAY)
     template_arr = np.array(template)
     if len(template_arr.shape) == 3 and template_arr.shape[2] == 3:
         template_cv = cv2.cvtColor(template_arr, cv2.COLOR_BGR2GRAY)
     else:
         template_cv = template_arr
     w, h = template_cv.shape[::-1]
+    if main_image_cv.shape[0] < h or main_image_cv.shape[1] < w:
+        return False
 
     # Perform template matching
     result = cv2.matchTemplate(main_image_cv, template_cv, cv2.TM_CCOEFF_NORMED)
@@ -88,8 +107,8 @@ def find_template_center(main_img, template, threshold=0.8):
 
     # Check if the match is found based on a threshold value
     if max_val >= threshold:
-        center_x = max_loc[0] + w // 2
-        center_y = max_loc[1] + h // 2
+        center_x = max_loc[0] + w // 2 + offset_x
+        center_y = max_loc[1] + h // 2 + offset_y
 
         return center_x, center_y
     else:
@@ -118,11 +137,12 @@ def load_brawlers_info():
 def update_brawlers_info(brawlers_info):
     with open(brawlers_info_file_path, 'w') as f:
         json.dump(brawlers_info, f, indent=4)
+    reset_brawler_catalog()
 
 
 def get_brawler_list():
     if api_base_url == "localhost":
-        brawler_list = list(load_brawlers_info().keys())
+        brawler_list = list(get_brawler_catalog().names)
         return brawler_list
     url = f'https://{api_base_url}/get_brawler_list'
     response = requests.post(url)
@@ -216,6 +236,7 @@ def update_icons():
         bottom = (height + 50) / 2
         big_icon_image = big_icon_image.crop((left, top, right, bottom))
         big_icon_image.save(f'./state_finder/images_to_detect/{big_icon}')
+        get_template_cache().invalidate(f'./state_finder/images_to_detect/{big_icon}')
 
         # small icon resize to 16x16
         small_icon_image = icon_image.resize((16, 16))
@@ -226,6 +247,7 @@ def update_icons():
         bottom = (height + 12) / 2
         small_icon_image = small_icon_image.crop((left, top, right, bottom))
         small_icon_image.save(f'./state_finder/images_to_detect/{small_icon}')
+        get_template_cache().invalidate(f'./state_finder/images_to_detect/{small_icon}')
         print(f"Updated to the latest icon !")
     else:
         print(f"Failed to download latest icon. Status code: {response.status_code}")
@@ -363,8 +385,3 @@ def cprint(text: str, hex_color: str): #omg color!!!
         print(f"\033[38;2;{r};{g};{b}m{text}\033[0m")
     except Exception:
         print(text)
-
-def get_dpi_scale():
-    user32 = ctypes.windll.user32
-    user32.SetProcessDPIAware()
-    return int(user32.GetDpiForSystem())
\ No newline at end of file
@@ -0,0 +1,253 @@
+import cv2
+import numpy as np
+
+
+class CameraTracker:
+    """
+    Follows the camera with phase correlation between consecutive downsampled frames.
+    offset is the camera position in world pixels: world = screen + offset.
+    """
+
+    def __init__(self, downscale=0.25, min_response=0.1, view_margin=0.15):
+        self.downscale = downscale
+        self.min_response = min_response
+        # The HUD is drawn at fixed screen positions, only the centre of the frame is correlated
+        self.view_margin = view_margin
+        self.offset = np.zeros(2)
+        self.last_response = 0.0
+        self._previous = None
+        self._window = None
+
+    def reset(self):
+        self.offset = np.zeros(2)
+        self.last_response = 0.0
+        self._previous = None
+
+    def _prepare(self, frame):
+        frame = np.asarray(frame)
+        height, width = frame.shape[:2]
+        margin_y, margin_x = int(height * self.view_margin), int(width * self.view_margin)
+        view = frame[margin_y:height - margin_y, margin_x:width - margin_x]
+        gray = cv2.cvtColor(view, cv2.COLOR_RGB2GRAY) if view.ndim == 3 else view
+        small = cv2.resize(gray, None, fx=self.downscale, fy=self.downscale, interpolation=cv2.INTER_AREA)
+        return small.astype(np.float32)
+
+    def update(self, frame):
+        current = self._prepare(frame)
+        if self._previous is None or self._previous.shape != current.shape:
+            self._previous = current
+            self._window = cv2.createHanningWindow(current.shape[::-1], cv2.CV_32F)
+            return self.offset
+        (shift_x, shift_y), response = cv2.phaseCorrelate(self._previous, current, self._window)
+        self.last_response = response
+        self._previous = current
+        if response >= self.min_response:
+            # The scene moves opposite to the camera
+            self.offset = self.offset - np.array([shift_x, shift_y]) / self.downscale
+        return self.offset
+
+
+class WorldWallMap:
+    """
+    Accumulates wall detections in world coordinates. Every detection pass raises the
+    confidence of the walls it saw and decays the ones it should have seen but did not,
+    walls outside the view keep their confidence until they come back.
+    """
+
+    def __init__(self, cell_size, decay=0.8, keep_confidence=0.5, drop_confidence=0.2, max_confidence=3.0):
+        self.cell_size = float(cell_size)
+        self.decay = decay
+        self.keep_confidence = keep_confidence
+        self.drop_confidence = drop_confidence
+        self.max_confidence = max_confidence
+        # (class_name, cell_x, cell_y) -> [world box as np.array, confidence]
+        self.walls = {}
+
+    def reset(self):
+        self.walls = {}
+
+    def _find_entry(self, class_name, center):
+        cell_x, cell_y = (center // self.cell_size).astype(int).tolist()
+        best_key, best_distance = None, self.cell_size / 2
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                key = (class_name, cell_x + dx, cell_y + dy)
+                entry = self.walls.get(key)
+                if entry is None:
+                    continue
+                entry_center = (entry[0][:2] + entry[0][2:]) / 2
+                distance = float(np.hypot(*(entry_center - center)))
+                if distance <= best_distance:
+                    best_key, best_distance = key, distance
+        return best_key, (class_name, cell_x, cell_y)
+
+    def observe(self, tile_data, offset, view_size):
+        """Returns the share of detections that matched an already known wall."""
+        offset = np.tile(np.asarray(offset, dtype=float), 2)
+        seen = set()
+        detections, matched = 0, 0
+        for class_name, boxes in tile_data.items():
+            for screen_box in boxes:
+                world_box = np.asarray(screen_box, dtype=float) + offset
+                center = (world_box[:2] + world_box[2:]) / 2
+                key, new_key = self._find_entry(class_name, center)
+                detections += 1
+                if key is None:
+                    key = new_key
+                    self.walls[key] = [world_box, 0.0]
+                else:
+                    matched += 1
+                entry = self.walls[key]
+                entry[0] = (entry[0] + world_box) / 2 if entry[1] else world_box
+                entry[1] = min(entry[1] + 1.0, self.max_confidence)
+                seen.add(key)
+
+        view = np.array([0, 0, view_size[0], view_size[1]], dtype=float) + offset
+        for key in list(self.walls):
+            if key in seen:
+                continue
+            world_box, confidence = self.walls[key]
+            in_view = (world_box[0] >= view[0] and world_box[1] >= view[1]
+                       and world_box[2] <= view[2] and world_box[3] <= view[3])
+            if not in_view:
+                continue
+            confidence *= self.decay
+            if confidence < self.drop_confidence:
+                del self.walls[key]
+            else:
+                self.walls[key][1] = confidence
+        return matched / detections if detections else 1.0
+
+    def export(self, min_confidence=None):
+        """World boxes of the confident walls, grouped by class."""
+        if min_confidence is None:
+            min_confidence = self.keep_confidence
+        walls = {}
+        for (class_name, _, _), (world_box, confidence) in self.walls.items():
+            if confidence >= min_confidence:
+                walls.setdefault(class_name, []).append(world_box.tolist())
+        return walls
+
+    def load(self, walls_by_class, confidence=None):
+        if confidence is None:
+            confidence = self.max_confidence
+        for class_name, boxes in walls_by_class.items():
+            for world_box in boxes:
+                world_box = np.asarray(world_box, dtype=float)
+                cell_x, cell_y = (((world_box[:2] + world_box[2:]) / 2) // self.cell_size).astype(int).tolist()
+                self.walls[(class_name, cell_x, cell_y)] = [world_box, confidence]
+
+    def project(self, offset, view_size=None, ignore_classes=("bush",)):
+        offset = np.tile(np.asarray(offset, dtype=float), 2)
+        projected = {}
+        for (class_name, _, _), (world_box, confidence) in self.walls.items():
+            if confidence < self.keep_confidence or class_name in ignore_classes:
+                continue
+            screen_box = world_box - offset
+            if view_size is not None and (screen_box[2] < 0 or screen_box[3] < 0
+                                          or screen_box[0] > view_size[0] or screen_box[1] > view_size[1]):
+                continue
+            projected.setdefault(class_name, []).append([int(round(v)) for v in screen_box.tolist()])
+        return projected
+
+
+def _box_centers(walls_by_class):
+    centers = {}
+    for class_name, boxes in walls_by_class.items():
+        if len(boxes):
+            boxes = np.asarray(boxes, dtype=float)
+            centers[class_name] = (boxes[:, :2] + boxes[:, 2:]) / 2
+    return centers
+
+
+def register_layout(layout, observed, cell_size, min_walls=4):
+    """
+    Shift that lays a cached layout over the walls observed now, both {class: [world box]}.
+    The world frame of a match starts wherever the camera was when it was reset, so the same
+    arena comes back shifted. Every pair of walls of the same class votes for the shift
+    between them and the most voted one wins. Returns (shift, share of the observed walls a
+    shifted cached wall lies on), shift is None with fewer than min_walls observed walls.
+    """
+    layout_centers, observed_centers = _box_centers(layout), _box_centers(observed)
+    if sum(len(centers) for centers in observed_centers.values()) < min_walls:
+        return None, 0.0
+    tolerance = cell_size / 2
+    differences = [(observed_centers[class_name][:, None] - centers[None]).reshape(-1, 2)
+                   for class_name, centers in layout_centers.items() if class_name in observed_centers]
+    if not differences:
+        return np.zeros(2), 0.0
+    differences = np.concatenate(differences)
+    bins = np.floor(differences / tolerance).astype(int)
+    votes = {}
+    for bin_x, bin_y in bins.tolist():
+        votes[(bin_x, bin_y)] = votes.get((bin_x, bin_y), 0) + 1
+    # A shift on the edge of a bin splits its votes with the neighbours
+    best_bin = max(votes, key=lambda key: sum(votes.get((key[0] + dx, key[1] + dy), 0)
+                                              for dx in (-1, 0, 1) for dy in (-1, 0, 1)))
+    near = (np.abs(bins - np.array(best_bin)) <= 1).all(axis=1)
+    shift = np.median(differences[near], axis=0)
+
+    matched, detections = 0, 0
+    for class_name, centers in observed_centers.items():
+        detections += len(centers)
+        if class_name not in layout_centers:
+            continue
+        distances = np.hypot(*(centers[:, None] - (layout_centers[class_name] + shift)[None]).transpose(2, 0, 1))
+        matched += int((distances.min(axis=1) <= tolerance).sum())
+    return shift, matched / detections
+
+
+def shift_layout(layout, shift):
+    offset = np.tile(np.asarray(shift, dtype=float), 2)
+    return {class_name: (np.asarray(boxes, dtype=float) + offset).tolist() for class_name, boxes in layout.items()}
+
+
+def estimate_grid_phase(boxes, cell_size):
+    """Circular mean of the box corners modulo the tile size, per axis."""
+    corners = np.asarray(boxes, dtype=float).reshape(-1, 2, 2).reshape(-1, 2)
+    angles = corners / cell_size * 2 * np.pi
+    phase = np.arctan2(np.sin(angles).mean(axis=0), np.cos(angles).mean(axis=0))
+    return (phase / (2 * np.pi) * cell_size) % cell_size
+
+
+def merge_cells_into_rectangles(grid):
+    """Greedily covers the occupied cells with maximal axis aligned rectangles (x1, y1, x2, y2), end exclusive."""
+    remaining = grid.copy()
+    rectangles = []
+    for y, x in zip(*np.nonzero(grid)):
+        if not remaining[y, x]:
+            continue
+        x2 = x + 1
+        while x2 < remaining.shape[1] and remaining[y, x2]:
+            x2 += 1
+        y2 = y + 1
+        while y2 < remaining.shape[0] and remaining[y2, x:x2].all():
+            y2 += 1
+        remaining[y:y2, x:x2] = False
+        rectangles.append((int(x), int(y), int(x2), int(y2)))
+    return rectangles
+
+
+def consolidate_walls(walls_by_class, cell_size):
+    """
+    Snaps every wall box to the tile grid and merges overlapping or touching boxes of
+    the same class into as few rectangles as possible.
+    """
+    all_boxes = [box for boxes in walls_by_class.values() for box in boxes]
+    if not all_boxes:
+        return {}
+    phase = np.tile(estimate_grid_phase(all_boxes, cell_size), 2)
+    consolidated = {}
+    for class_name, boxes in walls_by_class.items():
+        if not boxes:
+            continue
+        cells = np.rint((np.asarray(boxes, dtype=float) - phase) / cell_size).astype(int)
+        cells[:, 2:] = np.maximum(cells[:, 2:], cells[:, :2] + 1)
+        origin = cells[:, :2].min(axis=0)
+        cells -= np.tile(origin, 2)
+        grid = np.zeros((cells[:, 3].max(), cells[:, 2].max()), dtype=bool)
+        for x1, y1, x2, y2 in cells.tolist():
+            grid[y1:y2, x1:x2] = True
+        rectangles = np.array(merge_cells_into_rectangles(grid)) + np.tile(origin, 2)
+        consolidated[class_name] = np.rint(rectangles * cell_size + phase).astype(int).tolist()
+    return consolidated
@@ -1,14 +1,7 @@
 import atexit
-import ctypes
 import math
-import threading
 import time
 import cv2
-import numpy as np
-import win32gui
-import win32con
-import win32ui
-import pyautogui
 from PIL import Image
 from typing import List
 
@@ -16,17 +9,19 @@ from typing import List
 import scrcpy
 from adbutils import adb
 
+from adb_discovery import AdbDiscovery, candidate_ports
+from capture_profile import CaptureProfile
+from frame_source import FrameSource
+from input_dispatcher import InputDispatcher
+from joystick import Joystick
+from latency_tracer import LatencyTracer
+from screen_layout import get_screen_layout
 from utils import load_toml_as_dict
 
-# --- Configuration ---
-brawl_stars_width, brawl_stars_height = 1920, 1080
-
-key_coords_dict = {
-    "H": (1400, 990),
-    "G": (1640, 990),
-    "M": (1725, 800),
-    "Q": (1740, 1000),
-    "E": (1510, 880)
+scrcpy_actions = {
+    "down": scrcpy.ACTION_DOWN,
+    "move": scrcpy.ACTION_MOVE,
+    "up": scrcpy.ACTION_UP,
 }
 
 directions_xy_deltas_dict = {
@@ -36,64 +31,151 @@ directions_xy_deltas_dict = {
     "d": (100, 0),
 }
 
+class ScrcpyFrameSource(FrameSource):
+    """Live frames of the device, decoded by the scrcpy client which also carries the touch control channel."""
+
+    def __init__(self, device, capture_profile):
+        super().__init__()
+        # The stream is scaled down by the scrcpy server, width_ratio and the layout follow the frame size
+        self.client = scrcpy.Client(device=device, **capture_profile.client_kwargs())
+
+        def on_frame(frame):
+            if frame is not None:
+                self.publish(frame)
+
+        self.client.add_listener(scrcpy.EVENT_FRAME, on_frame)
+
+    def start(self):
+        self.client.start(threaded=True)
+
+    def stop(self):
+        self.client.stop()
+
+
 class WindowController:
-    def __init__(self):
+    def __init__(self, serial=None, frame_source=None, input_sink=None):
+        """
+        Without a frame_source the device is found over ADB and streamed with scrcpy. A
+        frame_source (a recorded video for example) and an input_sink replace the device,
+        so the bot can run offline.
+        """
         self.scale_factor = None
         self.width = None
         self.height = None
         self.width_ratio = None
         self.height_ratio = None
         self.joystick_x, self.joystick_y = None, None
-        # --- 2. ADB & Scrcpy Connection ---
-        print("Connecting to ADB...")
+        self.joystick = None
+        self.layout = get_screen_layout()
+        self.serial = serial
+        self.device = None
+        self.frame_source = frame_source
+        self.input_sink = input_sink
+        self.capture_profile = CaptureProfile(crop=None)
+        self.FRAME_STALE_TIMEOUT = 5.0
+        self.connected = False
+        self.PID_JOYSTICK = 1  # ID for WASD movement
+        self.PID_ATTACK = 2  # ID for clicks/attacks
+        # A click is dropped when its pointer is still busy for longer than this, so that
+        # repeated presses (a 10s star drop hold for example) don't pile up in the queue
+        self.max_input_backlog = 0.25
+        # Every frame gets a trace, touches carry the trace of the frame they were decided on
+        self.latency_tracer = LatencyTracer()
+        self.last_frame_time = 0.0
+        # Every touch goes through the dispatcher thread, the only writer of the control socket.
+        # It outlives reconnections, touches sent while disconnected are dropped
+        self.input_dispatcher = InputDispatcher(self.send_touch, on_sent=self.on_touch_sent)
         try:
-            # Connect to device (adbutils automatically handles port detection mostly)
-            # but adbutils is usually smarter at finding the open device.
-            device_list = adb.device_list()
-            if not device_list:
-                # Try connecting to common ports if empty
-                for port in [5555, load_toml_as_dict("cfg/general_config.toml")["emulator_port"], 16384, 5635] + list(range(5565, 5756, 10)):
-                    try:
-                         adb.connect(f"127.0.0.1:{port}")
-                    except Exception:
-                         pass
-                device_list = adb.device_list()
-
-            if not device_list:
-                 raise ConnectionError("No ADB devices found.")
-
-            self.device = device_list[0]
-            print(f"Connected to device: {self.device.serial}")
-
-            self.frame_lock = threading.Lock()
-            self.scrcpy_client = scrcpy.Client(device=self.device, max_width=0)
-            self.last_frame = None
-            self.last_frame_time = 0.0
-            self.last_joystick_pos = (None, None)
-            self.FRAME_STALE_TIMEOUT = 5.0
-
-            def on_frame(frame):
-                if frame is not None:
-                    with self.frame_lock:
-                        self.last_frame = frame
-                        self.last_frame_time = time.time()
-
-            self.scrcpy_client.add_listener(scrcpy.EVENT_FRAME, on_frame)
-            self.scrcpy_client.start(threaded=True)
-            atexit.register(self.close)
-            print("Scrcpy client started successfully.")
-
+            self.connect()
         except Exception as e:
             raise ConnectionError(f"Failed to initialize Scrcpy: {e}")
-        self.are_we_moving = False
-        self.PID_JOYSTICK = 1  # ID for WASD movement
-        self.PID_ATTACK = 2  # ID for clicks/attacks
+        atexit.register(self.close)
+
+    def connect(self):
+        if self.frame_source is not None and not isinstance(self.frame_source, ScrcpyFrameSource):
+            self.frame_source.start()
+            self.connected = True
+            return
+        # --- 2. ADB & Scrcpy Connection ---
+        print("Connecting to ADB...")
+        # A selected serial (adb_serial, or the serial argument) takes precedence, then the last
+        # device that worked for this emulator, then a parallel probe of the usual emulator ports
+        general_config = load_toml_as_dict("cfg/general_config.toml")
+        serial = self.serial or general_config.get("adb_serial") or None
+        self.device = AdbDiscovery(adb).find_device(
+            general_config.get("current_emulator", "Others"), serial,
+            candidate_ports(general_config.get("emulator_port")))
+        print(f"Connected to device: {self.device.serial}")
+
+        self.capture_profile = CaptureProfile.from_config(general_config)
+        if self.capture_profile.crop:
+            size = self.device.window_size()
+            self.capture_profile.device_size = (size.width, size.height)
+
+        self.frame_source = ScrcpyFrameSource(self.device, self.capture_profile)
+        self.scrcpy_client = self.frame_source.client
+        self.frame_source.start()
+        self.connected = True
+        print("Scrcpy client started successfully.")
+
+    def disconnect(self):
+        self.connected = False
+        if self.frame_source is not None:
+            try:
+                self.frame_source.stop()
+            except Exception as e:
+                print(f"Failed to stop the frame source: {e}")
+
+    def reconnect(self, max_attempts=8, initial_delay=1.0, max_delay=30.0):
+        """
+        Rebuilds the ADB connection and the scrcpy client in place, retrying with exponential
+        backoff. Returns True once frames flow again. The input dispatcher and frame
+        consumers keep their WindowController, only the stream behind it is replaced.
+        """
+        delay = initial_delay
+        for attempt in range(1, max_attempts + 1):
+            print(f"Reconnecting to the device (attempt {attempt}/{max_attempts})...")
+            self.disconnect()
+            # Touches held on the old connection are gone on the device side
+            if self.joystick is not None:
+                self.joystick.reset()
+            self.frame_source.clear()
+            try:
+                self.connect()
+                if self.wait_for_frame(timeout=5.0):
+                    self.width, self.height = None, None  # The resolution is read again from the next frame
+                    return True
+                print("Reconnected but no frame arrived.")
+            except Exception as e:
+                print(f"Reconnection failed: {e}")
+            time.sleep(delay)
+            delay = min(delay * 2, max_delay)
+        return False
+
+    def wait_for_frame(self, timeout):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.frame_source.get_latest_frame()[0] is not None:
+                return True
+            time.sleep(0.05)
+        return False
+
+    def is_feed_stale(self):
+        # Read without get_latest_frame, which advances unpaced replay sources
+        frame_time = self.frame_source.last_frame_time
+        return frame_time > 0 and time.time() - frame_time > self.FRAME_STALE_TIMEOUT
+
+    def restart_app(self, package_name="com.supercell.brawlstars"):
+        if self.device is None:
+            return
+        self.device.app_stop(package_name)
+        self.device.app_start(package_name)
 
     def get_latest_frame(self):
-        with self.frame_lock:
-            if self.last_frame is None:
-                return None, 0.0
-            return self.last_frame.copy(), self.last_frame_time
+        frame, frame_time = self.frame_source.get_latest_frame()
+        if frame is None:
+            return None, 0.0
+        return self.capture_profile.crop_frame(frame).copy(), frame_time
 
     def screenshot(self, array=False):
         frame, frame_time = self.get_latest_frame()
@@ -101,10 +183,12 @@ class WindowController:
         deadline = time.time() + 15
         while frame is None:
             if time.time() > deadline:
-                raise ConnectionError(
-                    "No frame received from scrcpy within 15s. "
-                    "Check USB/emulator connection."
-                )
+                if not self.reconnect():
+                    raise ConnectionError(
+                        "No frame received from scrcpy and reconnecting failed. "
+                        "Check USB/emulator connection."
+                    )
+                deadline = time.time() + 15
             print("Waiting for first frame...")
             time.sleep(0.1)
             frame, frame_time = self.get_latest_frame()
@@ -112,41 +196,64 @@ class WindowController:
         age = time.time() - frame_time
         if frame_time > 0 and age > self.FRAME_STALE_TIMEOUT:
             print(f"WARNING: scrcpy frame is {age:.1f}s stale -- feed may be frozen")
+        if frame_time != self.last_frame_time:
+            self.last_frame_time = frame_time
+            self.input_dispatcher.tag = self.latency_tracer.begin(frame_time)
 
         frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         if not self.width or not self.height:
             self.width = frame.shape[1]
             self.height = frame.shape[0]
-            self.width_ratio = self.width / brawl_stars_width
-            self.height_ratio = self.height / brawl_stars_height
-            self.joystick_x, self.joystick_y = 220 * self.width_ratio, 870 * self.height_ratio
+            self.layout.set_resolution(self.width, self.height)
+            self.width_ratio = self.layout.width_ratio
+            self.height_ratio = self.layout.height_ratio
+            self.joystick_x, self.joystick_y = self.layout.point("joystick")
             self.scale_factor = min(self.width_ratio, self.height_ratio)
+            self.joystick = Joystick(self.input_dispatcher, self.PID_JOYSTICK, (self.joystick_x, self.joystick_y),
+                                     100 * self.scale_factor)
 
         if array:
             return frame_rgb
 
         return Image.fromarray(frame_rgb)
 
+    def on_touch_sent(self, trace, action, sent_time):
+        # Ups only end a gesture, the latency of a decision is the time to its first down or move
+        if action != "up":
+            self.latency_tracer.touch_sent(trace, sent_time)
+
+    def send_touch(self, action, x, y, pointer_id):
+        if not self.connected:
+            return
+        if self.input_sink is not None:
+            self.input_sink.send(action, x, y, pointer_id)
+            return
+        x, y = self.capture_profile.to_stream(x, y)
+        self.scrcpy_client.control.touch(x, y, scrcpy_actions[action], pointer_id)
+
     def touch_down(self, x, y, pointer_id=0):
-        # We explicitly pass the pointer_id
-        self.scrcpy_client.control.touch(int(x), int(y), scrcpy.ACTION_DOWN, pointer_id)
+        self.input_dispatcher.schedule("down", x, y, pointer_id)
 
     def touch_move(self, x, y, pointer_id=0):
-        self.scrcpy_client.control.touch(int(x), int(y), scrcpy.ACTION_MOVE, pointer_id)
+        self.input_dispatcher.schedule("move", x, y, pointer_id)
 
     def touch_up(self, x, y, pointer_id=0):
-        self.scrcpy_client.control.touch(int(x), int(y), scrcpy.ACTION_UP, pointer_id)
+        self.input_dispatcher.schedule("up", x, y, pointer_id)
+
+    def move_joystick(self, angle, magnitude=1.0):
+        """Holds the movement joystick towards angle (screen space, 0 is right), magnitude in [0, 1]."""
+        self.joystick.move(angle, magnitude)
+
+    def release_joystick(self):
+        # The joystick has its own pointer, so this doesn't lift the attack finger
+        if self.joystick is not None:
+            self.joystick.release()
 
     def keys_up(self, keys: List[str]):
         if "".join(keys).lower() == "wasd":
-            if self.are_we_moving:
-                # Use PID_JOYSTICK so we don't lift the attack finger
-                self.touch_up(self.joystick_x, self.joystick_y, pointer_id=self.PID_JOYSTICK)
-                self.are_we_moving = False
-                self.last_joystick_pos = (None, None)
+            self.release_joystick()
 
     def keys_down(self, keys: List[str]):
-
         delta_x, delta_y = 0, 0
         for key in keys:
             if key in directions_xy_deltas_dict:
@@ -154,31 +261,26 @@ class WindowController:
                 delta_x += dx
                 delta_y += dy
 
-        if not self.are_we_moving:
-            self.touch_down(self.joystick_x, self.joystick_y, pointer_id=self.PID_JOYSTICK)
-            self.are_we_moving = True
-            self.last_joystick_pos = (self.joystick_x + delta_x, self.joystick_y + delta_y)
-
-        if self.last_joystick_pos != (self.joystick_x + delta_x, self.joystick_y + delta_y):
-            self.touch_move(self.joystick_x + delta_x, self.joystick_y + delta_y, pointer_id=self.PID_JOYSTICK)
-            self.last_joystick_pos = (self.joystick_x + delta_x, self.joystick_y + delta_y)
+        if delta_x == 0 and delta_y == 0:
+            self.release_joystick()
+            return
+        self.move_joystick(math.atan2(delta_y, delta_x))
 
     def click(self, x: int, y: int, delay=0.05, already_include_ratio=True):
         if not already_include_ratio:
             x = x * self.width_ratio
             y = y * self.height_ratio
         # Use PID_ATTACK for clicks so we don't interrupt movement
-        self.touch_down(x, y, pointer_id=self.PID_ATTACK)
-        time.sleep(delay)
-        self.touch_up(x, y, pointer_id=self.PID_ATTACK)
+        if self.input_dispatcher.backlog(self.PID_ATTACK) > self.max_input_backlog:
+            return False
+        self.input_dispatcher.tap(x, y, self.PID_ATTACK, hold=delay)
+        return True
 
     def press_key(self, key, delay=0.05):
-        if key not in key_coords_dict:
+        if f"key_{key}" not in self.layout.points:
             return
-        x, y = key_coords_dict[key]
-        target_x = x * self.width_ratio
-        target_y = y * self.height_ratio
-        self.click(target_x, target_y, delay)
+        target_x, target_y = self.layout.point(f"key_{key}")
+        return self.click(target_x, target_y, delay)
 
     def swipe(self, start_x, start_y, end_x, end_y, duration=0.2):
         dist_x = end_x - start_x
@@ -190,17 +292,15 @@ class WindowController:
 
         step_len = 25
         steps = max(int(distance / step_len), 1)
-        step_delay = duration / steps
+        points = [(start_x + dist_x * i / steps, start_y + dist_y * i / steps) for i in range(steps + 1)]
+        self.input_dispatcher.swipe(points, self.PID_ATTACK, duration)
 
-        self.touch_down(int(start_x), int(start_y), pointer_id=self.PID_ATTACK)
-        for i in range(1, steps + 1):
-            t = i / steps
-            cx = start_x + dist_x * t
-            cy = start_y + dist_y * t
-            time.sleep(step_delay)
-            self.touch_move(int(cx), int(cy), pointer_id=self.PID_ATTACK)
-        self.touch_up(int(end_x), int(end_y), pointer_id=self.PID_ATTACK)
+    def wait_for_input(self, timeout=None):
+        """Blocks until every queued touch was sent, for screens that have to settle after a gesture."""
+        return self.input_dispatcher.wait_idle(timeout)
 
     def close(self):
-        if hasattr(self, 'scrcpy_client'):
-            self.scrcpy_client.stop()
+        if hasattr(self, 'input_dispatcher'):
+            self.input_dispatcher.wait_idle(timeout=1.0)
+            self.input_dispatcher.stop()
+        self.disconnect()